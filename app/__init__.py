@@ -39,6 +39,7 @@ def create_app(config_class=Config):
     from app.transaksi import bp as transaksi_bp
     from app.kontrak import bp as kontrak_bp
     from app.laporan import laporan_bp
+    from app.impor import bp as impor_bp
     
     app.register_blueprint(main.bp)
     app.register_blueprint(auth_bp)
@@ -51,5 +52,10 @@ def create_app(config_class=Config):
     app.register_blueprint(transaksi_bp)
     app.register_blueprint(kontrak_bp)
     app.register_blueprint(laporan_bp)
+    app.register_blueprint(impor_bp)
+    
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
     
     return app
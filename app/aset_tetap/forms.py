@@ -2,6 +2,7 @@ from flask_wtf import FlaskForm
 from wtforms import StringField, IntegerField, SubmitField, SelectField, TextAreaField, DateField
 from wtforms.validators import DataRequired, Length, ValidationError, Optional, NumberRange
 from app.models.aset_tetap import AsetTetap
+from app.utils.autocomplete import AutocompleteField
 
 # Daftar nama pengguna/pemakai aset
 DAFTAR_NAMA_PENGGUNA = [
@@ -82,6 +83,13 @@ class AsetTetapForm(FlaskForm):
                 raise ValidationError('Kode aset ini sudah digunakan!')
 
 
+class AsetTetapImporForm(AsetTetapForm):
+    """Aturan AsetTetapForm untuk satu baris file impor; kode yang sudah ada diperbarui"""
+
+    def validate_kode_aset(self, kode_aset):
+        pass
+
+
 class LaporanKerusakanForm(FlaskForm):
     tanggal_diketahui_rusak = DateField('Tanggal Diketahui Rusak', validators=[
         DataRequired(message='Tanggal diketahui rusak wajib diisi')
@@ -114,7 +122,8 @@ class LaporanKerusakanForm(FlaskForm):
 
 
 class LaporanKerusakanPublicForm(FlaskForm):
-    aset_tetap_id = SelectField('Aset', coerce=int, validators=[DataRequired()])
+    aset_tetap_id = AutocompleteField('Aset', coerce=int, validators=[DataRequired()],
+                                      sumber='aset', placeholder=(0, '-- Pilih Aset --'))
     tanggal_diketahui_rusak = DateField('Tanggal Diketahui Rusak', validators=[
         DataRequired(message='Tanggal diketahui rusak wajib diisi')
     ])
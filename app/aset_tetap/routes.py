@@ -1,44 +1,17 @@
-from flask import render_template, request, redirect, url_for, flash, send_file, current_app
+from flask import render_template, request, redirect, url_for, flash, send_file
 from flask_login import login_required, current_user
 from app.aset_tetap import bp
 from app.aset_tetap.forms import AsetTetapForm, LaporanKerusakanForm
 from app.models.aset_tetap import AsetTetap
 from app.models.laporan_kerusakan import LaporanKerusakan
-from app.models.kategori import KategoriBarang, MerkBarang
-from app.models.merk_aset_tetap import MerkAsetTetap
 from app.models.barang import Barang
+from app.models.pencarian import terapkan_pencarian
+from app.utils.cache_data import pilihan
 from app.utils.pdf_export import export_laporan_kerusakan_to_pdf
+from app.utils.surat_kerusakan import path_logo_unhas
 from app import db
 from datetime import datetime
-import os
-
-
-def _resolve_unhas_logo_path():
-    """Resolve logo path for PDF letterhead with flexible fallback candidates."""
-    configured_path = current_app.config.get('UNHAS_LOGO_PATH')
-    candidates = []
-
-    if configured_path:
-        if os.path.isabs(configured_path):
-            candidates.append(configured_path)
-        else:
-            candidates.append(os.path.join(current_app.root_path, configured_path))
-
-    images_dir = os.path.join(current_app.root_path, 'static', 'images')
-    candidates.extend([
-        os.path.join(images_dir, 'logo_unhas.png'),
-        os.path.join(images_dir, 'logo_unhas.jpg'),
-        os.path.join(images_dir, 'logo_unhas.jpeg'),
-        os.path.join(images_dir, 'logo_institusi.png'),
-        os.path.join(images_dir, 'logo_institusi.jpg'),
-        os.path.join(images_dir, 'logo_institusi.jpeg'),
-    ])
-
-    for path in candidates:
-        if path and os.path.exists(path):
-            return path
-
-    return None
+from sqlalchemy.orm import joinedload
 
 
 @bp.route('/')
@@ -54,12 +27,11 @@ def index():
     query = AsetTetap.query
     
     if search:
-        query = query.filter(
-            (AsetTetap.kode_aset.like(f'%{search}%')) |
-            (AsetTetap.nama_aset.like(f'%{search}%'))
-        )
+        query = terapkan_pencarian(query, 'aset_tetap', search)
     
-    pagination = query.order_by(AsetTetap.created_at.desc()).paginate(
+    pagination = query.options(
+        joinedload(AsetTetap.kategori), joinedload(AsetTetap.merk_aset_tetap)
+    ).order_by(AsetTetap.created_at.desc()).paginate(
         page=page, per_page=10, error_out=False
     )
     
@@ -79,10 +51,10 @@ def tambah():
     form = AsetTetapForm()
     
     # Populate kategori choices
-    form.kategori_id.choices = [(0, '-- Pilih Kategori --')] + [(k.id, k.nama_kategori) for k in KategoriBarang.query.order_by(KategoriBarang.nama_kategori).all()]
+    form.kategori_id.choices = [(0, '-- Pilih Kategori --')] + pilihan('kategori')
     
     # Populate merk_aset_tetap choices
-    form.merk_aset_tetap_id.choices = [(0, '-- Pilih Jenis Aset --')] + [(m.id, m.nama_merk) for m in MerkAsetTetap.query.order_by(MerkAsetTetap.nama_merk).all()]
+    form.merk_aset_tetap_id.choices = [(0, '-- Pilih Jenis Aset --')] + pilihan('merk_aset_tetap')
     
     if form.validate_on_submit():
         # Check if kode_aset already exists
@@ -130,10 +102,10 @@ def edit(id):
     form = AsetTetapForm(obj=aset, original_kode=aset.kode_aset)
     
     # Populate kategori choices
-    form.kategori_id.choices = [(0, '-- Pilih Kategori --')] + [(k.id, k.nama_kategori) for k in KategoriBarang.query.order_by(KategoriBarang.nama_kategori).all()]
+    form.kategori_id.choices = [(0, '-- Pilih Kategori --')] + pilihan('kategori')
     
     # Populate merk_aset_tetap choices
-    form.merk_aset_tetap_id.choices = [(0, '-- Pilih Jenis Aset --')] + [(m.id, m.nama_merk) for m in MerkAsetTetap.query.order_by(MerkAsetTetap.nama_merk).all()]
+    form.merk_aset_tetap_id.choices = [(0, '-- Pilih Jenis Aset --')] + pilihan('merk_aset_tetap')
     
     if form.validate_on_submit():
         aset.kode_aset = form.kode_aset.data
@@ -270,14 +242,7 @@ def laporan_kerusakan_edit(id):
 def laporan_kerusakan_cetak_pdf(id):
     """Cetak laporan kerusakan ke PDF"""
     laporan = LaporanKerusakan.query.get_or_404(id)
-    logo_path = _resolve_unhas_logo_path()
-    if not logo_path:
-        current_app.logger.warning(
-            'Logo UNHAS tidak ditemukan. PDF dicetak tanpa logo. '
-            'Atur UNHAS_LOGO_PATH atau simpan file di app/static/images/logo_unhas.png'
-        )
-
-    buffer = export_laporan_kerusakan_to_pdf(laporan, logo_path=logo_path)
+    buffer = export_laporan_kerusakan_to_pdf(laporan, logo_path=path_logo_unhas())
     filename = (
         f"Surat_Laporan_Kerusakan_v2_{laporan.aset_tetap.kode_aset}_"
         f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.pdf"
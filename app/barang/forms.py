@@ -1,6 +1,6 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, IntegerField, SubmitField, SelectField, TextAreaField, RadioField, DateField
-from wtforms.validators import DataRequired, Length, ValidationError, Optional, NumberRange
+from wtforms.validators import DataRequired, InputRequired, Length, ValidationError, Optional, NumberRange
 from app.models.barang import Barang
 
 class BarangForm(FlaskForm):
@@ -50,6 +50,14 @@ class BarangForm(FlaskForm):
     submit = SubmitField('Simpan')
 
 
+class BarangImporForm(BarangForm):
+    """Aturan BarangForm untuk satu baris file impor (stok awal 0 diperbolehkan)"""
+    stok_awal = IntegerField('Stok Awal', validators=[
+        InputRequired(message='Stok awal wajib diisi'),
+        NumberRange(min=0, message='Stok awal tidak boleh negatif')
+    ], default=0)
+
+
 class PermintaanBarangPublicForm(FlaskForm):
     nama_pengguna = SelectField('Nama', choices=[
         ('Rasman, S.Sos.', 'Rasman, S.Sos.'),
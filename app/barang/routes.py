@@ -2,10 +2,13 @@ from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from app.barang import bp
 from app.barang.forms import BarangForm
-from app.models.barang import Barang
-from app.models.kategori import KategoriBarang, MerkBarang
+from app.models.barang import Barang, BATAS_STOK_RENDAH
+from app.models.stok_saldo import StokSaldo
 from app.models.user import UserLog
+from app.models.pencarian import terapkan_pencarian
+from app.utils.cache_data import pilihan
 from app import db
+from sqlalchemy.orm import joinedload
 
 @bp.route('/')
 @login_required
@@ -13,32 +16,51 @@ def index():
     """Halaman daftar semua barang"""
     page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '', type=str)
+    jenis = request.args.get('jenis', '', type=str)
+    stok = request.args.get('stok', '', type=str)
     
     query = Barang.query
     
     if search:
-        query = query.filter(
-            (Barang.kode_barang.like(f'%{search}%')) |
-            (Barang.nama_barang.like(f'%{search}%'))
-        )
-    
-    barang_list = query.order_by(Barang.created_at.desc()).paginate(
+        query = terapkan_pencarian(query, 'barang', search)
+    
+    if jenis in ('inventaris', 'habis_pakai'):
+        query = query.filter(Barang.jenis_barang == jenis)
+    else:
+        jenis = ''
+    
+    # Filter stok rendah (link "Lihat semua" dari dashboard)
+    if stok in ('rendah', 'minimum'):
+        query = query.outerjoin(StokSaldo, StokSaldo.kode_barang == Barang.kode_barang)
+        if stok == 'rendah':
+            query = query.filter(Barang.kondisi_stok_rendah(BATAS_STOK_RENDAH))
+        else:
+            query = query.filter(Barang.kondisi_stok_rendah())
+    else:
+        stok = ''
+    
+    barang_list = query.options(
+        joinedload(Barang.kategori), joinedload(Barang.merk)
+    ).order_by(Barang.created_at.desc()).paginate(
         page=page, per_page=10, error_out=False
     )
     
     # Hitung stok akhir untuk setiap barang
+    stok_map = Barang.stok_akhir_bulk(barang_list.items)
     barang_dengan_stok = []
     for barang in barang_list.items:
         barang_dengan_stok.append({
             'barang': barang,
-            'stok_akhir': barang.get_stok_akhir()
+            'stok_akhir': stok_map.get(barang.kode_barang, barang.stok_awal)
         })
     
     return render_template('barang/index.html',
                          title='Daftar Barang',
                          barang_list=barang_dengan_stok,
                          pagination=barang_list,
-                         search=search)
+                         search=search,
+                         jenis=jenis,
+                         stok=stok)
 
 @bp.route('/tambah', methods=['GET', 'POST'])
 @login_required
@@ -47,8 +69,8 @@ def tambah():
     form = BarangForm()
     
     # Populate kategori dan merk choices
-    form.kategori_id.choices = [(0, '-- Pilih Kategori --')] + [(k.id, k.nama_kategori) for k in KategoriBarang.query.order_by(KategoriBarang.nama_kategori).all()]
-    form.merk_id.choices = [(0, '-- Pilih Merk --')] + [(m.id, m.nama_merk) for m in MerkBarang.query.order_by(MerkBarang.nama_merk).all()]
+    form.kategori_id.choices = [(0, '-- Pilih Kategori --')] + pilihan('kategori')
+    form.merk_id.choices = [(0, '-- Pilih Merk --')] + pilihan('merk')
     
     if form.validate_on_submit():
         barang = Barang(
@@ -91,8 +113,8 @@ def edit(id):
     form = BarangForm(original_kode=barang.kode_barang, obj=barang)
     
     # Populate kategori dan merk choices
-    form.kategori_id.choices = [(0, '-- Pilih Kategori --')] + [(k.id, k.nama_kategori) for k in KategoriBarang.query.order_by(KategoriBarang.nama_kategori).all()]
-    form.merk_id.choices = [(0, '-- Pilih Merk --')] + [(m.id, m.nama_merk) for m in MerkBarang.query.order_by(MerkBarang.nama_merk).all()]
+    form.kategori_id.choices = [(0, '-- Pilih Kategori --')] + pilihan('kategori')
+    form.merk_id.choices = [(0, '-- Pilih Merk --')] + pilihan('merk')
     
     if form.validate_on_submit():
         barang.kode_barang = form.kode_barang.data
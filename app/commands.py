@@ -0,0 +1,144 @@
+"""Perintah CLI Flask untuk pemeliharaan data Inven-Go"""
+
+import click
+from datetime import date, datetime
+from flask.cli import AppGroup
+from app import db
+
+stok_cli = AppGroup('stok', help='Pemeliharaan saldo stok barang.')
+laporan_cli = AppGroup('laporan', help='Antrean export laporan di latar belakang.')
+
+
+@stok_cli.command('cek')
+def cek_saldo():
+    """Cocokkan saldo tersimpan dengan agregat transaksi."""
+    from app.models.stok_saldo import StokSaldo
+
+    selisih = StokSaldo.cek_selisih()
+    if not selisih:
+        click.echo('[OK] Semua saldo stok sesuai dengan transaksi.')
+        return
+
+    for item in selisih:
+        click.echo(
+            f"[SELISIH] {item['kode_barang']}: tersimpan={item['tersimpan']} "
+            f"aktual={item['aktual']}"
+        )
+    click.echo(f'{len(selisih)} barang tidak sesuai. Jalankan "flask stok rebuild" untuk memperbaiki.')
+    raise SystemExit(1)
+
+
+@stok_cli.command('rebuild')
+def rebuild_saldo():
+    """Hitung ulang seluruh saldo stok dari transaksi."""
+    from app.models.stok_saldo import StokSaldo
+
+    try:
+        jumlah = StokSaldo.rebuild()
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        click.echo(f'[ERROR] Rebuild saldo gagal: {exc}')
+        raise SystemExit(1)
+
+    click.echo(f'[OK] Saldo stok {jumlah} barang berhasil dihitung ulang.')
+
+
+@stok_cli.command('snapshot')
+@click.option('--periode', default=None, help='Bulan checkpoint (YYYY-MM). Default: bulan berjalan.')
+@click.option('--semua', is_flag=True, help='Lengkapi semua checkpoint bulanan yang belum ada.')
+def snapshot_stok(periode, semua):
+    """Buat checkpoint stok bulanan (tabel stok_snapshot)."""
+    from app.models.stok_snapshot import StokSnapshot
+
+    if periode:
+        try:
+            daftar_periode = [datetime.strptime(periode, '%Y-%m').date()]
+        except ValueError:
+            click.echo(f'[ERROR] Format periode tidak valid: {periode} (gunakan YYYY-MM)')
+            raise SystemExit(1)
+    elif semua:
+        daftar_periode = StokSnapshot.periode_belum_ada()
+    else:
+        daftar_periode = [date.today()]
+
+    try:
+        for tanggal in daftar_periode:
+            jumlah = StokSnapshot.buat_snapshot(tanggal)
+            click.echo(f'[OK] Snapshot {tanggal.strftime("%Y-%m")}: {jumlah} barang.')
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        click.echo(f'[ERROR] Snapshot stok gagal: {exc}')
+        raise SystemExit(1)
+
+    if not daftar_periode:
+        click.echo('[OK] Semua checkpoint bulanan sudah tersedia.')
+
+
+@laporan_cli.command('worker')
+@click.option('--proses', default=2, show_default=True, help='Jumlah proses export paralel.')
+@click.option('--interval', default=2.0, show_default=True, help='Jeda cek antrean (detik).')
+@click.option('--sekali', is_flag=True, help='Berhenti setelah antrean kosong.')
+def worker_laporan(proses, interval, sekali):
+    """Kerjakan report job (export Excel/PDF) dari tabel report_job."""
+    from app.utils.report_job import jalankan_worker
+
+    click.echo(f'[INFO] Worker laporan berjalan dengan {proses} proses.')
+    try:
+        jalankan_worker(jumlah_proses=proses, interval=interval, sekali=sekali, log=click.echo)
+    except KeyboardInterrupt:
+        click.echo('[INFO] Worker laporan dihentikan.')
+
+
+@laporan_cli.command('bersihkan')
+@click.option('--cache', is_flag=True, help='Kosongkan juga seluruh cache file laporan.')
+def bersihkan_laporan(cache):
+    """Hapus file hasil report job yang sudah kedaluwarsa."""
+    from app.utils.report_job import bersihkan_kedaluwarsa
+
+    jumlah = bersihkan_kedaluwarsa()
+    click.echo(f'[OK] {jumlah} file export kedaluwarsa dihapus.')
+
+    if cache:
+        from app.utils.report_cache import kosongkan
+
+        jumlah = kosongkan()
+        click.echo(f'[OK] {jumlah} file cache laporan dihapus.')
+
+
+@click.command('impor')
+@click.argument('jenis', type=click.Choice(['barang', 'aset_tetap', 'masuk', 'keluar']))
+@click.argument('path_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--ukuran-chunk', default=None, type=int, help='Baris per INSERT/commit. Default: IMPOR_UKURAN_CHUNK.')
+@click.option('--laporan-galat', default=None, type=click.Path(dir_okay=False), help='Tulis laporan galat (CSV) ke file ini.')
+def impor_data(jenis, path_file, ukuran_chunk, laporan_galat):
+    """Impor barang, aset tetap atau transaksi dari file XLSX/CSV."""
+    from app.utils.impor_data import FileImporTidakValid, impor_file
+
+    try:
+        hasil = impor_file(jenis, path_file, path_file, ukuran_chunk=ukuran_chunk)
+    except FileImporTidakValid as exc:
+        click.echo(f'[ERROR] {exc}')
+        raise SystemExit(1)
+    except Exception as exc:
+        db.session.rollback()
+        click.echo(f'[ERROR] Impor dihentikan: {exc} (chunk yang sudah tersimpan tidak dibatalkan)')
+        raise SystemExit(1)
+
+    click.echo(f'[OK] {hasil.jumlah_disimpan} dari {hasil.jumlah_baris} baris diimpor.')
+    if hasil.galat:
+        if laporan_galat:
+            with open(laporan_galat, 'w', encoding='utf-8', newline='') as f:
+                hasil.tulis_laporan_galat(f)
+            click.echo(f'[GALAT] {len(hasil.galat)} galat ditulis ke {laporan_galat}')
+        else:
+            for g in hasil.galat:
+                click.echo(f"[GALAT] baris {g['baris']} {g['kolom']}: {g['pesan']}")
+        raise SystemExit(1)
+
+
+def register_commands(app):
+    app.cli.add_command(stok_cli)
+    app.cli.add_command(laporan_cli)
+    app.cli.add_command(impor_data)
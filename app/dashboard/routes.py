@@ -1,80 +1,89 @@
-from flask import render_template
+from datetime import date
+from flask import render_template, request, jsonify, url_for
 from flask_login import login_required, current_user
 from app.dashboard import bp
-from app.models.barang import Barang, BarangMasuk, BarangKeluar
+from app.models.barang import Barang, BarangMasuk, BarangKeluar, BATAS_STOK_RENDAH
 from app.models.user import User
-from app.models.aset_tetap import AsetTetap
 from app.models.laporan_kerusakan import LaporanKerusakan
 from app.models.permintaan_barang import PermintaanBarang
 from app.barang.forms import PermintaanBarangPublicForm
+from app.utils.prediksi_stok import prediksi_habis_bulk
+from app.utils.reservasi_stok import StokTidakCukup, ambil_stok
+from app.models.pencarian import cari_semua
+from app.utils.keyset import paginate_keyset
+from app.utils.statistik import jumlah_per_status, statistik_dashboard
 from app import db
-from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+# Jumlah baris stok rendah yang ditampilkan di dashboard
+LIMIT_STOK_RENDAH = 10
+LIMIT_HABIS_PAKAI_RENDAH = 6
 
 @bp.route('/')
 @login_required
 def index():
-    # Statistik dashboard
-    total_barang = Barang.query.count()
-    total_transaksi_masuk = BarangMasuk.query.count()
-    total_transaksi_keluar = BarangKeluar.query.count()
-    total_aset = AsetTetap.query.count()
+    # Statistik dashboard (satu query, di-cache sebentar)
+    statistik = statistik_dashboard()
+    
+    # Barang dengan stok rendah (contoh: < 10), difilter langsung di SQL
+    stok_akhir_expr = Barang.stok_akhir_expr()
+    total_stok_rendah, total_habis_pakai_rendah = Barang.hitung_stok_rendah(BATAS_STOK_RENDAH)
     
-    # Barang dengan stok rendah (contoh: < 10)
-    barang_stok_rendah = []
-    for barang in Barang.query.all():
-        stok_akhir = barang.get_stok_akhir()
-        if stok_akhir < 10:
-            barang_stok_rendah.append({
-                'barang': barang,
-                'stok_akhir': stok_akhir
-            })
+    barang_stok_rendah = [
+        {'barang': barang, 'stok_akhir': stok_akhir}
+        for barang, stok_akhir in Barang.query_dengan_stok().filter(
+            Barang.kondisi_stok_rendah(BATAS_STOK_RENDAH)
+        ).order_by(stok_akhir_expr, Barang.kode_barang).limit(LIMIT_STOK_RENDAH).all()
+    ]
     
     # Barang habis pakai dengan stok rendah (untuk alert khusus)
-    barang_habis_pakai_rendah = []
-    for barang in Barang.query.filter_by(jenis_barang='habis_pakai').all():
-        stok_akhir = barang.get_stok_akhir()
-        if barang.is_stok_rendah(stok_akhir):
-            prediksi = barang.prediksi_habis(30)
-            barang_habis_pakai_rendah.append({
-                'barang': barang,
-                'stok_akhir': stok_akhir,
-                'status': barang.get_status_stok(stok_akhir),
-                'prediksi': prediksi
-            })
+    habis_pakai_rendah = Barang.query_dengan_stok().filter(
+        Barang.kondisi_stok_rendah()
+    ).order_by(stok_akhir_expr, Barang.kode_barang).limit(LIMIT_HABIS_PAKAI_RENDAH).all()
+    prediksi_map = prediksi_habis_bulk(
+        [barang for barang, _ in habis_pakai_rendah],
+        periode_hari=30,
+        stok_map={barang.kode_barang: stok_akhir for barang, stok_akhir in habis_pakai_rendah}
+    )
+    barang_habis_pakai_rendah = [
+        {
+            'barang': barang,
+            'stok_akhir': stok_akhir,
+            'status': barang.get_status_stok(stok_akhir),
+            'prediksi': prediksi_map.get(barang.kode_barang)
+        }
+        for barang, stok_akhir in habis_pakai_rendah
+    ]
     
     # Transaksi terbaru
-    transaksi_masuk_terbaru = BarangMasuk.query.order_by(BarangMasuk.created_at.desc()).limit(5).all()
-    transaksi_keluar_terbaru = BarangKeluar.query.order_by(BarangKeluar.created_at.desc()).limit(5).all()
+    transaksi_masuk_terbaru = BarangMasuk.query.options(joinedload(BarangMasuk.barang)).order_by(BarangMasuk.created_at.desc()).limit(5).all()
+    transaksi_keluar_terbaru = BarangKeluar.query.options(joinedload(BarangKeluar.barang)).order_by(BarangKeluar.created_at.desc()).limit(5).all()
     
     # Notifikasi Laporan Kerusakan
-    laporan_pending = LaporanKerusakan.query.filter_by(status='terkirim').count()
     laporan_terbaru = LaporanKerusakan.query.order_by(LaporanKerusakan.created_at.desc()).limit(10).all()
     
     # Notifikasi Permintaan Barang
-    permintaan_pending = PermintaanBarang.query.filter_by(status='terkirim').count()
-    permintaan_terbaru = PermintaanBarang.query.order_by(PermintaanBarang.created_at.desc()).limit(10).all()
-    
-    # Total laporan dalam 7 hari terakhir
-    from datetime import datetime, timedelta
-    seminggu_lalu = datetime.utcnow() - timedelta(days=7)
-    laporan_minggu_ini = LaporanKerusakan.query.filter(
-        LaporanKerusakan.created_at >= seminggu_lalu
-    ).count()
+    permintaan_terbaru = PermintaanBarang.query.options(
+        joinedload(PermintaanBarang.barang1), joinedload(PermintaanBarang.barang2), joinedload(PermintaanBarang.barang3)
+    ).order_by(PermintaanBarang.created_at.desc()).limit(10).all()
     
     return render_template('dashboard/index.html',
                          title='Dashboard',
-                         total_barang=total_barang,
-                         total_transaksi_masuk=total_transaksi_masuk,
-                         total_transaksi_keluar=total_transaksi_keluar,
-                         total_aset=total_aset,
+                         total_barang=statistik['total_barang'],
+                         total_transaksi_masuk=statistik['total_transaksi_masuk'],
+                         total_transaksi_keluar=statistik['total_transaksi_keluar'],
+                         total_aset=statistik['total_aset'],
                          barang_stok_rendah=barang_stok_rendah,
+                         total_stok_rendah=total_stok_rendah,
+                         batas_stok_rendah=BATAS_STOK_RENDAH,
                          barang_habis_pakai_rendah=barang_habis_pakai_rendah,
+                         total_habis_pakai_rendah=total_habis_pakai_rendah,
                          transaksi_masuk_terbaru=transaksi_masuk_terbaru,
                          transaksi_keluar_terbaru=transaksi_keluar_terbaru,
-                         laporan_pending=laporan_pending,
+                         laporan_pending=statistik['laporan_pending'],
                          laporan_terbaru=laporan_terbaru,
-                         laporan_minggu_ini=laporan_minggu_ini,
-                         permintaan_pending=permintaan_pending,
+                         laporan_minggu_ini=statistik['laporan_minggu_ini'],
+                         permintaan_pending=statistik['permintaan_pending'],
                          permintaan_terbaru=permintaan_terbaru)
 
 @bp.route('/laporan_kerusakan_monitor')
@@ -87,37 +96,32 @@ def laporan_kerusakan_monitor():
     if current_user.role != 'admin':
         abort(403)
     
-    # Pagination
-    page = 1
-    status_filter = 'semua'
-    
-    try:
-        from flask import request
-        page = request.args.get('page', 1, type=int)
-        status_filter = request.args.get('status', 'semua')
-    except:
-        pass
+    # Pagination (cursor)
+    cursor = request.args.get('cursor', type=str)
+    status_filter = request.args.get('status', 'semua')
     
     # Query dengan filter
-    query = LaporanKerusakan.query
+    query = LaporanKerusakan.query.options(joinedload(LaporanKerusakan.pelapor))
     
     if status_filter != 'semua':
         query = query.filter_by(status=status_filter)
     
     # Urutkan berdasarkan tanggal terbaru
-    laporan_kerusakan = query.order_by(
-        LaporanKerusakan.created_at.desc()
-    ).paginate(page=page, per_page=20)
+    laporan_kerusakan = paginate_keyset(
+        query, [LaporanKerusakan.created_at, LaporanKerusakan.id], cursor=cursor, per_page=20
+    )
     
-    # Statistik
-    total_laporan = LaporanKerusakan.query.count()
-    laporan_pending = LaporanKerusakan.query.filter_by(status='terkirim').count()
-    laporan_selesai = LaporanKerusakan.query.filter_by(status='selesai').count()
-    laporan_ditolak = LaporanKerusakan.query.filter_by(status='ditolak').count()
+    # Statistik (satu GROUP BY status, di-cache sebentar)
+    jumlah_status = jumlah_per_status(LaporanKerusakan)
+    total_laporan = jumlah_status['total']
+    laporan_pending = jumlah_status.get('terkirim', 0)
+    laporan_selesai = jumlah_status.get('selesai', 0)
+    laporan_ditolak = jumlah_status.get('ditolak', 0)
     
     return render_template('dashboard/laporan_kerusakan_monitor.html',
                          title='Monitor Laporan Kerusakan',
                          laporan_kerusakan=laporan_kerusakan,
+                         cursor=cursor,
                          status_filter=status_filter,
                          total_laporan=total_laporan,
                          laporan_pending=laporan_pending,
@@ -135,37 +139,34 @@ def permintaan_barang_monitor():
     if current_user.role != 'admin':
         abort(403)
     
-    # Pagination
-    page = 1
-    status_filter = 'semua'
-    
-    try:
-        from flask import request
-        page = request.args.get('page', 1, type=int)
-        status_filter = request.args.get('status', 'semua')
-    except:
-        pass
+    # Pagination (cursor)
+    cursor = request.args.get('cursor', type=str)
+    status_filter = request.args.get('status', 'semua')
     
     # Query dengan filter
-    query = PermintaanBarang.query
+    query = PermintaanBarang.query.options(
+        joinedload(PermintaanBarang.barang1), joinedload(PermintaanBarang.barang2), joinedload(PermintaanBarang.barang3)
+    )
     
     if status_filter != 'semua':
         query = query.filter_by(status=status_filter)
     
     # Urutkan berdasarkan tanggal terbaru
-    permintaan_barang = query.order_by(
-        PermintaanBarang.created_at.desc()
-    ).paginate(page=page, per_page=20)
+    permintaan_barang = paginate_keyset(
+        query, [PermintaanBarang.created_at, PermintaanBarang.id], cursor=cursor, per_page=20
+    )
     
-    # Statistik
-    total_permintaan = PermintaanBarang.query.count()
-    permintaan_pending = PermintaanBarang.query.filter_by(status='terkirim').count()
-    permintaan_selesai = PermintaanBarang.query.filter_by(status='selesai').count()
-    permintaan_ditolak = PermintaanBarang.query.filter_by(status='ditolak').count()
+    # Statistik (satu GROUP BY status, di-cache sebentar)
+    jumlah_status = jumlah_per_status(PermintaanBarang)
+    total_permintaan = jumlah_status['total']
+    permintaan_pending = jumlah_status.get('terkirim', 0)
+    permintaan_selesai = jumlah_status.get('selesai', 0)
+    permintaan_ditolak = jumlah_status.get('ditolak', 0)
     
     return render_template('dashboard/permintaan_barang_monitor.html',
                          title='Monitor Permintaan Barang',
                          permintaan_barang=permintaan_barang,
+                         cursor=cursor,
                          status_filter=status_filter,
                          total_permintaan=total_permintaan,
                          permintaan_pending=permintaan_pending,
@@ -187,9 +188,11 @@ def permintaan_barang_edit(id):
     form = PermintaanBarangPublicForm(obj=permintaan)
 
     # rebuild choice lists
+    barang_atk = Barang.query.filter_by(kategori_id=3).order_by(Barang.kode_barang).all()
+    stok_map = Barang.stok_akhir_bulk(barang_atk)
     barang_choices = [(0, '-- Pilih Barang --')] + [
-        (b.id, f'{b.kode_barang} - {b.nama_barang} (Stok: {b.get_stok_akhir()})')
-        for b in Barang.query.filter_by(kategori_id=3).order_by(Barang.kode_barang).all()
+        (b.id, f'{b.kode_barang} - {b.nama_barang} (Stok: {stok_map[b.kode_barang]})')
+        for b in barang_atk
     ]
     form.nama_barang1.choices = barang_choices
     form.nama_barang2.choices = barang_choices
@@ -230,29 +233,54 @@ def permintaan_barang_hapus(id):
     db.session.commit()
 
     flash('Permintaan barang berhasil dihapus.', 'success')
-    # kembali ke halaman monitor, pertahankan filter/page jika ada
-    page = request.args.get('page', 1, type=int)
+    # kembali ke halaman monitor, pertahankan filter/halaman jika ada
+    cursor = request.args.get('cursor', type=str)
     status = request.args.get('status', 'semua')
-    return redirect(url_for('dashboard.permintaan_barang_monitor', page=page, status=status))
+    return redirect(url_for('dashboard.permintaan_barang_monitor', cursor=cursor, status=status))
 
 
 @bp.route('/permintaan_barang_monitor/selesai/<int:id>', methods=['POST'])
 @login_required
 def permintaan_barang_selesai(id):
-    """Tandai permintaan barang selesai"""
+    """Tandai permintaan barang selesai dan catat barang keluarnya"""
     from flask import request, redirect, url_for, flash, abort
 
     if current_user.role != 'admin':
         abort(403)
 
-    permintaan = PermintaanBarang.query.get_or_404(id)
+    cursor = request.args.get('cursor', type=str)
+    status = request.args.get('status', 'semua')
+    kembali = redirect(url_for('dashboard.permintaan_barang_monitor', cursor=cursor, status=status))
+
+    # Baris permintaan dikunci agar persetujuan ganda tidak mengeluarkan barang dua kali
+    permintaan = PermintaanBarang.query.filter_by(id=id).with_for_update().first_or_404()
+    if permintaan.status == 'selesai':
+        db.session.rollback()
+        flash('Permintaan barang sudah selesai.', 'info')
+        return kembali
+
+    kebutuhan = {}
+    for barang, banyaknya in permintaan.daftar_barang():
+        kebutuhan[barang.kode_barang] = kebutuhan.get(barang.kode_barang, 0) + banyaknya
+    try:
+        ambil_stok(kebutuhan)
+    except StokTidakCukup as exc:
+        db.session.rollback()
+        flash(f'Permintaan belum bisa diselesaikan. {exc}', 'danger')
+        return kembali
+
+    for barang, banyaknya in permintaan.daftar_barang():
+        db.session.add(BarangKeluar(
+            tanggal=date.today(),
+            kode_barang=barang.kode_barang,
+            qty=banyaknya,
+            keterangan=f'Permintaan #{permintaan.id}: {permintaan.nama_pengguna} ({permintaan.tempat_penggunaan})'
+        ))
     permintaan.status = 'selesai'
     db.session.commit()
 
-    flash('Permintaan barang ditandai selesai.', 'success')
-    page = request.args.get('page', 1, type=int)
-    status = request.args.get('status', 'semua')
-    return redirect(url_for('dashboard.permintaan_barang_monitor', page=page, status=status))
+    flash('Permintaan barang ditandai selesai dan barang keluar dicatat.', 'success')
+    return kembali
 
 
 @bp.route('/laporan_kerusakan_monitor/hapus/<int:id>', methods=['POST'])
@@ -270,8 +298,65 @@ def laporan_kerusakan_hapus(id):
     db.session.commit()
 
     flash('Laporan kerusakan berhasil dihapus.', 'success')
-    # kembali ke halaman monitor, pertahankan filter/page jika ada
-    page = request.args.get('page', 1, type=int)
+    # kembali ke halaman monitor, pertahankan filter/halaman jika ada
+    cursor = request.args.get('cursor', type=str)
     status = request.args.get('status', 'semua')
-    return redirect(url_for('dashboard.laporan_kerusakan_monitor', page=page, status=status))
+    return redirect(url_for('dashboard.laporan_kerusakan_monitor', cursor=cursor, status=status))
+
+
+# Judul kelompok hasil pencarian gabungan
+JUDUL_HASIL_CARI = {
+    'barang': 'Barang',
+    'aset_tetap': 'Aset Tetap',
+    'kontrak': 'Kontrak/SPK',
+    'merk': 'Merk Barang',
+    'kategori': 'Kategori',
+}
+
+
+def _item_cari(jenis, obj):
+    """Ringkasan satu hasil pencarian: label, keterangan dan URL tujuan"""
+    if jenis == 'barang':
+        return {'id': obj.id, 'label': f'{obj.kode_barang} - {obj.nama_barang}',
+                'keterangan': obj.spesifikasi or '', 'url': url_for('barang.detail', id=obj.id)}
+    if jenis == 'aset_tetap':
+        return {'id': obj.id, 'label': f'{obj.kode_aset} - {obj.nama_aset}',
+                'keterangan': obj.nomor_kontrak or obj.kontrak_spk or '',
+                'url': url_for('aset_tetap.detail', id=obj.id)}
+    if jenis == 'kontrak':
+        return {'id': obj.id, 'label': obj.nomor_kontrak,
+                'keterangan': obj.deskripsi or '', 'url': url_for('kontrak.detail', id=obj.id)}
+    if jenis == 'merk':
+        label = f'{obj.nama_merk} {obj.tipe}' if obj.tipe else obj.nama_merk
+        return {'id': obj.id, 'label': label,
+                'keterangan': obj.nomor_kontrak or '', 'url': url_for('merk.detail', id=obj.id)}
+    return {'id': obj.id, 'label': obj.nama_kategori,
+            'keterangan': obj.deskripsi or '', 'url': url_for('kategori.edit', id=obj.id)}
 
+
+def _hasil_cari(kueri):
+    return {
+        jenis: [_item_cari(jenis, obj) for obj in daftar]
+        for jenis, daftar in cari_semua(kueri).items()
+    }
+
+
+@bp.route('/cari')
+@login_required
+def cari():
+    """Pencarian gabungan barang, aset tetap, kontrak, merk dan kategori"""
+    kueri = request.args.get('q', '', type=str).strip()
+    hasil = _hasil_cari(kueri) if kueri else {}
+    return render_template('dashboard/cari.html',
+                         title='Pencarian',
+                         kueri=kueri,
+                         hasil=hasil,
+                         judul_hasil=JUDUL_HASIL_CARI)
+
+
+@bp.route('/api/cari')
+@login_required
+def api_cari():
+    """Hasil pencarian gabungan dalam bentuk JSON"""
+    kueri = request.args.get('q', '', type=str).strip()
+    return jsonify({'q': kueri, 'hasil': _hasil_cari(kueri) if kueri else {}})
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+bp = Blueprint('impor', __name__, url_prefix='/impor')
+
+from app.impor import routes
@@ -0,0 +1,14 @@
+from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileAllowed, FileRequired
+from wtforms import SelectField, SubmitField
+from wtforms.validators import DataRequired
+from app.utils.impor_data import JUDUL_IMPOR
+
+class ImporForm(FlaskForm):
+    jenis = SelectField('Jenis Data', choices=list(JUDUL_IMPOR.items()),
+                        validators=[DataRequired(message='Jenis data wajib dipilih')])
+    berkas = FileField('File', validators=[
+        FileRequired(message='File wajib dipilih'),
+        FileAllowed(['xlsx', 'csv'], message='File harus .xlsx atau .csv')
+    ])
+    submit = SubmitField('Impor')
@@ -0,0 +1,95 @@
+from flask import render_template, request, flash, abort, send_file, current_app, Response
+from flask_login import login_required, current_user
+from app.impor import bp
+from app.impor.forms import ImporForm
+from app.models.user import UserLog
+from app.utils.impor_data import JUDUL_IMPOR, FileImporTidakValid, impor_file, kolom_templat
+from app import db
+import csv
+import io
+import os
+import re
+import uuid
+
+# Jumlah galat yang ditampilkan di halaman; selengkapnya di file laporan galat
+BATAS_GALAT_TAMPIL = 100
+
+def _direktori_galat():
+    direktori = os.path.join(current_app.instance_path, 'impor_galat')
+    os.makedirs(direktori, exist_ok=True)
+    return direktori
+
+@bp.route('/', methods=['GET', 'POST'])
+@login_required
+def index():
+    """Halaman impor data dari file XLSX/CSV"""
+    form = ImporForm()
+    hasil = None
+    file_galat = None
+    
+    if form.validate_on_submit():
+        berkas = form.berkas.data
+        try:
+            hasil = impor_file(form.jenis.data, berkas.stream, berkas.filename)
+        except FileImporTidakValid as exc:
+            flash(str(exc), 'danger')
+        except Exception as exc:
+            db.session.rollback()
+            current_app.logger.exception('Impor data gagal')
+            flash(f'Impor dihentikan karena kesalahan database: {exc}. '
+                  f'Chunk yang sudah tersimpan tidak dibatalkan.', 'danger')
+        
+        if hasil is not None:
+            if hasil.galat:
+                file_galat = f'{uuid.uuid4().hex}.csv'
+                with open(os.path.join(_direktori_galat(), file_galat), 'w', encoding='utf-8', newline='') as f:
+                    hasil.tulis_laporan_galat(f)
+            
+            # Log aktivitas
+            UserLog.log_activity(
+                user_id=current_user.id,
+                activity='Impor Data',
+                description=(
+                    f'Impor {JUDUL_IMPOR[hasil.jenis]} dari {berkas.filename}: '
+                    f'{hasil.jumlah_disimpan} dari {hasil.jumlah_baris} baris disimpan, '
+                    f'{len(hasil.galat)} galat'
+                ),
+                ip_address=request.remote_addr
+            )
+            
+            kategori = 'success' if not hasil.galat else 'warning'
+            flash(f'{hasil.jumlah_disimpan} dari {hasil.jumlah_baris} baris berhasil diimpor.', kategori)
+    
+    return render_template('impor/index.html',
+                         title='Impor Data',
+                         form=form,
+                         hasil=hasil,
+                         galat_tampil=hasil.galat[:BATAS_GALAT_TAMPIL] if hasil else [],
+                         file_galat=file_galat,
+                         judul_impor=JUDUL_IMPOR)
+
+@bp.route('/galat/<nama_file>')
+@login_required
+def unduh_galat(nama_file):
+    """Unduh laporan galat impor (CSV)"""
+    if not re.fullmatch(r'[0-9a-f]{32}\.csv', nama_file):
+        abort(404)
+    path = os.path.join(_direktori_galat(), nama_file)
+    if not os.path.exists(path):
+        abort(404)
+    return send_file(path, mimetype='text/csv', as_attachment=True,
+                     download_name='Laporan_Galat_Impor.csv')
+
+@bp.route('/templat/<jenis>.csv')
+@login_required
+def templat(jenis):
+    """File CSV berisi header kolom untuk jenis impor tersebut"""
+    if jenis not in JUDUL_IMPOR:
+        abort(404)
+    output = io.StringIO()
+    csv.writer(output).writerow(kolom_templat(jenis))
+    return Response(
+        output.getvalue(),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename=Templat_Impor_{jenis}.csv'}
+    )
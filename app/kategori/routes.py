@@ -3,7 +3,9 @@ from flask_login import login_required
 from app.kategori import bp
 from app.models.kategori import KategoriBarang
 from app.models.aset_tetap import AsetTetap
+from app.models.pencarian import terapkan_pencarian
 from app.kategori.forms import KategoriForm
+from app.utils.cache_data import hapus_pilihan
 from app import db
 
 @bp.route('/')
@@ -15,13 +17,14 @@ def index():
     query = KategoriBarang.query
     
     if search:
-        query = query.filter(KategoriBarang.nama_kategori.like(f'%{search}%'))
+        query = terapkan_pencarian(query, 'kategori', search)
     
     pagination = query.order_by(KategoriBarang.created_at.desc()).paginate(
         page=page, per_page=10, error_out=False
     )
     
-    kategori_list = pagination.items
+    # Total item per kategori di halaman ini dihitung dengan query GROUP BY
+    kategori_list = KategoriBarang.muat_total(pagination.items)
     
     return render_template('kategori/index.html',
                          title='Data Kategori Barang',
@@ -42,6 +45,7 @@ def tambah():
         
         db.session.add(kategori)
         db.session.commit()
+        hapus_pilihan('kategori')
         
         flash('Kategori berhasil ditambahkan!', 'success')
         return redirect(url_for('kategori.index'))
@@ -61,6 +65,7 @@ def edit(id):
         kategori.deskripsi = form.deskripsi.data
         
         db.session.commit()
+        hapus_pilihan('kategori')
         
         flash('Kategori berhasil diupdate!', 'success')
         return redirect(url_for('kategori.index'))
@@ -84,6 +89,7 @@ def hapus(id):
     
     db.session.delete(kategori)
     db.session.commit()
+    hapus_pilihan('kategori')
     
     flash('Kategori berhasil dihapus!', 'success')
     return redirect(url_for('kategori.index'))
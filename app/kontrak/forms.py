@@ -1,7 +1,8 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, DateField, TextAreaField, SubmitField, IntegerField, DecimalField, SelectField
+from wtforms import StringField, DateField, TextAreaField, SubmitField, IntegerField, DecimalField
 from wtforms.validators import DataRequired, Length, Optional, NumberRange, ValidationError
 from app.models.kontrak import KontrakBarang
+from app.utils.autocomplete import AutocompleteField
 
 class KontrakForm(FlaskForm):
     nomor_kontrak = StringField('Nomor Kontrak/SPK', validators=[
@@ -26,9 +27,9 @@ class KontrakForm(FlaskForm):
 
 
 class BarangKontrakForm(FlaskForm):
-    barang_id = SelectField('Pilih Barang', coerce=int, validators=[
+    barang_id = AutocompleteField('Pilih Barang', coerce=int, validators=[
         DataRequired(message='Barang wajib dipilih')
-    ])
+    ], sumber='barang', placeholder=(0, '-- Pilih Barang --'))
     qty_kontrak = IntegerField('Jumlah/Qty', validators=[
         DataRequired(message='Qty wajib diisi'),
         NumberRange(min=1, message='Qty minimal 1')
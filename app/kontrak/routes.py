@@ -5,7 +5,9 @@ from app.kontrak.forms import KontrakForm, BarangKontrakForm
 from app.models.kontrak import KontrakBarang, BarangKontrak
 from app.models.barang import Barang
 from app.models.user import UserLog
+from app.models.pencarian import terapkan_pencarian
 from app import db
+from sqlalchemy.orm import joinedload
 
 @bp.route('/')
 @login_required
@@ -17,14 +19,13 @@ def index():
     query = KontrakBarang.query
     
     if search:
-        query = query.filter(
-            (KontrakBarang.nomor_kontrak.like(f'%{search}%')) |
-            (KontrakBarang.deskripsi.like(f'%{search}%'))
-        )
+        query = terapkan_pencarian(query, 'kontrak', search)
     
     kontrak_list = query.order_by(KontrakBarang.created_at.desc()).paginate(
         page=page, per_page=10, error_out=False
     )
+    # Total per kontrak di halaman ini diambil dengan satu query GROUP BY
+    KontrakBarang.muat_total(kontrak_list.items)
     
     return render_template('kontrak/index.html',
                          title='Daftar Kontrak/SPK',
@@ -122,16 +123,19 @@ def detail(id):
     """Halaman detail kontrak"""
     kontrak = KontrakBarang.query.get_or_404(id)
     
-    # Form untuk tambah barang ke kontrak
+    # Form untuk tambah barang ke kontrak (pilihan barang lewat autocomplete)
     form = BarangKontrakForm()
-    form.barang_id.choices = [(0, '-- Pilih Barang --')] + [
-        (b.id, f'{b.kode_barang} - {b.nama_barang}') 
-        for b in Barang.query.order_by(Barang.nama_barang).all()
-    ]
+    
+    # Barang beserta kategori/merk dimuat sekaligus untuk tabel detail
+    barang_kontrak_list = kontrak.barang_kontrak.options(
+        joinedload(BarangKontrak.barang).joinedload(Barang.kategori),
+        joinedload(BarangKontrak.barang).joinedload(Barang.merk)
+    ).all()
     
     return render_template('kontrak/detail.html',
                          title=f'Detail Kontrak {kontrak.nomor_kontrak}',
                          kontrak=kontrak,
+                         barang_kontrak_list=barang_kontrak_list,
                          form=form)
 
 @bp.route('/detail/<int:id>/tambah-barang', methods=['POST'])
@@ -141,12 +145,6 @@ def tambah_barang(id):
     kontrak = KontrakBarang.query.get_or_404(id)
     form = BarangKontrakForm()
     
-    # Populate choices
-    form.barang_id.choices = [(0, '-- Pilih Barang --')] + [
-        (b.id, f'{b.kode_barang} - {b.nama_barang}') 
-        for b in Barang.query.order_by(Barang.nama_barang).all()
-    ]
-    
     if form.validate_on_submit():
         if form.barang_id.data == 0:
             flash('Silakan pilih barang terlebih dahulu!', 'warning')
@@ -172,7 +170,7 @@ def tambah_barang(id):
         db.session.add(barang_kontrak)
         db.session.commit()
         
-        barang = Barang.query.get(form.barang_id.data)
+        barang = form.barang_id.objek
         
         # Log aktivitas
         UserLog.log_activity(
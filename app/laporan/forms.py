@@ -3,6 +3,8 @@ from wtforms import SelectField, DateField, StringField, SubmitField
 from wtforms.validators import Optional
 from datetime import datetime, timedelta
 
+from app.utils.autocomplete import AutocompleteField
+
 
 class LaporanBarangForm(FlaskForm):
     """Form filter laporan barang"""
@@ -61,3 +63,12 @@ class LaporanKerusakanFilterForm(FlaskForm):
     tanggal_awal = DateField('Tanggal Awal', format='%Y-%m-%d', validators=[Optional()])
     tanggal_akhir = DateField('Tanggal Akhir', format='%Y-%m-%d', validators=[Optional()])
     submit = SubmitField('Tampilkan')
+
+
+class KartuStokForm(FlaskForm):
+    """Form filter kartu stok barang"""
+    kode_barang = AutocompleteField('Barang', validators=[Optional()], sumber='barang_kode',
+                                    placeholder=('', '-- Pilih Barang --'))
+    tanggal_awal = DateField('Tanggal Awal', format='%Y-%m-%d', validators=[Optional()])
+    tanggal_akhir = DateField('Tanggal Akhir', format='%Y-%m-%d', validators=[Optional()])
+    submit = SubmitField('Tampilkan')
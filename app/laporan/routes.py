@@ -1,19 +1,55 @@
-from flask import render_template, request, send_file, flash, redirect, url_for
-from flask_login import login_required
+from flask import render_template, stream_template, request, send_file, flash, redirect, url_for, abort, jsonify
+from flask_login import login_required, current_user
 from app.laporan import laporan_bp
 from app.laporan.forms import (
     LaporanBarangForm,
     LaporanTransaksiForm,
     LaporanKontrakForm,
-    LaporanKerusakanFilterForm
+    LaporanKerusakanFilterForm,
+    KartuStokForm
 )
-from app.models import Barang, BarangMasuk, BarangKeluar, KontrakBarang, KategoriBarang, MerkBarang
+from app.models import Barang, BarangMasuk, BarangKeluar, KontrakBarang, BarangKontrak
 from app.models.aset_tetap import AsetTetap
-from app.models.merk_aset_tetap import MerkAsetTetap
 from app.models.laporan_kerusakan import LaporanKerusakan
-from app.utils.excel_export import export_barang_to_excel, export_kontrak_to_excel, export_transaksi_to_excel
-from app.utils.pdf_export import export_barang_to_pdf, export_kontrak_to_pdf, export_transaksi_to_pdf
+from app.models.report_job import ReportJob
+from app.utils.excel_export import (
+    export_barang_to_excel,
+    export_kontrak_to_excel,
+    export_transaksi_to_excel,
+    export_kartu_stok_to_excel,
+    export_aset_tetap_to_excel
+)
+from app.utils.pdf_export import (
+    export_barang_to_pdf,
+    export_kontrak_to_pdf,
+    export_transaksi_to_pdf,
+    export_kartu_stok_to_pdf,
+    export_aset_tetap_to_pdf
+)
+from app.utils.data_export import (
+    export_stream_response,
+    KOLOM_BARANG,
+    KOLOM_KONTRAK,
+    KOLOM_TRANSAKSI,
+    KOLOM_ASET_TETAP,
+    KOLOM_KERUSAKAN
+)
+from app.utils.kartu_stok import KartuStok
+from app.utils.report_cache import ambil_atau_buat
+from app.utils.cache_data import pilihan
+from app.utils.report_job import tambah_job
+from app.utils.surat_kerusakan import cetak_gabungan, cetak_zip, path_logo_unhas
+from app import db
 from datetime import datetime
+import os
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+# Jumlah baris per batch saat export membaca data lewat server-side cursor
+UKURAN_BATCH_EXPORT = 1000
+
+# Batas jumlah surat laporan kerusakan sekali cetak massal
+BATAS_CETAK_SURAT = 500
 
 
 @laporan_bp.route('/')
@@ -23,6 +59,230 @@ def index():
     return render_template('laporan/index.html', title='Laporan')
 
 
+def _query_laporan_barang():
+    """Query (Barang, stok_akhir) sesuai filter laporan barang; filter status dihitung di SQL"""
+    query = Barang.query_dengan_stok().options(joinedload(Barang.kategori), joinedload(Barang.merk))
+    
+    if request.args.get('kategori_id') and int(request.args.get('kategori_id')) > 0:
+        query = query.filter(Barang.kategori_id == int(request.args.get('kategori_id')))
+    
+    if request.args.get('merk_id') and int(request.args.get('merk_id')) > 0:
+        query = query.filter(Barang.merk_id == int(request.args.get('merk_id')))
+    
+    # Filter by status
+    stok_akhir = Barang.stok_akhir_expr()
+    status = request.args.get('status')
+    if status == 'rendah':
+        query = query.filter(stok_akhir < 10)
+    elif status == 'sedang':
+        query = query.filter(stok_akhir >= 10, stok_akhir < 50)
+    elif status == 'aman':
+        query = query.filter(stok_akhir >= 50)
+    
+    return query.order_by(Barang.id)
+
+
+def _iter_laporan_barang(query):
+    """Ubah baris (Barang, stok_akhir) menjadi dict yang dipakai template/exporter"""
+    for barang, stok_akhir in query:
+        yield {
+            'barang': barang,
+            'stok_akhir': stok_akhir
+        }
+
+
+def _tanggal_arg(nama):
+    """Tanggal dari query string (format YYYY-MM-DD) atau None"""
+    if request.args.get(nama):
+        return datetime.strptime(request.args.get(nama), '%Y-%m-%d')
+    return None
+
+
+def _query_laporan_kontrak():
+    """Query kontrak sesuai filter tahun/bulan laporan kontrak"""
+    query = KontrakBarang.query
+
+    if request.args.get('tahun') and int(request.args.get('tahun')) > 0:
+        tahun = int(request.args.get('tahun'))
+        query = query.filter(KontrakBarang.tanggal_kontrak.between(
+            datetime(tahun, 1, 1),
+            datetime(tahun, 12, 31)
+        ))
+
+    if request.args.get('bulan'):
+        bulan = int(request.args.get('bulan'))
+        tahun = int(request.args.get('tahun', datetime.now().year))
+        query = query.filter(KontrakBarang.tanggal_kontrak.between(
+            datetime(tahun, bulan, 1),
+            datetime(tahun, bulan, 28 if bulan == 2 else 30 if bulan in [4, 6, 9, 11] else 31)
+        ))
+
+    return query.order_by(KontrakBarang.tanggal_kontrak.desc())
+
+
+def _query_laporan_transaksi(model):
+    """Query BarangMasuk/BarangKeluar sesuai filter laporan transaksi"""
+    query = model.query.options(joinedload(model.barang))
+
+    tanggal_awal = _tanggal_arg('tanggal_awal')
+    if tanggal_awal:
+        query = query.filter(model.tanggal >= tanggal_awal)
+
+    tanggal_akhir = _tanggal_arg('tanggal_akhir')
+    if tanggal_akhir:
+        query = query.filter(model.tanggal <= tanggal_akhir)
+
+    if request.args.get('kode_barang'):
+        query = query.filter(model.kode_barang.like(f"%{request.args.get('kode_barang')}%"))
+
+    return query.order_by(model.tanggal.desc())
+
+
+def _query_laporan_aset_tetap():
+    """Query aset tetap sesuai filter kategori/jenis aset"""
+    query = AsetTetap.query.options(joinedload(AsetTetap.kategori), joinedload(AsetTetap.merk_aset_tetap))
+
+    if request.args.get('kategori_id') and int(request.args.get('kategori_id')) > 0:
+        query = query.filter_by(kategori_id=int(request.args.get('kategori_id')))
+
+    if request.args.get('merk_aset_tetap_id') and int(request.args.get('merk_aset_tetap_id')) > 0:
+        query = query.filter_by(merk_aset_tetap_id=int(request.args.get('merk_aset_tetap_id')))
+
+    return query.order_by(AsetTetap.kode_aset)
+
+
+def _query_laporan_kerusakan():
+    """Query laporan kerusakan sesuai filter; tanggal yang tidak valid diabaikan"""
+    query = LaporanKerusakan.query.options(joinedload(LaporanKerusakan.aset_tetap))
+
+    aset_tetap_id = request.args.get('aset_tetap_id', type=int)
+    if aset_tetap_id and aset_tetap_id > 0:
+        query = query.filter(LaporanKerusakan.aset_tetap_id == aset_tetap_id)
+
+    status = request.args.get('status', '', type=str)
+    if status in ('draft', 'terkirim', 'selesai'):
+        query = query.filter(LaporanKerusakan.status == status)
+
+    try:
+        tanggal_awal = _tanggal_arg('tanggal_awal')
+        if tanggal_awal:
+            query = query.filter(LaporanKerusakan.tanggal_diketahui_rusak >= tanggal_awal.date())
+    except ValueError:
+        pass
+
+    try:
+        tanggal_akhir = _tanggal_arg('tanggal_akhir')
+        if tanggal_akhir:
+            query = query.filter(LaporanKerusakan.tanggal_diketahui_rusak <= tanggal_akhir.date())
+    except ValueError:
+        pass
+
+    return query.order_by(
+        LaporanKerusakan.tanggal_diketahui_rusak.desc(),
+        LaporanKerusakan.created_at.desc()
+    )
+
+
+
+# ---------------------------------------------------------------------------
+# Pembuat file export Excel/PDF. Dipakai route export langsung maupun worker
+# report job (dijalankan dalam test_request_context dengan query string job).
+# Masing-masing mengembalikan (file, nama_file).
+# ---------------------------------------------------------------------------
+
+EKSTENSI_EXPORT = {'excel': 'xlsx', 'pdf': 'pdf'}
+
+MIMETYPE_EXPORT = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+    'zip': 'application/zip',
+}
+
+
+def _nama_file(nama, format_file):
+    return f'{nama}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{EKSTENSI_EXPORT[format_file]}'
+
+
+def _kirim_export(buffer, filename):
+    return send_file(buffer, 
+                    mimetype=MIMETYPE_EXPORT[filename.rsplit('.', 1)[-1]],
+                    as_attachment=True,
+                    download_name=filename)
+
+
+def _ekspor_barang(format_file):
+    query = _query_laporan_barang()
+    jumlah = query.order_by(None).count()
+    
+    # Baris dibaca bertahap lewat server-side cursor
+    rows = _iter_laporan_barang(query.yield_per(UKURAN_BATCH_EXPORT))
+    exporter = export_barang_to_excel if format_file == 'excel' else export_barang_to_pdf
+    return exporter(rows, jumlah=jumlah), _nama_file('Laporan_Barang', format_file)
+
+
+def _ekspor_kontrak(format_file):
+    kontrak_list = KontrakBarang.muat_total(_query_laporan_kontrak())
+    exporter = export_kontrak_to_excel if format_file == 'excel' else export_kontrak_to_pdf
+    return exporter(kontrak_list), _nama_file('Laporan_Kontrak', format_file)
+
+
+def _ekspor_transaksi(model, jenis, format_file):
+    query = _query_laporan_transaksi(model)
+    jumlah = query.order_by(None).count()
+    
+    exporter = export_transaksi_to_excel if format_file == 'excel' else export_transaksi_to_pdf
+    buffer = exporter(
+        query.yield_per(UKURAN_BATCH_EXPORT), jenis,
+        _tanggal_arg('tanggal_awal'), _tanggal_arg('tanggal_akhir'), jumlah=jumlah
+    )
+    nama = 'Laporan_Barang_Masuk' if jenis == 'masuk' else 'Laporan_Barang_Keluar'
+    return buffer, _nama_file(nama, format_file)
+
+
+def _ekspor_transaksi_masuk(format_file):
+    return _ekspor_transaksi(BarangMasuk, 'masuk', format_file)
+
+
+def _ekspor_transaksi_keluar(format_file):
+    return _ekspor_transaksi(BarangKeluar, 'keluar', format_file)
+
+
+def _ekspor_aset_tetap(format_file):
+    query = _query_laporan_aset_tetap()
+    rows = query.yield_per(UKURAN_BATCH_EXPORT)
+    if format_file == 'excel':
+        buffer = export_aset_tetap_to_excel(rows)
+    else:
+        buffer = export_aset_tetap_to_pdf(rows, jumlah=query.order_by(None).count())
+    return buffer, _nama_file('Laporan_Aset_Tetap', format_file)
+
+
+def _ekspor_kartu_stok(format_file):
+    """Sama seperti export lain, tetapi None jika barang belum dipilih/tidak ditemukan"""
+    kartu = _kartu_stok_dari_request()
+    if kartu is None:
+        return None
+    
+    exporter = export_kartu_stok_to_excel if format_file == 'excel' else export_kartu_stok_to_pdf
+    return exporter(kartu), _nama_file(f'Kartu_Stok_{kartu.barang.kode_barang}', format_file)
+
+
+# Jenis laporan yang bisa di-export, termasuk lewat report job
+EKSPOR_LAPORAN = {
+    'barang': _ekspor_barang,
+    'kontrak': _ekspor_kontrak,
+    'transaksi_masuk': _ekspor_transaksi_masuk,
+    'transaksi_keluar': _ekspor_transaksi_keluar,
+    'aset_tetap': _ekspor_aset_tetap,
+    'kartu_stok': _ekspor_kartu_stok,
+}
+
+
+def _ekspor(jenis, format_file):
+    """File export dari cache laporan; dibuat lalu disimpan ke cache jika belum ada"""
+    return ambil_atau_buat(jenis, format_file, request.args, EKSPOR_LAPORAN[jenis])
+
+
 @laporan_bp.route('/barang')
 @login_required
 def laporan_barang():
@@ -30,46 +290,20 @@ def laporan_barang():
     form = LaporanBarangForm()
     
     # Populate choices
-    form.kategori_id.choices = [(0, 'Semua')] + [(k.id, k.nama_kategori) for k in KategoriBarang.query.all()]
-    form.merk_id.choices = [(0, 'Semua')] + [(m.id, m.nama_merk) for m in MerkBarang.query.all()]
-    
-    # Query barang
-    query = Barang.query
+    form.kategori_id.choices = [(0, 'Semua')] + pilihan('kategori')
+    form.merk_id.choices = [(0, 'Semua')] + pilihan('merk')
     
-    # Apply filters
     if request.args.get('kategori_id') and int(request.args.get('kategori_id')) > 0:
-        query = query.filter_by(kategori_id=int(request.args.get('kategori_id')))
         form.kategori_id.data = int(request.args.get('kategori_id'))
     
     if request.args.get('merk_id') and int(request.args.get('merk_id')) > 0:
-        query = query.filter_by(merk_id=int(request.args.get('merk_id')))
         form.merk_id.data = int(request.args.get('merk_id'))
     
-    barang_list = query.all()
-    
-    # Calculate stok akhir
-    data = []
-    for barang in barang_list:
-        stok_akhir = barang.get_stok_akhir()
-        
-        # Filter by status
-        if request.args.get('status'):
-            status = request.args.get('status')
-            if status == 'rendah' and stok_akhir >= 10:
-                continue
-            elif status == 'sedang' and (stok_akhir < 10 or stok_akhir >= 50):
-                continue
-            elif status == 'aman' and stok_akhir < 50:
-                continue
-        
-        data.append({
-            'barang': barang,
-            'stok_akhir': stok_akhir
-        })
-    
     if request.args.get('status'):
         form.status.data = request.args.get('status')
     
+    data = list(_iter_laporan_barang(_query_laporan_barang()))
+    
     return render_template('laporan/barang.html', 
                           title='Laporan Barang',
                           form=form,
@@ -80,94 +314,14 @@ def laporan_barang():
 @login_required
 def export_barang_excel():
     """Export laporan barang ke Excel"""
-    # Get filters from request
-    query = Barang.query
-    
-    if request.args.get('kategori_id') and int(request.args.get('kategori_id')) > 0:
-        query = query.filter_by(kategori_id=int(request.args.get('kategori_id')))
-    
-    if request.args.get('merk_id') and int(request.args.get('merk_id')) > 0:
-        query = query.filter_by(merk_id=int(request.args.get('merk_id')))
-    
-    barang_list = query.all()
-    
-    # Calculate stok akhir
-    data = []
-    for barang in barang_list:
-        stok_akhir = barang.get_stok_akhir()
-        
-        # Filter by status
-        if request.args.get('status'):
-            status = request.args.get('status')
-            if status == 'rendah' and stok_akhir >= 10:
-                continue
-            elif status == 'sedang' and (stok_akhir < 10 or stok_akhir >= 50):
-                continue
-            elif status == 'aman' and stok_akhir < 50:
-                continue
-        
-        data.append({
-            'barang': barang,
-            'stok_akhir': stok_akhir
-        })
-    
-    # Generate Excel
-    buffer = export_barang_to_excel(data)
-    
-    # Generate filename
-    filename = f'Laporan_Barang_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    
-    return send_file(buffer, 
-                    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                    as_attachment=True,
-                    download_name=filename)
+    return _kirim_export(*_ekspor('barang', 'excel'))
 
 
 @laporan_bp.route('/barang/export-pdf')
 @login_required
 def export_barang_pdf():
     """Export laporan barang ke PDF"""
-    # Get filters from request
-    query = Barang.query
-    
-    if request.args.get('kategori_id') and int(request.args.get('kategori_id')) > 0:
-        query = query.filter_by(kategori_id=int(request.args.get('kategori_id')))
-    
-    if request.args.get('merk_id') and int(request.args.get('merk_id')) > 0:
-        query = query.filter_by(merk_id=int(request.args.get('merk_id')))
-    
-    barang_list = query.all()
-    
-    # Calculate stok akhir
-    data = []
-    for barang in barang_list:
-        stok_akhir = barang.get_stok_akhir()
-        
-        # Filter by status
-        if request.args.get('status'):
-            status = request.args.get('status')
-            if status == 'rendah' and stok_akhir >= 10:
-                continue
-            elif status == 'sedang' and (stok_akhir < 10 or stok_akhir >= 50):
-                continue
-            elif status == 'aman' and stok_akhir < 50:
-                continue
-        
-        data.append({
-            'barang': barang,
-            'stok_akhir': stok_akhir
-        })
-    
-    # Generate PDF
-    buffer = export_barang_to_pdf(data)
-    
-    # Generate filename
-    filename = f'Laporan_Barang_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-    
-    return send_file(buffer, 
-                    mimetype='application/pdf',
-                    as_attachment=True,
-                    download_name=filename)
+    return _kirim_export(*_ekspor('barang', 'pdf'))
 
 
 @laporan_bp.route('/kontrak')
@@ -180,28 +334,13 @@ def laporan_kontrak():
     current_year = datetime.now().year
     form.tahun.choices = [(0, 'Semua')] + [(y, str(y)) for y in range(current_year - 5, current_year + 2)]
     
-    # Query kontrak
-    query = KontrakBarang.query
-    
-    # Apply filters
     if request.args.get('tahun') and int(request.args.get('tahun')) > 0:
-        tahun = int(request.args.get('tahun'))
-        query = query.filter(KontrakBarang.tanggal_kontrak.between(
-            datetime(tahun, 1, 1),
-            datetime(tahun, 12, 31)
-        ))
-        form.tahun.data = tahun
+        form.tahun.data = int(request.args.get('tahun'))
     
     if request.args.get('bulan'):
-        bulan = int(request.args.get('bulan'))
-        tahun = int(request.args.get('tahun', current_year))
-        query = query.filter(KontrakBarang.tanggal_kontrak.between(
-            datetime(tahun, bulan, 1),
-            datetime(tahun, bulan, 28 if bulan == 2 else 30 if bulan in [4, 6, 9, 11] else 31)
-        ))
-        form.bulan.data = str(bulan)
+        form.bulan.data = str(int(request.args.get('bulan')))
     
-    kontrak_list = query.order_by(KontrakBarang.tanggal_kontrak.desc()).all()
+    kontrak_list = KontrakBarang.muat_total(_query_laporan_kontrak())
     
     return render_template('laporan/kontrak.html', 
                           title='Laporan Kontrak',
@@ -213,72 +352,14 @@ def laporan_kontrak():
 @login_required
 def export_kontrak_excel():
     """Export laporan kontrak ke Excel"""
-    # Get filters from request
-    query = KontrakBarang.query
-    
-    if request.args.get('tahun') and int(request.args.get('tahun')) > 0:
-        tahun = int(request.args.get('tahun'))
-        query = query.filter(KontrakBarang.tanggal_kontrak.between(
-            datetime(tahun, 1, 1),
-            datetime(tahun, 12, 31)
-        ))
-    
-    if request.args.get('bulan'):
-        bulan = int(request.args.get('bulan'))
-        tahun = int(request.args.get('tahun', datetime.now().year))
-        query = query.filter(KontrakBarang.tanggal_kontrak.between(
-            datetime(tahun, bulan, 1),
-            datetime(tahun, bulan, 28 if bulan == 2 else 30 if bulan in [4, 6, 9, 11] else 31)
-        ))
-    
-    kontrak_list = query.order_by(KontrakBarang.tanggal_kontrak.desc()).all()
-    
-    # Generate Excel
-    buffer = export_kontrak_to_excel(kontrak_list)
-    
-    # Generate filename
-    filename = f'Laporan_Kontrak_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    
-    return send_file(buffer, 
-                    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                    as_attachment=True,
-                    download_name=filename)
+    return _kirim_export(*_ekspor('kontrak', 'excel'))
 
 
 @laporan_bp.route('/kontrak/export-pdf')
 @login_required
 def export_kontrak_pdf():
     """Export laporan kontrak ke PDF"""
-    # Get filters from request
-    query = KontrakBarang.query
-    
-    if request.args.get('tahun') and int(request.args.get('tahun')) > 0:
-        tahun = int(request.args.get('tahun'))
-        query = query.filter(KontrakBarang.tanggal_kontrak.between(
-            datetime(tahun, 1, 1),
-            datetime(tahun, 12, 31)
-        ))
-    
-    if request.args.get('bulan'):
-        bulan = int(request.args.get('bulan'))
-        tahun = int(request.args.get('tahun', datetime.now().year))
-        query = query.filter(KontrakBarang.tanggal_kontrak.between(
-            datetime(tahun, bulan, 1),
-            datetime(tahun, bulan, 28 if bulan == 2 else 30 if bulan in [4, 6, 9, 11] else 31)
-        ))
-    
-    kontrak_list = query.order_by(KontrakBarang.tanggal_kontrak.desc()).all()
-    
-    # Generate PDF
-    buffer = export_kontrak_to_pdf(kontrak_list)
-    
-    # Generate filename
-    filename = f'Laporan_Kontrak_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-    
-    return send_file(buffer, 
-                    mimetype='application/pdf',
-                    as_attachment=True,
-                    download_name=filename)
+    return _kirim_export(*_ekspor('kontrak', 'pdf'))
 
 
 @laporan_bp.route('/transaksi-masuk')
@@ -287,25 +368,16 @@ def laporan_transaksi_masuk():
     """Laporan barang masuk"""
     form = LaporanTransaksiForm()
     
-    # Query transaksi
-    query = BarangMasuk.query
-    
-    # Apply filters
     if request.args.get('tanggal_awal'):
-        tanggal_awal = datetime.strptime(request.args.get('tanggal_awal'), '%Y-%m-%d')
-        query = query.filter(BarangMasuk.tanggal >= tanggal_awal)
-        form.tanggal_awal.data = tanggal_awal
+        form.tanggal_awal.data = _tanggal_arg('tanggal_awal')
     
     if request.args.get('tanggal_akhir'):
-        tanggal_akhir = datetime.strptime(request.args.get('tanggal_akhir'), '%Y-%m-%d')
-        query = query.filter(BarangMasuk.tanggal <= tanggal_akhir)
-        form.tanggal_akhir.data = tanggal_akhir
+        form.tanggal_akhir.data = _tanggal_arg('tanggal_akhir')
     
     if request.args.get('kode_barang'):
-        query = query.filter(BarangMasuk.kode_barang.like(f"%{request.args.get('kode_barang')}%"))
         form.kode_barang.data = request.args.get('kode_barang')
     
-    transaksi_list = query.order_by(BarangMasuk.tanggal.desc()).all()
+    transaksi_list = _query_laporan_transaksi(BarangMasuk).all()
     
     return render_template('laporan/transaksi_masuk.html', 
                           title='Laporan Barang Masuk',
@@ -317,70 +389,14 @@ def laporan_transaksi_masuk():
 @login_required
 def export_transaksi_masuk_excel():
     """Export laporan barang masuk ke Excel"""
-    # Get filters from request
-    query = BarangMasuk.query
-    
-    tanggal_awal = None
-    tanggal_akhir = None
-    
-    if request.args.get('tanggal_awal'):
-        tanggal_awal = datetime.strptime(request.args.get('tanggal_awal'), '%Y-%m-%d')
-        query = query.filter(BarangMasuk.tanggal >= tanggal_awal)
-    
-    if request.args.get('tanggal_akhir'):
-        tanggal_akhir = datetime.strptime(request.args.get('tanggal_akhir'), '%Y-%m-%d')
-        query = query.filter(BarangMasuk.tanggal <= tanggal_akhir)
-    
-    if request.args.get('kode_barang'):
-        query = query.filter(BarangMasuk.kode_barang.like(f"%{request.args.get('kode_barang')}%"))
-    
-    transaksi_list = query.order_by(BarangMasuk.tanggal.desc()).all()
-    
-    # Generate Excel
-    buffer = export_transaksi_to_excel(transaksi_list, 'masuk', tanggal_awal, tanggal_akhir)
-    
-    # Generate filename
-    filename = f'Laporan_Barang_Masuk_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    
-    return send_file(buffer, 
-                    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                    as_attachment=True,
-                    download_name=filename)
+    return _kirim_export(*_ekspor('transaksi_masuk', 'excel'))
 
 
 @laporan_bp.route('/transaksi-masuk/export-pdf')
 @login_required
 def export_transaksi_masuk_pdf():
     """Export laporan barang masuk ke PDF"""
-    # Get filters from request
-    query = BarangMasuk.query
-    
-    tanggal_awal = None
-    tanggal_akhir = None
-    
-    if request.args.get('tanggal_awal'):
-        tanggal_awal = datetime.strptime(request.args.get('tanggal_awal'), '%Y-%m-%d')
-        query = query.filter(BarangMasuk.tanggal >= tanggal_awal)
-    
-    if request.args.get('tanggal_akhir'):
-        tanggal_akhir = datetime.strptime(request.args.get('tanggal_akhir'), '%Y-%m-%d')
-        query = query.filter(BarangMasuk.tanggal <= tanggal_akhir)
-    
-    if request.args.get('kode_barang'):
-        query = query.filter(BarangMasuk.kode_barang.like(f"%{request.args.get('kode_barang')}%"))
-    
-    transaksi_list = query.order_by(BarangMasuk.tanggal.desc()).all()
-    
-    # Generate PDF
-    buffer = export_transaksi_to_pdf(transaksi_list, 'masuk', tanggal_awal, tanggal_akhir)
-    
-    # Generate filename
-    filename = f'Laporan_Barang_Masuk_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-    
-    return send_file(buffer, 
-                    mimetype='application/pdf',
-                    as_attachment=True,
-                    download_name=filename)
+    return _kirim_export(*_ekspor('transaksi_masuk', 'pdf'))
 
 
 @laporan_bp.route('/transaksi-keluar')
@@ -389,25 +405,16 @@ def laporan_transaksi_keluar():
     """Laporan barang keluar"""
     form = LaporanTransaksiForm()
     
-    # Query transaksi
-    query = BarangKeluar.query
-    
-    # Apply filters
     if request.args.get('tanggal_awal'):
-        tanggal_awal = datetime.strptime(request.args.get('tanggal_awal'), '%Y-%m-%d')
-        query = query.filter(BarangKeluar.tanggal >= tanggal_awal)
-        form.tanggal_awal.data = tanggal_awal
+        form.tanggal_awal.data = _tanggal_arg('tanggal_awal')
     
     if request.args.get('tanggal_akhir'):
-        tanggal_akhir = datetime.strptime(request.args.get('tanggal_akhir'), '%Y-%m-%d')
-        query = query.filter(BarangKeluar.tanggal <= tanggal_akhir)
-        form.tanggal_akhir.data = tanggal_akhir
+        form.tanggal_akhir.data = _tanggal_arg('tanggal_akhir')
     
     if request.args.get('kode_barang'):
-        query = query.filter(BarangKeluar.kode_barang.like(f"%{request.args.get('kode_barang')}%"))
         form.kode_barang.data = request.args.get('kode_barang')
     
-    transaksi_list = query.order_by(BarangKeluar.tanggal.desc()).all()
+    transaksi_list = _query_laporan_transaksi(BarangKeluar).all()
     
     return render_template('laporan/transaksi_keluar.html', 
                           title='Laporan Barang Keluar',
@@ -419,70 +426,78 @@ def laporan_transaksi_keluar():
 @login_required
 def export_transaksi_keluar_excel():
     """Export laporan barang keluar ke Excel"""
-    # Get filters from request
-    query = BarangKeluar.query
-    
-    tanggal_awal = None
-    tanggal_akhir = None
-    
-    if request.args.get('tanggal_awal'):
-        tanggal_awal = datetime.strptime(request.args.get('tanggal_awal'), '%Y-%m-%d')
-        query = query.filter(BarangKeluar.tanggal >= tanggal_awal)
-    
-    if request.args.get('tanggal_akhir'):
-        tanggal_akhir = datetime.strptime(request.args.get('tanggal_akhir'), '%Y-%m-%d')
-        query = query.filter(BarangKeluar.tanggal <= tanggal_akhir)
-    
-    if request.args.get('kode_barang'):
-        query = query.filter(BarangKeluar.kode_barang.like(f"%{request.args.get('kode_barang')}%"))
-    
-    transaksi_list = query.order_by(BarangKeluar.tanggal.desc()).all()
-    
-    # Generate Excel
-    buffer = export_transaksi_to_excel(transaksi_list, 'keluar', tanggal_awal, tanggal_akhir)
-    
-    # Generate filename
-    filename = f'Laporan_Barang_Keluar_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    
-    return send_file(buffer, 
-                    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                    as_attachment=True,
-                    download_name=filename)
+    return _kirim_export(*_ekspor('transaksi_keluar', 'excel'))
 
 
 @laporan_bp.route('/transaksi-keluar/export-pdf')
 @login_required
 def export_transaksi_keluar_pdf():
     """Export laporan barang keluar ke PDF"""
-    # Get filters from request
-    query = BarangKeluar.query
+    return _kirim_export(*_ekspor('transaksi_keluar', 'pdf'))
+
+
+def _kartu_stok_dari_request():
+    """Buat KartuStok dari query string (None jika barang belum dipilih/tidak ditemukan)"""
+    kode_barang = request.args.get('kode_barang')
+    if not kode_barang:
+        return None
+    
+    barang = Barang.query.filter_by(kode_barang=kode_barang).first()
+    if barang is None:
+        return None
     
     tanggal_awal = None
     tanggal_akhir = None
-    
     if request.args.get('tanggal_awal'):
         tanggal_awal = datetime.strptime(request.args.get('tanggal_awal'), '%Y-%m-%d')
-        query = query.filter(BarangKeluar.tanggal >= tanggal_awal)
-    
     if request.args.get('tanggal_akhir'):
         tanggal_akhir = datetime.strptime(request.args.get('tanggal_akhir'), '%Y-%m-%d')
-        query = query.filter(BarangKeluar.tanggal <= tanggal_akhir)
     
-    if request.args.get('kode_barang'):
-        query = query.filter(BarangKeluar.kode_barang.like(f"%{request.args.get('kode_barang')}%"))
+    return KartuStok(barang, tanggal_awal, tanggal_akhir)
+
+
+@laporan_bp.route('/kartu-stok')
+@login_required
+def laporan_kartu_stok():
+    """Kartu stok barang (mutasi masuk/keluar dengan saldo berjalan)"""
+    form = KartuStokForm()
     
-    transaksi_list = query.order_by(BarangKeluar.tanggal.desc()).all()
+    kartu = _kartu_stok_dari_request()
+    if kartu is not None:
+        form.kode_barang.data = kartu.barang.kode_barang
+        form.kode_barang.objek = kartu.barang
+        form.tanggal_awal.data = kartu.tanggal_awal
+        form.tanggal_akhir.data = kartu.tanggal_akhir
     
-    # Generate PDF
-    buffer = export_transaksi_to_pdf(transaksi_list, 'keluar', tanggal_awal, tanggal_akhir)
+    # Baris mutasi di-stream ke template agar tidak dimuat sekaligus
+    return stream_template('laporan/kartu_stok.html',
+                           title='Kartu Stok',
+                           form=form,
+                           kartu=kartu)
+
+
+@laporan_bp.route('/kartu-stok/export-excel')
+@login_required
+def export_kartu_stok_excel():
+    """Export kartu stok ke Excel"""
+    hasil = _ekspor('kartu_stok', 'excel')
+    if hasil is None:
+        flash('Pilih barang terlebih dahulu', 'warning')
+        return redirect(url_for('laporan.laporan_kartu_stok'))
     
-    # Generate filename
-    filename = f'Laporan_Barang_Keluar_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+    return _kirim_export(*hasil)
+
+
+@laporan_bp.route('/kartu-stok/export-pdf')
+@login_required
+def export_kartu_stok_pdf():
+    """Export kartu stok ke PDF"""
+    hasil = _ekspor('kartu_stok', 'pdf')
+    if hasil is None:
+        flash('Pilih barang terlebih dahulu', 'warning')
+        return redirect(url_for('laporan.laporan_kartu_stok'))
     
-    return send_file(buffer, 
-                    mimetype='application/pdf',
-                    as_attachment=True,
-                    download_name=filename)
+    return _kirim_export(*hasil)
 
 
 @laporan_bp.route('/aset-tetap')
@@ -493,22 +508,16 @@ def laporan_aset_tetap():
     form = LaporanAsetTetapForm()
     
     # Populate choices
-    form.kategori_id.choices = [(0, 'Semua')] + [(k.id, k.nama_kategori) for k in KategoriBarang.query.all()]
-    form.merk_aset_tetap_id.choices = [(0, 'Semua')] + [(m.id, m.nama_merk) for m in MerkAsetTetap.query.all()]
+    form.kategori_id.choices = [(0, 'Semua')] + pilihan('kategori')
+    form.merk_aset_tetap_id.choices = [(0, 'Semua')] + pilihan('merk_aset_tetap')
     
-    # Query aset tetap
-    query = AsetTetap.query
-    
-    # Apply filters
     if request.args.get('kategori_id') and int(request.args.get('kategori_id')) > 0:
-        query = query.filter_by(kategori_id=int(request.args.get('kategori_id')))
         form.kategori_id.data = int(request.args.get('kategori_id'))
     
     if request.args.get('merk_aset_tetap_id') and int(request.args.get('merk_aset_tetap_id')) > 0:
-        query = query.filter_by(merk_aset_tetap_id=int(request.args.get('merk_aset_tetap_id')))
         form.merk_aset_tetap_id.data = int(request.args.get('merk_aset_tetap_id'))
     
-    aset_list = query.order_by(AsetTetap.kode_aset).all()
+    aset_list = _query_laporan_aset_tetap().all()
     
     return render_template('laporan/aset_tetap.html', 
                           title='Laporan Aset Tetap',
@@ -526,40 +535,30 @@ def laporan_kerusakan():
         for aset in AsetTetap.query.order_by(AsetTetap.kode_aset).all()
     ]
 
-    query = LaporanKerusakan.query
-
     aset_tetap_id = request.args.get('aset_tetap_id', type=int)
     if aset_tetap_id and aset_tetap_id > 0:
-        query = query.filter(LaporanKerusakan.aset_tetap_id == aset_tetap_id)
         form.aset_tetap_id.data = aset_tetap_id
 
     status = request.args.get('status', '', type=str)
     if status in ('draft', 'terkirim', 'selesai'):
-        query = query.filter(LaporanKerusakan.status == status)
         form.status.data = status
 
-    tanggal_awal_str = request.args.get('tanggal_awal', '', type=str)
-    if tanggal_awal_str:
-        try:
-            tanggal_awal = datetime.strptime(tanggal_awal_str, '%Y-%m-%d').date()
-            query = query.filter(LaporanKerusakan.tanggal_diketahui_rusak >= tanggal_awal)
-            form.tanggal_awal.data = tanggal_awal
-        except ValueError:
-            flash('Format Tanggal Awal tidak valid.', 'warning')
-
-    tanggal_akhir_str = request.args.get('tanggal_akhir', '', type=str)
-    if tanggal_akhir_str:
-        try:
-            tanggal_akhir = datetime.strptime(tanggal_akhir_str, '%Y-%m-%d').date()
-            query = query.filter(LaporanKerusakan.tanggal_diketahui_rusak <= tanggal_akhir)
-            form.tanggal_akhir.data = tanggal_akhir
-        except ValueError:
-            flash('Format Tanggal Akhir tidak valid.', 'warning')
-
-    laporan_list = query.order_by(
-        LaporanKerusakan.tanggal_diketahui_rusak.desc(),
-        LaporanKerusakan.created_at.desc()
-    ).all()
+    # Tanggal yang tidak valid diabaikan oleh filter; beri tahu pengguna
+    try:
+        tanggal_awal = _tanggal_arg('tanggal_awal')
+        if tanggal_awal:
+            form.tanggal_awal.data = tanggal_awal.date()
+    except ValueError:
+        flash('Format Tanggal Awal tidak valid.', 'warning')
+
+    try:
+        tanggal_akhir = _tanggal_arg('tanggal_akhir')
+        if tanggal_akhir:
+            form.tanggal_akhir.data = tanggal_akhir.date()
+    except ValueError:
+        flash('Format Tanggal Akhir tidak valid.', 'warning')
+
+    laporan_list = _query_laporan_kerusakan().all()
 
     return render_template(
         'laporan/kerusakan.html',
@@ -573,247 +572,190 @@ def laporan_kerusakan():
 @login_required
 def export_aset_tetap_excel():
     """Export laporan aset tetap ke Excel"""
-    # Get filters from request
-    query = AsetTetap.query
-    
-    if request.args.get('kategori_id') and int(request.args.get('kategori_id')) > 0:
-        query = query.filter_by(kategori_id=int(request.args.get('kategori_id')))
-    
-    if request.args.get('merk_aset_tetap_id') and int(request.args.get('merk_aset_tetap_id')) > 0:
-        query = query.filter_by(merk_aset_tetap_id=int(request.args.get('merk_aset_tetap_id')))
-    
-    aset_list = query.order_by(AsetTetap.kode_aset).all()
-    
-    # Generate Excel using openpyxl
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    from io import BytesIO
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'Aset Tetap'
-    
-    # Set column widths
-    ws.column_dimensions['A'].width = 5
-    ws.column_dimensions['B'].width = 15
-    ws.column_dimensions['C'].width = 25
-    ws.column_dimensions['D'].width = 15
-    ws.column_dimensions['E'].width = 15
-    ws.column_dimensions['F'].width = 20
-    ws.column_dimensions['G'].width = 25
-    ws.column_dimensions['H'].width = 20
-    
-    # Add header
-    headers = ['No', 'Kode Aset', 'Nama Aset', 'Kategori', 'Merk', 'Kontrak/SPK', 'Tempat Penggunaan', 'Nama Pengguna']
-    header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-    header_font = Font(bold=True, color='FFFFFF')
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        cell.border = border
-    
-    # Add data
-    for row, aset in enumerate(aset_list, 2):
-        ws.cell(row=row, column=1).value = row - 1
-        ws.cell(row=row, column=2).value = aset.kode_aset
-        ws.cell(row=row, column=3).value = aset.nama_aset
-        ws.cell(row=row, column=4).value = aset.kategori.nama_kategori if aset.kategori else '-'
-        ws.cell(row=row, column=5).value = aset.merk_aset_tetap.nama_merk if aset.merk_aset_tetap else '-'
-        ws.cell(row=row, column=6).value = aset.kontrak_spk or '-'
-        ws.cell(row=row, column=7).value = aset.tempat_penggunaan or '-'
-        ws.cell(row=row, column=8).value = aset.nama_pengguna or '-'
-        
-        # Apply borders and alignment
-        for col in range(1, 9):
-            cell = ws.cell(row=row, column=col)
-            cell.border = border
-            cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-    
-    # Save to BytesIO
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    
-    # Generate filename
-    filename = f'Laporan_Aset_Tetap_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    
-    return send_file(buffer, 
-                    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                    as_attachment=True,
-                    download_name=filename)
+    return _kirim_export(*_ekspor('aset_tetap', 'excel'))
 
 
 @laporan_bp.route('/aset-tetap/export-pdf')
 @login_required
 def export_aset_tetap_pdf():
     """Export laporan aset tetap ke PDF"""
-    # Get filters from request
-    query = AsetTetap.query
-    
-    if request.args.get('kategori_id') and int(request.args.get('kategori_id')) > 0:
-        query = query.filter_by(kategori_id=int(request.args.get('kategori_id')))
-    
-    if request.args.get('merk_aset_tetap_id') and int(request.args.get('merk_aset_tetap_id')) > 0:
-        query = query.filter_by(merk_aset_tetap_id=int(request.args.get('merk_aset_tetap_id')))
-    
-    aset_list = query.order_by(AsetTetap.kode_aset).all()
-    
-    # Generate PDF using reportlab
-    from reportlab.lib.pagesizes import landscape, letter
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    from io import BytesIO
-    from xml.sax.saxutils import escape
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(letter), topMargin=0.5*inch, bottomMargin=0.5*inch)
-    
-    elements = []
-    
-    # Title
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=14,
-        textColor=colors.HexColor('#366092'),
-        spaceAfter=6,
-        alignment=1  # Center
+    return _kirim_export(*_ekspor('aset_tetap', 'pdf'))
+
+
+# ---------------------------------------------------------------------------
+# Export CSV / NDJSON (streaming, untuk pipeline BI)
+# ---------------------------------------------------------------------------
+
+def _nama_file_export(nama):
+    return f'Laporan_{nama}_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+
+
+@laporan_bp.route('/barang/export-<any(csv, ndjson):jenis_file>')
+@login_required
+def export_barang_data(jenis_file):
+    """Export laporan barang ke CSV/NDJSON"""
+    query = _query_laporan_barang().yield_per(UKURAN_BATCH_EXPORT)
+    return export_stream_response(
+        _iter_laporan_barang(query), KOLOM_BARANG, jenis_file, _nama_file_export('Barang')
     )
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.grey,
-        spaceAfter=12,
-        alignment=1  # Center
+
+
+@laporan_bp.route('/kontrak/export-<any(csv, ndjson):jenis_file>')
+@login_required
+def export_kontrak_data(jenis_file):
+    """Export laporan kontrak ke CSV/NDJSON; total per kontrak dihitung dalam satu query"""
+    total = db.session.query(
+        BarangKontrak.kontrak_id.label('kontrak_id'),
+        func.count(BarangKontrak.id).label('jumlah_barang'),
+        func.sum(BarangKontrak.qty_kontrak).label('total_qty'),
+        func.sum(BarangKontrak.qty_kontrak * BarangKontrak.harga_satuan).label('total_nilai')
+    ).group_by(BarangKontrak.kontrak_id).subquery()
+
+    query = _query_laporan_kontrak().outerjoin(
+        total, total.c.kontrak_id == KontrakBarang.id
+    ).add_columns(
+        func.coalesce(total.c.jumlah_barang, 0).label('jumlah_barang'),
+        func.coalesce(total.c.total_qty, 0).label('total_qty'),
+        func.coalesce(total.c.total_nilai, 0).label('total_nilai')
     )
-    info_style = ParagraphStyle(
-        'Info',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.grey,
-        spaceAfter=12,
-        alignment=0  # Left
+
+    return export_stream_response(
+        query.yield_per(UKURAN_BATCH_EXPORT), KOLOM_KONTRAK, jenis_file, _nama_file_export('Kontrak')
     )
-    
-    elements.append(Paragraph('Laporan Daftar Aset Tetap Perpustakaan Universitas Hasanuddin', title_style))
-    elements.append(Paragraph(f'Per {datetime.now().strftime("%d %B %Y")}', subtitle_style))
-    elements.append(Paragraph(f'Total Aset: <b>{len(aset_list)} item</b> | Dicetak pada: {datetime.now().strftime("%d/%m/%Y %H:%M")}', info_style))
-
-    cell_style_left = ParagraphStyle(
-        'CellLeft',
-        parent=styles['Normal'],
-        fontName='Helvetica',
-        fontSize=7.5,
-        leading=9,
-        alignment=0,  # Left
-        wordWrap='LTR',
-        splitLongWords=1,  # force-wrap long tokens (e.g. 930/1-04/SPK/...)
+
+
+@laporan_bp.route('/transaksi-masuk/export-<any(csv, ndjson):jenis_file>')
+@login_required
+def export_transaksi_masuk_data(jenis_file):
+    """Export laporan barang masuk ke CSV/NDJSON"""
+    query = _query_laporan_transaksi(BarangMasuk).yield_per(UKURAN_BATCH_EXPORT)
+    return export_stream_response(
+        query, KOLOM_TRANSAKSI, jenis_file, _nama_file_export('Barang_Masuk')
+    )
+
+
+@laporan_bp.route('/transaksi-keluar/export-<any(csv, ndjson):jenis_file>')
+@login_required
+def export_transaksi_keluar_data(jenis_file):
+    """Export laporan barang keluar ke CSV/NDJSON"""
+    query = _query_laporan_transaksi(BarangKeluar).yield_per(UKURAN_BATCH_EXPORT)
+    return export_stream_response(
+        query, KOLOM_TRANSAKSI, jenis_file, _nama_file_export('Barang_Keluar')
     )
-    cell_style_center = ParagraphStyle('CellCenter', parent=cell_style_left, alignment=1)
-    cell_style_kontrak = ParagraphStyle(
-        'CellKontrak',
-        parent=cell_style_center,
-        fontSize=7,
-        leading=8.5,
+
+
+@laporan_bp.route('/aset-tetap/export-<any(csv, ndjson):jenis_file>')
+@login_required
+def export_aset_tetap_data(jenis_file):
+    """Export laporan aset tetap ke CSV/NDJSON"""
+    query = _query_laporan_aset_tetap().yield_per(UKURAN_BATCH_EXPORT)
+    return export_stream_response(
+        query, KOLOM_ASET_TETAP, jenis_file, _nama_file_export('Aset_Tetap')
     )
-    header_cell_style = ParagraphStyle(
-        'HeaderCell',
-        parent=cell_style_center,
-        fontName='Helvetica-Bold',
-        fontSize=8,
-        leading=10,
-        textColor=colors.whitesmoke,
+
+
+@laporan_bp.route('/kerusakan/export-<any(csv, ndjson):jenis_file>')
+@login_required
+def export_kerusakan_data(jenis_file):
+    """Export laporan kerusakan aset tetap ke CSV/NDJSON"""
+    query = _query_laporan_kerusakan().yield_per(UKURAN_BATCH_EXPORT)
+    return export_stream_response(
+        query, KOLOM_KERUSAKAN, jenis_file, _nama_file_export('Kerusakan')
     )
 
-    def p(text, style):
-        if text is None:
-            text = '-'
-        raw = str(text)
-        safe = escape(raw).replace('\n', '<br/>')
-        return Paragraph(safe, style)
-    
-    # Prepare table data
-    table_data = [[
-        p('No', header_cell_style),
-        p('Kode Aset', header_cell_style),
-        p('Nama Aset', header_cell_style),
-        p('Kategori', header_cell_style),
-        p('Merk', header_cell_style),
-        p('Kontrak/SPK', header_cell_style),
-        p('Tempat Penggunaan', header_cell_style),
-        p('Nama Pengguna', header_cell_style),
-        p('Total Barang', header_cell_style),
-    ]]
-    
-    for idx, aset in enumerate(aset_list, 1):
-        table_data.append([
-            p(idx, cell_style_center),
-            p(aset.kode_aset, cell_style_center),
-            p(aset.nama_aset, cell_style_left),
-            p(aset.kategori.nama_kategori if aset.kategori else '-', cell_style_center),
-            p(aset.merk_aset_tetap.nama_merk if aset.merk_aset_tetap else '-', cell_style_center),
-            p(aset.kontrak_spk or '-', cell_style_kontrak),
-            p(aset.tempat_penggunaan or '-', cell_style_left),
-            p(aset.nama_pengguna or '-', cell_style_left),
-            p(aset.total_barang if aset.total_barang else 0, cell_style_center),
-        ])
-    
-    # Create table with optimized column widths
-    # Landscape letter is 11 inches wide, minus 1 inch for margins = 10 inches
-    # No: 0.35", Kode Aset: 0.8", Nama Aset: 1.2", Kategori: 0.9", Merk: 0.9", Kontrak/SPK: 2.0", Tempat Penggunaan: 1.5", Nama Pengguna: 1.0", Total Barang: 0.8"
-    table = Table(
-        table_data,
-        colWidths=[0.35*inch, 0.8*inch, 1.2*inch, 0.9*inch, 0.9*inch, 2.0*inch, 1.5*inch, 1.0*inch, 0.8*inch],
-        repeatRows=1,
+
+@laporan_bp.route('/kerusakan/cetak-surat-<any(pdf, zip):format_file>')
+@login_required
+def cetak_surat_kerusakan(format_file):
+    """Cetak surat semua laporan kerusakan sesuai filter: satu PDF gabungan atau ZIP per surat"""
+    query = _query_laporan_kerusakan().options(joinedload(LaporanKerusakan.pelapor))
+    laporan_list = query.limit(BATAS_CETAK_SURAT + 1).all()
+
+    if not laporan_list:
+        flash('Tidak ada laporan kerusakan yang sesuai filter.', 'warning')
+        return redirect(url_for('laporan.laporan_kerusakan', **request.args))
+    if len(laporan_list) > BATAS_CETAK_SURAT:
+        flash(f'Maksimal {BATAS_CETAK_SURAT} surat sekali cetak. Persempit filter terlebih dahulu.', 'warning')
+        return redirect(url_for('laporan.laporan_kerusakan', **request.args))
+
+    logo_path = path_logo_unhas()
+    if format_file == 'pdf':
+        buffer = cetak_gabungan(laporan_list, logo_path=logo_path)
+    else:
+        buffer = cetak_zip(laporan_list, logo_path=logo_path)
+
+    return _kirim_export(
+        buffer, f'Surat_Laporan_Kerusakan_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{format_file}'
     )
 
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
-        ('WORDWRAP', (0, 0), (-1, -1), 'LTR'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
-        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 4),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-    ]))
-    
-    # Set row height for data rows to accommodate wrapped text
-    for i in range(len(table_data)):
-        if i == 0:  # Header row
-            table.setStyle(TableStyle([('MINHEIGHT', (0, 0), (-1, 0), 0.3*inch)]))
-        else:  # Data rows
-            table.setStyle(TableStyle([('MINHEIGHT', (0, i), (-1, i), 0.4*inch)]))
-    
-    elements.append(table)
-    elements.append(Spacer(1, 0.3*inch))
-    elements.append(Paragraph(f'<i>Dibuat oleh Inven-Go System</i>', info_style))
-    
-    doc.build(elements)
-    buffer.seek(0)
-    
-    # Generate filename
-    filename = f'Laporan_Aset_Tetap_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+
+# ---------------------------------------------------------------------------
+# Report job: export Excel/PDF di latar belakang (dikerjakan `flask laporan worker`)
+# ---------------------------------------------------------------------------
+
+def _job_milik_user(id):
+    job = ReportJob.query.get_or_404(id)
+    if job.user_id != current_user.id and not current_user.is_admin():
+        abort(403)
+    return job
+
+
+def _status_job(job):
+    data = job.to_dict()
+    data['url_status'] = url_for('laporan.status_job', id=job.id)
+    data['url_unduh'] = url_for('laporan.unduh_job', id=job.id) if job.bisa_diunduh else None
+    return data
+
+
+@laporan_bp.route('/job')
+@login_required
+def daftar_job():
+    """Daftar report job milik user (admin melihat semua)"""
+    query = ReportJob.query.options(joinedload(ReportJob.user))
+    if not current_user.is_admin():
+        query = query.filter(ReportJob.user_id == current_user.id)
     
-    return send_file(buffer, 
-                    mimetype='application/pdf',
+    job_list = query.order_by(ReportJob.id.desc()).limit(50).all()
+    
+    return render_template('laporan/job.html',
+                          title='Antrean Export',
+                          job_list=job_list)
+
+
+@laporan_bp.route('/job/<jenis>/<any(excel, pdf):format_file>', methods=['POST'])
+@login_required
+def buat_job(jenis, format_file):
+    """Masukkan export ke antrean; filter laporan diambil dari query string"""
+    if jenis not in EKSPOR_LAPORAN:
+        abort(404)
+    
+    job = tambah_job(jenis, format_file, request.query_string.decode(), current_user.id)
+    
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(_status_job(job)), 202
+    
+    flash(f'Export masuk antrean (job #{job.id}). File bisa diunduh setelah selesai diproses.', 'info')
+    return redirect(url_for('laporan.daftar_job'))
+
+
+@laporan_bp.route('/job/<int:id>/status')
+@login_required
+def status_job(id):
+    """Status satu report job (JSON, untuk polling)"""
+    return jsonify(_status_job(_job_milik_user(id)))
+
+
+@laporan_bp.route('/job/<int:id>/unduh')
+@login_required
+def unduh_job(id):
+    """Unduh file hasil report job"""
+    job = _job_milik_user(id)
+    if job.status == 'kedaluwarsa' or (job.status == 'selesai' and not job.bisa_diunduh):
+        abort(410)
+    if not job.bisa_diunduh or not os.path.exists(job.path_file):
+        abort(404)
+    
+    return send_file(job.path_file,
+                    mimetype=MIMETYPE_EXPORT[job.nama_file.rsplit('.', 1)[-1]],
                     as_attachment=True,
-                    download_name=filename)
+                    download_name=job.nama_file)
@@ -2,7 +2,9 @@ from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_required
 from app.merk import bp
 from app.models.kategori import MerkBarang
+from app.models.pencarian import terapkan_pencarian
 from app.merk.forms import MerkForm
+from app.utils.cache_data import hapus_pilihan
 from app import db
 
 @bp.route('/')
@@ -14,15 +16,14 @@ def index():
     query = MerkBarang.query
     
     if search:
-        query = query.filter(
-            MerkBarang.nama_merk.like(f'%{search}%')
-        )
+        query = terapkan_pencarian(query, 'merk', search)
     
     pagination = query.order_by(MerkBarang.created_at.desc()).paginate(
         page=page, per_page=10, error_out=False
     )
     
-    merk_list = pagination.items
+    # Jumlah barang dan total stok per merk di halaman ini dihitung dengan satu query GROUP BY
+    merk_list = MerkBarang.muat_total(pagination.items)
     
     return render_template('merk/index.html',
                          title='Data Merk dan Tipe Barang',
@@ -44,6 +45,7 @@ def tambah():
         
         db.session.add(merk)
         db.session.commit()
+        hapus_pilihan('merk')
         
         flash('Merk dan Tipe berhasil ditambahkan!', 'success')
         return redirect(url_for('merk.index'))
@@ -64,6 +66,7 @@ def edit(id):
         merk.spesifikasi = form.spesifikasi.data
         
         db.session.commit()
+        hapus_pilihan('merk')
         
         flash('Merk dan Tipe berhasil diupdate!', 'success')
         return redirect(url_for('merk.index'))
@@ -85,6 +88,7 @@ def hapus(id):
     
     db.session.delete(merk)
     db.session.commit()
+    hapus_pilihan('merk')
     
     flash('Merk dan Tipe berhasil dihapus!', 'success')
     return redirect(url_for('merk.index'))
@@ -1,9 +1,12 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, send_file
 from flask_login import login_required
 from app.merk_aset_tetap import bp
 from app.models.merk_aset_tetap import MerkAsetTetap
 from app.merk_aset_tetap.forms import MerkAsetTetapForm
+from app.utils.cache_data import hapus_pilihan
+from app.utils.pdf_export import export_merk_aset_tetap_to_pdf
 from app import db
+from datetime import datetime
 from sqlalchemy import func
 
 @bp.route('/')
@@ -24,7 +27,8 @@ def index():
         page=page, per_page=10, error_out=False
     )
     
-    merk_list = pagination.items
+    # Total barang per merk di halaman ini dihitung dengan satu query GROUP BY
+    merk_list = MerkAsetTetap.muat_total(pagination.items)
     
     return render_template('merk_aset_tetap/index.html',
                          title='Data Jenis Aset',
@@ -49,6 +53,7 @@ def tambah():
         
         db.session.add(merk)
         db.session.commit()
+        hapus_pilihan('merk_aset_tetap')
         
         flash('Jenis Aset berhasil ditambahkan!', 'success')
         return redirect(url_for('merk_aset_tetap.index'))
@@ -71,6 +76,7 @@ def edit(id):
         merk.spesifikasi = form.spesifikasi.data
         
         db.session.commit()
+        hapus_pilihan('merk_aset_tetap')
         
         flash('Jenis Aset berhasil diupdate!', 'success')
         return redirect(url_for('merk_aset_tetap.index'))
@@ -100,6 +106,7 @@ def hapus(id):
     
     db.session.delete(merk)
     db.session.commit()
+    hapus_pilihan('merk_aset_tetap')
     
     flash('Jenis Aset berhasil dihapus!', 'success')
     return redirect(url_for('merk_aset_tetap.index'))
@@ -154,7 +161,7 @@ def cetak_laporan():
             MerkAsetTetap.nama_merk.like(f'%{search}%')
         )
     
-    merk_list = query.order_by(MerkAsetTetap.created_at.desc()).all()
+    merk_list = MerkAsetTetap.muat_total(query.order_by(MerkAsetTetap.created_at.desc()).all())
     
     # Generate PDF
     pdf_data = export_merk_aset_tetap_to_pdf(merk_list)
@@ -1,10 +1,15 @@
 # Models package
 from app.models.barang import Barang, BarangMasuk, BarangKeluar
+from app.models.stok_saldo import StokSaldo
+from app.models.stok_snapshot import StokSnapshot
 from app.models.aset_tetap import AsetTetap
 from app.models.laporan_kerusakan import LaporanKerusakan
 from app.models.permintaan_barang import PermintaanBarang
 from app.models.user import User, UserLog
 from app.models.kategori import KategoriBarang, MerkBarang
 from app.models.kontrak import KontrakBarang, BarangKontrak
+from app.models.report_job import ReportJob
+from app.models.versi_data import VersiData
+from app.models import pencarian  # indeks teks penuh (FULLTEXT/FTS5)
 
-__all__ = ['Barang', 'BarangMasuk', 'BarangKeluar', 'AsetTetap', 'LaporanKerusakan', 'PermintaanBarang', 'User', 'UserLog', 'KategoriBarang', 'MerkBarang', 'KontrakBarang', 'BarangKontrak']
+__all__ = ['Barang', 'BarangMasuk', 'BarangKeluar', 'StokSaldo', 'StokSnapshot', 'AsetTetap', 'LaporanKerusakan', 'PermintaanBarang', 'User', 'UserLog', 'KategoriBarang', 'MerkBarang', 'KontrakBarang', 'BarangKontrak', 'ReportJob', 'VersiData']
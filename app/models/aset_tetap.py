@@ -6,7 +6,7 @@ class AsetTetap(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     kode_aset = db.Column(db.String(50), unique=True, nullable=False, index=True)
-    nama_aset = db.Column(db.String(255), nullable=False)
+    nama_aset = db.Column(db.String(255), nullable=False, index=True)
     kategori_id = db.Column(db.Integer, db.ForeignKey('kategori_barang.id'))
     merk_id = db.Column(db.Integer, db.ForeignKey('merk_barang.id'))
     merk_aset_tetap_id = db.Column(db.Integer, db.ForeignKey('merk_aset_tetap.id'))
@@ -1,17 +1,21 @@
 from app import db
 from datetime import datetime
+from sqlalchemy import and_, case, func
+
+# Batas stok akhir yang dianggap "stok rendah" pada dashboard dan laporan barang
+BATAS_STOK_RENDAH = 10
 
 class Barang(db.Model):
     __tablename__ = 'barang'
     
     id = db.Column(db.Integer, primary_key=True)
     kode_barang = db.Column(db.String(50), unique=True, nullable=False, index=True)
-    nama_barang = db.Column(db.String(255), nullable=False)
+    nama_barang = db.Column(db.String(255), nullable=False, index=True)
     satuan = db.Column(db.String(50), nullable=False)
     satuan_kecil = db.Column(db.String(50), nullable=True, comment='Contoh: Pack (isi 10 buah)')
     kategori_id = db.Column(db.Integer, db.ForeignKey('kategori_barang.id'), nullable=True)
     merk_id = db.Column(db.Integer, db.ForeignKey('merk_barang.id'), nullable=True)
-    jenis_barang = db.Column(db.Enum('inventaris', 'habis_pakai', name='jenis_barang_enum'), default='inventaris', nullable=False)
+    jenis_barang = db.Column(db.Enum('inventaris', 'habis_pakai', name='jenis_barang_enum'), default='inventaris', nullable=False, index=True)
     spesifikasi = db.Column(db.Text, nullable=True)
     stok_awal = db.Column(db.Integer, default=0)
     stok_minimum = db.Column(db.Integer, default=0, comment='Alert jika stok dibawah ini')
@@ -59,10 +63,137 @@ class Barang(db.Model):
         }
     
     def get_stok_akhir(self):
-        """Menghitung stok akhir berdasarkan transaksi"""
+        """Menghitung stok akhir dari saldo tersimpan (tabel stok_saldo)"""
+        from app.models.stok_saldo import StokSaldo
+
+        saldo = db.session.query(
+            StokSaldo.total_masuk, StokSaldo.total_keluar
+        ).filter_by(kode_barang=self.kode_barang).first()
+        if saldo is None:
+            return self.hitung_stok_akhir()
+        return (self.stok_awal or 0) + saldo.total_masuk - saldo.total_keluar
+
+    def hitung_stok_akhir(self):
+        """Menghitung stok akhir langsung dari agregat transaksi (tanpa saldo tersimpan)"""
         total_masuk = db.session.query(db.func.sum(BarangMasuk.qty)).filter_by(kode_barang=self.kode_barang).scalar() or 0
         total_keluar = db.session.query(db.func.sum(BarangKeluar.qty)).filter_by(kode_barang=self.kode_barang).scalar() or 0
-        return self.stok_awal + total_masuk - total_keluar
+        return (self.stok_awal or 0) + total_masuk - total_keluar
+    
+    @classmethod
+    def stok_akhir_bulk(cls, ids_or_query):
+        """Hitung stok akhir banyak barang sekaligus.
+
+        `ids_or_query` boleh berupa list objek Barang, list id, list kode_barang,
+        atau Query Barang. Return dict {kode_barang: stok_akhir} dari satu query
+        join barang dengan stok_saldo.
+        """
+        from app.models.stok_saldo import StokSaldo
+        from sqlalchemy.orm import Query
+
+        query = db.session.query(
+            cls.kode_barang,
+            cls.stok_awal,
+            StokSaldo.total_masuk,
+            StokSaldo.total_keluar
+        ).outerjoin(StokSaldo, StokSaldo.kode_barang == cls.kode_barang)
+
+        if isinstance(ids_or_query, Query):
+            # Dibungkus derived table agar LIMIT/OFFSET pada query asal tetap valid di MySQL
+            ids = ids_or_query.with_entities(cls.id).subquery()
+            query = query.filter(cls.id.in_(db.select(ids.c.id)))
+        else:
+            items = list(ids_or_query)
+            if not items:
+                return {}
+            if isinstance(items[0], cls):
+                query = query.filter(cls.id.in_([b.id for b in items]))
+            elif isinstance(items[0], str):
+                query = query.filter(cls.kode_barang.in_(items))
+            else:
+                query = query.filter(cls.id.in_(items))
+
+        hasil = {}
+        tanpa_saldo = {}
+        for kode_barang, stok_awal, total_masuk, total_keluar in query.all():
+            if total_masuk is None:
+                tanpa_saldo[kode_barang] = stok_awal or 0
+                continue
+            hasil[kode_barang] = (stok_awal or 0) + total_masuk - total_keluar
+
+        if tanpa_saldo:
+            # Barang yang belum punya baris saldo: hitung dari agregat transaksi
+            agregat = StokSaldo.hitung_dari_transaksi().filter(
+                cls.kode_barang.in_(list(tanpa_saldo))
+            )
+            for kode_barang, total_masuk, total_keluar in agregat.all():
+                hasil[kode_barang] = tanpa_saldo[kode_barang] + int(total_masuk) - int(total_keluar)
+
+        return hasil
+    
+    def stok_pada(self, tanggal):
+        """Stok barang pada akhir hari `tanggal`, dihitung dari checkpoint stok_snapshot terdekat"""
+        return self.stok_pada_bulk(tanggal, [self]).get(self.kode_barang, self.stok_awal or 0)
+
+    @classmethod
+    def stok_pada_bulk(cls, tanggal, barang_list):
+        """Stok banyak barang pada akhir hari `tanggal`. Return dict {kode_barang: stok}"""
+        from app.models.stok_snapshot import StokSnapshot
+
+        barang_list = list(barang_list)
+        if not barang_list:
+            return {}
+        total = StokSnapshot.total_sampai(tanggal, [b.kode_barang for b in barang_list])
+        hasil = {}
+        for barang in barang_list:
+            total_masuk, total_keluar = total.get(barang.kode_barang, (0, 0))
+            hasil[barang.kode_barang] = (barang.stok_awal or 0) + total_masuk - total_keluar
+        return hasil
+    
+    @classmethod
+    def stok_akhir_expr(cls):
+        """Ekspresi SQL stok akhir; dipakai bersama query_dengan_stok()"""
+        from app.models.stok_saldo import StokSaldo
+        return (
+            func.coalesce(cls.stok_awal, 0)
+            + func.coalesce(StokSaldo.total_masuk, 0)
+            - func.coalesce(StokSaldo.total_keluar, 0)
+        )
+
+    @classmethod
+    def kondisi_stok_rendah(cls, batas=None):
+        """Kondisi SQL stok rendah.
+
+        Tanpa `batas`: barang habis pakai dengan stok <= stok_minimum (sama dengan is_stok_rendah).
+        Dengan `batas`: semua barang dengan stok akhir < batas.
+        """
+        stok_akhir = cls.stok_akhir_expr()
+        if batas is not None:
+            return stok_akhir < batas
+        return and_(
+            cls.jenis_barang == 'habis_pakai',
+            cls.stok_minimum > 0,
+            stok_akhir <= cls.stok_minimum
+        )
+
+    @classmethod
+    def query_dengan_stok(cls):
+        """Query (Barang, stok_akhir) dengan stok dihitung di SQL dari tabel stok_saldo"""
+        from app.models.stok_saldo import StokSaldo
+        return db.session.query(
+            cls, cls.stok_akhir_expr().label('stok_akhir')
+        ).outerjoin(StokSaldo, StokSaldo.kode_barang == cls.kode_barang)
+
+    @classmethod
+    def hitung_stok_rendah(cls, batas):
+        """Return (jumlah barang stok < batas, jumlah barang habis pakai <= stok minimum) dalam satu query"""
+        from app.models.stok_saldo import StokSaldo
+        total_rendah, total_habis_pakai = db.session.query(
+            func.coalesce(func.sum(case((cls.kondisi_stok_rendah(batas), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((cls.kondisi_stok_rendah(), 1), else_=0)), 0)
+        ).select_from(cls).outerjoin(
+            StokSaldo, StokSaldo.kode_barang == cls.kode_barang
+        ).one()
+        return int(total_rendah), int(total_habis_pakai)
     
     def is_stok_rendah(self, stok_akhir=None):
         """Cek apakah stok dibawah minimum (untuk barang habis pakai)"""
@@ -87,58 +218,30 @@ class Barang(db.Model):
         else:
             return 'aman'
     
-    def prediksi_habis(self, periode_hari=30):
+    def prediksi_habis(self, periode_hari=30, metode='rata_rata', jendela=7):
         """Prediksi kapan barang akan habis berdasarkan konsumsi rata-rata"""
         if self.jenis_barang != 'habis_pakai':
             return None
-        
-        from datetime import timedelta
-        from sqlalchemy import func
-        
-        # Hitung rata-rata keluar per hari dalam periode tertentu
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=periode_hari)
-        
-        total_keluar = db.session.query(
-            func.sum(BarangKeluar.qty)
-        ).filter(
-            BarangKeluar.kode_barang == self.kode_barang,
-            BarangKeluar.tanggal >= start_date.date()
-        ).scalar() or 0
-        
-        if total_keluar == 0:
-            return None  # Tidak ada data konsumsi
-        
-        rata_rata_per_hari = total_keluar / periode_hari
-        stok_sekarang = self.get_stok_akhir()
-        
-        if rata_rata_per_hari > 0:
-            hari_tersisa = int(stok_sekarang / rata_rata_per_hari)
-            tanggal_habis = datetime.now() + timedelta(days=hari_tersisa)
-            rata_rata = round(rata_rata_per_hari, 2)
-            # Kembalikan beberapa nama key untuk kompatibilitas template/versi lama.
-            return {
-                'hari_tersisa': hari_tersisa,
-                # Nama lama
-                'tanggal_habis': tanggal_habis,
-                'rata_rata_konsumsi': rata_rata,
-                # Nama yang dipakai di template (detail.html)
-                'estimasi_habis': tanggal_habis,
-                'rata_rata_per_hari': rata_rata,
-            }
-        
-        return None
+
+        from app.utils.prediksi_stok import prediksi_habis_bulk
+        return prediksi_habis_bulk(
+            [self], periode_hari=periode_hari, metode=metode, jendela=jendela
+        ).get(self.kode_barang)
 
 
 class BarangMasuk(db.Model):
     __tablename__ = 'barang_masuk'
+    __table_args__ = (
+        # Urutan daftar transaksi (paginasi keyset)
+        db.Index('ix_barang_masuk_tanggal_created_at_id', 'tanggal', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     tanggal = db.Column(db.Date, nullable=False, index=True)
     kode_barang = db.Column(db.String(50), db.ForeignKey('barang.kode_barang', onupdate='CASCADE'), nullable=False, index=True)
     qty = db.Column(db.Integer, nullable=False)
     keterangan = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     def __repr__(self):
         return f'<BarangMasuk {self.kode_barang}: {self.qty}>'
@@ -157,13 +260,17 @@ class BarangMasuk(db.Model):
 
 class BarangKeluar(db.Model):
     __tablename__ = 'barang_keluar'
+    __table_args__ = (
+        # Urutan daftar transaksi (paginasi keyset)
+        db.Index('ix_barang_keluar_tanggal_created_at_id', 'tanggal', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     tanggal = db.Column(db.Date, nullable=False, index=True)
     kode_barang = db.Column(db.String(50), db.ForeignKey('barang.kode_barang', onupdate='CASCADE'), nullable=False, index=True)
     qty = db.Column(db.Integer, nullable=False)
     keterangan = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     def __repr__(self):
         return f'<BarangKeluar {self.kode_barang}: {self.qty}>'
@@ -17,10 +17,44 @@ class KategoriBarang(db.Model):
     def __repr__(self):
         return f'<KategoriBarang {self.nama_kategori}>'
     
+    @classmethod
+    def muat_total(cls, kategori_list):
+        """Isi total item banyak kategori sekaligus (satu GROUP BY per tabel).
+
+        Setelah dimuat, get_total_item() tidak lagi menjalankan query. Return
+        list kategori tersebut.
+        """
+        from app.models.aset_tetap import AsetTetap
+        from app.models.barang import Barang
+
+        kategori_list = list(kategori_list)
+        ids = [k.id for k in kategori_list]
+        if not ids:
+            return kategori_list
+
+        total_master = dict(
+            db.session.query(Barang.kategori_id, func.count(Barang.id))
+            .filter(Barang.kategori_id.in_(ids))
+            .group_by(Barang.kategori_id)
+        )
+        total_aset_tetap = dict(
+            db.session.query(AsetTetap.kategori_id, func.coalesce(func.sum(AsetTetap.total_barang), 0))
+            .filter(AsetTetap.kategori_id.in_(ids))
+            .group_by(AsetTetap.kategori_id)
+        )
+        for kategori in kategori_list:
+            kategori._total_item = (
+                total_master.get(kategori.id, 0) + int(total_aset_tetap.get(kategori.id, 0))
+            )
+        return kategori_list
+
     def get_total_item(self):
         """Get total jumlah barang gabungan dari master barang dan aset tetap."""
         from app.models.aset_tetap import AsetTetap
 
+        if '_total_item' in self.__dict__:
+            return self._total_item
+
         total_barang_master = self.barang.count()
         total_barang_aset_tetap = db.session.query(
             func.coalesce(func.sum(AsetTetap.total_barang), 0)
@@ -48,10 +82,8 @@ class KategoriBarang(db.Model):
     
     def get_total_stok_akhir(self):
         """Get total stok akhir dari semua barang dengan kategori ini"""
-        total = 0
-        for barang in self.barang.all():
-            total += barang.get_stok_akhir()
-        return total
+        from app.models.barang import Barang
+        return sum(Barang.stok_akhir_bulk(self.barang).values())
     
     def to_dict(self):
         return {
@@ -80,16 +112,45 @@ class MerkBarang(db.Model):
     def __repr__(self):
         return f'<MerkBarang {self.nama_merk}>'
     
+    @classmethod
+    def muat_total(cls, merk_list):
+        """Isi jumlah barang dan total stok akhir banyak merk dengan satu GROUP BY.
+
+        Stok akhir dijumlahkan di SQL dari tabel stok_saldo. Setelah dimuat,
+        get_total_item() dan get_total_stok_akhir() tidak lagi menjalankan
+        query. Return list merk tersebut.
+        """
+        from app.models.barang import Barang
+
+        merk_list = list(merk_list)
+        ids = [m.id for m in merk_list]
+        if not ids:
+            return merk_list
+
+        total = {
+            merk_id: (jumlah, int(stok))
+            for merk_id, jumlah, stok in Barang.query_dengan_stok().with_entities(
+                Barang.merk_id,
+                func.count(Barang.id),
+                func.coalesce(func.sum(Barang.stok_akhir_expr()), 0)
+            ).filter(Barang.merk_id.in_(ids)).group_by(Barang.merk_id)
+        }
+        for merk in merk_list:
+            merk._total_item, merk._total_stok_akhir = total.get(merk.id, (0, 0))
+        return merk_list
+
     def get_total_item(self):
         """Get total jumlah barang dengan merk ini"""
+        if '_total_item' in self.__dict__:
+            return self._total_item
         return self.barang.count()
     
     def get_total_stok_akhir(self):
         """Get total stok akhir (final stock) dari semua barang dengan merk ini"""
-        total = 0
-        for barang in self.barang.all():
-            total += barang.get_stok_akhir()
-        return total
+        from app.models.barang import Barang
+        if '_total_stok_akhir' in self.__dict__:
+            return self._total_stok_akhir
+        return sum(Barang.stok_akhir_bulk(self.barang).values())
     
     def to_dict(self):
         return {
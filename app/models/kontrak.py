@@ -1,5 +1,16 @@
 from app import db
+from collections import namedtuple
 from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import cast, func, select
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Query
+
+# Tipe hasil SUM(qty_kontrak * harga_satuan)
+NILAI_KONTRAK = db.Numeric(20, 2)
+
+TotalKontrak = namedtuple('TotalKontrak', ['jumlah_barang', 'total_qty', 'total_nilai'])
+TOTAL_KOSONG = TotalKontrak(0, 0, Decimal('0'))
 
 class KontrakBarang(db.Model):
     __tablename__ = 'kontrak_barang'
@@ -16,17 +27,95 @@ class KontrakBarang(db.Model):
     def __repr__(self):
         return f'<KontrakBarang {self.nomor_kontrak}>'
     
+    @classmethod
+    def query_total(cls):
+        """Query (kontrak_id, jumlah_barang, total_qty, total_nilai) dikelompokkan per kontrak.
+
+        Nilai dihitung SUM(qty_kontrak * harga_satuan) dalam DECIMAL; baris tanpa
+        harga satuan tidak ikut dijumlahkan.
+        """
+        return db.session.query(
+            BarangKontrak.kontrak_id,
+            func.count(BarangKontrak.id),
+            func.coalesce(func.sum(BarangKontrak.qty_kontrak), 0),
+            func.coalesce(
+                func.sum(cast(BarangKontrak.qty_kontrak * BarangKontrak.harga_satuan, NILAI_KONTRAK)), 0
+            )
+        ).group_by(BarangKontrak.kontrak_id)
+
+    @classmethod
+    def muat_total(cls, kontrak_list):
+        """Isi total (jumlah barang, qty, nilai) banyak kontrak dengan satu query GROUP BY.
+
+        `kontrak_list` boleh berupa list objek KontrakBarang atau Query
+        KontrakBarang. Kontrak yang totalnya sudah dimuat dilewati. Return list
+        kontrak tersebut.
+        """
+        if isinstance(kontrak_list, Query):
+            kontrak_list = kontrak_list.all()
+        kontrak_list = list(kontrak_list)
+        belum = {k.id: k for k in kontrak_list if '_total' not in k.__dict__}
+        if not belum:
+            return kontrak_list
+
+        total = {
+            kontrak_id: TotalKontrak(int(jumlah), int(qty), Decimal(nilai))
+            for kontrak_id, jumlah, qty, nilai in cls.query_total().filter(
+                BarangKontrak.kontrak_id.in_(list(belum))
+            )
+        }
+        for kontrak_id, kontrak in belum.items():
+            kontrak._total = total.get(kontrak_id, TOTAL_KOSONG)
+        return kontrak_list
+
+    def _total_kontrak(self):
+        if '_total' not in self.__dict__:
+            KontrakBarang.muat_total([self])
+        return self._total
+
+    @hybrid_property
+    def jumlah_barang(self):
+        """Jumlah baris barang dalam kontrak"""
+        return self._total_kontrak().jumlah_barang
+
+    @jumlah_barang.inplace.expression
+    @classmethod
+    def _jumlah_barang_expression(cls):
+        return select(func.count(BarangKontrak.id)).where(
+            BarangKontrak.kontrak_id == cls.id
+        ).scalar_subquery()
+
+    @hybrid_property
+    def total_qty(self):
+        """Total qty barang dalam kontrak"""
+        return self._total_kontrak().total_qty
+
+    @total_qty.inplace.expression
+    @classmethod
+    def _total_qty_expression(cls):
+        return select(func.coalesce(func.sum(BarangKontrak.qty_kontrak), 0)).where(
+            BarangKontrak.kontrak_id == cls.id
+        ).scalar_subquery()
+
+    @hybrid_property
+    def total_nilai(self):
+        """Total nilai kontrak (Decimal)"""
+        return self._total_kontrak().total_nilai
+
+    @total_nilai.inplace.expression
+    @classmethod
+    def _total_nilai_expression(cls):
+        return select(func.coalesce(
+            func.sum(cast(BarangKontrak.qty_kontrak * BarangKontrak.harga_satuan, NILAI_KONTRAK)), 0
+        )).where(BarangKontrak.kontrak_id == cls.id).scalar_subquery()
+
     def get_total_nilai(self):
         """Hitung total nilai kontrak"""
-        total = 0
-        for bk in self.barang_kontrak:
-            if bk.harga_satuan:
-                total += bk.qty_kontrak * float(bk.harga_satuan)
-        return total
+        return self.total_nilai
     
     def get_total_qty(self):
         """Hitung total qty barang dalam kontrak"""
-        return sum(bk.qty_kontrak for bk in self.barang_kontrak)
+        return self.total_qty
     
     def to_dict(self):
         return {
@@ -34,9 +123,9 @@ class KontrakBarang(db.Model):
             'nomor_kontrak': self.nomor_kontrak,
             'tanggal_kontrak': self.tanggal_kontrak.isoformat() if self.tanggal_kontrak else None,
             'deskripsi': self.deskripsi,
-            'jumlah_barang': self.barang_kontrak.count(),
-            'total_qty': self.get_total_qty(),
-            'total_nilai': self.get_total_nilai(),
+            'jumlah_barang': self.jumlah_barang,
+            'total_qty': self.total_qty,
+            'total_nilai': float(self.total_nilai),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
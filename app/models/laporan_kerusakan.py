@@ -4,6 +4,11 @@ from datetime import datetime
 
 class LaporanKerusakan(db.Model):
     __tablename__ = 'laporan_kerusakan'
+    __table_args__ = (
+        # Urutan daftar monitor (paginasi keyset), dengan dan tanpa filter status
+        db.Index('ix_laporan_kerusakan_created_at_id', 'created_at', 'id'),
+        db.Index('ix_laporan_kerusakan_status_created_at_id', 'status', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     aset_tetap_id = db.Column(db.Integer, db.ForeignKey('aset_tetap.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -22,7 +27,7 @@ class LaporanKerusakan(db.Model):
         default='draft',
         nullable=False
     )
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     pelapor = db.relationship('User', backref='laporan_kerusakan_list')
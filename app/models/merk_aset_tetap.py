@@ -1,6 +1,6 @@
 from app import db
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, or_
 
 class MerkAsetTetap(db.Model):
     __tablename__ = 'merk_aset_tetap'
@@ -17,6 +17,40 @@ class MerkAsetTetap(db.Model):
     def __repr__(self):
         return f'<MerkAsetTetap {self.nama_merk}>'
     
+    @classmethod
+    def muat_total(cls, merk_list):
+        """Isi total barang banyak merk aset tetap dengan satu GROUP BY.
+
+        Menghitung sekaligus total semua aset merk tersebut (get_total_barang)
+        dan total yang nomor Kontrak/SPK-nya sama dengan merk
+        (get_total_aset_by_criteria). Return list merk tersebut.
+        """
+        from app.models.aset_tetap import AsetTetap
+
+        merk_list = list(merk_list)
+        ids = [m.id for m in merk_list]
+        if not ids:
+            return merk_list
+
+        # Sama dengan filter get_total_aset_by_criteria: kontrak_spk IS NULL jika merk tanpa nomor kontrak
+        sesuai_kontrak = or_(
+            and_(func.coalesce(cls.nomor_kontrak, '') == '', AsetTetap.kontrak_spk.is_(None)),
+            and_(func.coalesce(cls.nomor_kontrak, '') != '', AsetTetap.kontrak_spk == cls.nomor_kontrak)
+        )
+        total = {
+            merk_id: (int(total_barang), int(total_kontrak))
+            for merk_id, total_barang, total_kontrak in db.session.query(
+                cls.id,
+                func.coalesce(func.sum(AsetTetap.total_barang), 0),
+                func.coalesce(func.sum(case((sesuai_kontrak, AsetTetap.total_barang), else_=0)), 0)
+            ).join(
+                AsetTetap, AsetTetap.merk_aset_tetap_id == cls.id
+            ).filter(cls.id.in_(ids)).group_by(cls.id)
+        }
+        for merk in merk_list:
+            merk._total_barang, merk._total_by_criteria = total.get(merk.id, (0, 0))
+        return merk_list
+
     def get_total_aset(self):
         """Get total jumlah aset dengan merk ini"""
         from app.models.aset_tetap import AsetTetap
@@ -25,7 +59,8 @@ class MerkAsetTetap(db.Model):
     def get_total_aset_by_criteria(self):
         """Get total jumlah barang berdasarkan merk_aset_tetap_id, tipe, dan nomor_kontrak"""
         from app.models.aset_tetap import AsetTetap
-        from sqlalchemy import func
+        if '_total_by_criteria' in self.__dict__:
+            return self._total_by_criteria
         
         # Filter by merk_aset_tetap_id
         query = AsetTetap.query.filter_by(merk_aset_tetap_id=self.id)
@@ -46,6 +81,9 @@ class MerkAsetTetap(db.Model):
         """Return sum of `total_barang` from AsetTetap for this merk."""
         from app.models.aset_tetap import AsetTetap
 
+        if '_total_barang' in self.__dict__:
+            return self._total_barang
+
         total = db.session.query(func.sum(AsetTetap.total_barang)).filter(
             AsetTetap.merk_aset_tetap_id == self.id
         ).scalar()
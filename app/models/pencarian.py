@@ -0,0 +1,222 @@
+"""Pencarian teks penuh untuk barang, aset tetap, kontrak, merk dan kategori.
+
+MySQL memakai indeks FULLTEXT (MATCH ... AGAINST dalam BOOLEAN MODE). SQLite
+memakai tabel virtual FTS5 `<tabel>_fts` (external content) yang disinkronkan
+trigger. Kolom kode (kode_barang, kode_aset, nomor_kontrak) juga dicocokkan
+sebagai awalan (LIKE 'x%') lewat indeks B-tree-nya dan diberi skor tertinggi.
+Dialek lain, atau kueri yang terlalu pendek untuk indeks FULLTEXT, memakai
+LIKE '%x%' seperti sebelumnya.
+"""
+
+import re
+
+from sqlalchemy import DDL, event, func, literal, literal_column, or_, select, table, union_all
+from sqlalchemy.dialects.mysql import match
+
+from app import db
+from app.models.aset_tetap import AsetTetap
+from app.models.barang import Barang
+from app.models.kategori import KategoriBarang, MerkBarang
+from app.models.kontrak import KontrakBarang
+
+# Skor hasil yang kodenya diawali kueri (di atas skor relevansi teks)
+SKOR_KODE = 1000.0
+
+# innodb_ft_min_token_size bawaan MySQL; kata yang lebih pendek tidak terindeks
+PANJANG_MIN_TOKEN_MYSQL = 3
+
+# Jumlah hasil per jenis di pencarian gabungan
+BATAS_HASIL = 10
+
+
+class SumberPencarian:
+    """Tabel yang bisa dicari: kolom teks yang diindeks dan kolom kode (opsional)"""
+
+    def __init__(self, model, kolom_teks, kolom_kode=None):
+        self.model = model
+        self.kolom_teks = kolom_teks
+        self.kolom_kode = kolom_kode
+
+    @property
+    def nama_tabel(self):
+        return self.model.__tablename__
+
+    @property
+    def nama_fts(self):
+        return f'{self.nama_tabel}_fts'
+
+
+SUMBER_PENCARIAN = {
+    'barang': SumberPencarian(
+        Barang,
+        [Barang.kode_barang, Barang.nama_barang, Barang.spesifikasi],
+        Barang.kode_barang
+    ),
+    'aset_tetap': SumberPencarian(
+        AsetTetap,
+        [AsetTetap.kode_aset, AsetTetap.nama_aset, AsetTetap.spesifikasi,
+         AsetTetap.kontrak_spk, AsetTetap.nomor_kontrak],
+        AsetTetap.kode_aset
+    ),
+    'kontrak': SumberPencarian(
+        KontrakBarang,
+        [KontrakBarang.nomor_kontrak, KontrakBarang.deskripsi],
+        KontrakBarang.nomor_kontrak
+    ),
+    'merk': SumberPencarian(
+        MerkBarang,
+        [MerkBarang.nama_merk, MerkBarang.tipe, MerkBarang.spesifikasi, MerkBarang.nomor_kontrak]
+    ),
+    'kategori': SumberPencarian(
+        KategoriBarang,
+        [KategoriBarang.nama_kategori, KategoriBarang.deskripsi]
+    ),
+}
+
+
+# ---------------------------------------------------------------------------
+# Skema: indeks FULLTEXT (MySQL) dan tabel FTS5 + trigger (SQLite).
+# Database lama dibuatkan lewat migrasi a8e6b7c9d0f1.
+# ---------------------------------------------------------------------------
+
+def ddl_fts5(sumber):
+    """Perintah SQL pembuat tabel FTS5 dan trigger sinkronisasinya"""
+    tabel, fts = sumber.nama_tabel, sumber.nama_fts
+    kolom = [k.name for k in sumber.kolom_teks]
+    daftar = ', '.join(kolom)
+    baru = ', '.join(f'new.{k}' for k in kolom)
+    lama = ', '.join(f'old.{k}' for k in kolom)
+    hapus = f"INSERT INTO {fts}({fts}, rowid, {daftar}) VALUES ('delete', old.id, {lama});"
+    tambah = f'INSERT INTO {fts}(rowid, {daftar}) VALUES (new.id, {baru});'
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({daftar}, content='{tabel}', content_rowid='id')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabel} BEGIN {tambah} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabel} BEGIN {hapus} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {tabel} BEGIN {hapus} {tambah} END',
+    ]
+
+
+for _sumber in SUMBER_PENCARIAN.values():
+    db.Index(
+        f'ft_{_sumber.nama_tabel}', *_sumber.kolom_teks, mysql_prefix='FULLTEXT'
+    ).ddl_if(dialect='mysql')
+
+    _tabel = _sumber.model.__table__
+    for _perintah in ddl_fts5(_sumber):
+        event.listen(_tabel, 'after_create', DDL(_perintah).execute_if(dialect='sqlite'))
+    event.listen(
+        _tabel, 'before_drop',
+        DDL(f'DROP TABLE IF EXISTS {_sumber.nama_fts}').execute_if(dialect='sqlite')
+    )
+
+
+# ---------------------------------------------------------------------------
+# Kueri
+# ---------------------------------------------------------------------------
+
+def _token(kueri):
+    return re.findall(r'\w+', kueri or '', re.UNICODE)
+
+
+def escape_like(teks):
+    """Escape wildcard LIKE (%, _) dan backslash; pakai bersama escape='\\\\'"""
+    return teks.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _select_teks(sumber, token, dialek):
+    """SELECT (id, skor) hasil indeks teks penuh, atau None jika tidak bisa dipakai"""
+    model = sumber.model
+    if dialek == 'mysql':
+        panjang = [t for t in token if len(t) >= PANJANG_MIN_TOKEN_MYSQL]
+        if not panjang:
+            return None
+        skor = match(*sumber.kolom_teks, against=' '.join(f'+{t}*' for t in panjang)).in_boolean_mode()
+        query = select(model.id.label('id'), skor.label('skor')).where(skor)
+        # Kata pendek tidak ada di indeks; disaring dengan LIKE di antara hasil MATCH
+        for t in token:
+            if len(t) < PANJANG_MIN_TOKEN_MYSQL:
+                pola = f'%{escape_like(t)}%'
+                query = query.where(or_(*[kolom.like(pola, escape='\\') for kolom in sumber.kolom_teks]))
+        return query
+
+    if dialek == 'sqlite':
+        kueri_fts = ' '.join('"{}"*'.format(t.replace('"', '""')) for t in token)
+        return select(
+            literal_column('rowid').label('id'),
+            # Kolom tersembunyi `rank` = bm25(); fungsi bm25() sendiri gagal
+            # jika SQLite meratakan subquery ini ke kueri luar
+            (-literal_column('rank')).label('skor')
+        ).select_from(table(sumber.nama_fts)).where(literal_column(sumber.nama_fts).op('MATCH')(kueri_fts))
+
+    return None
+
+
+def hasil_pencarian(jenis, kueri):
+    """Subquery (id, skor) untuk `kueri` pada sumber `jenis`, atau None jika kueri kosong.
+
+    Cabang teks penuh dan cabang awalan kode masing-masing memakai indeksnya
+    sendiri (UNION ALL, bukan OR), sehingga waktu cari tidak tumbuh dengan
+    ukuran tabel.
+    """
+    kueri = (kueri or '').strip()
+    token = _token(kueri)
+    if not token:
+        return None
+
+    sumber = SUMBER_PENCARIAN[jenis]
+    model = sumber.model
+    dialek = db.session.get_bind().dialect.name
+
+    bagian = []
+    teks = _select_teks(sumber, token, dialek)
+    if teks is not None:
+        bagian.append(teks)
+    else:
+        pola = f'%{escape_like(kueri)}%'
+        bagian.append(
+            select(model.id.label('id'), literal(1.0).label('skor'))
+            .where(or_(*[kolom.like(pola, escape='\\') for kolom in sumber.kolom_teks]))
+        )
+
+    if sumber.kolom_kode is not None:
+        bagian.append(
+            select(model.id.label('id'), literal(SKOR_KODE).label('skor'))
+            .where(sumber.kolom_kode.like(f'{escape_like(kueri)}%', escape='\\'))
+        )
+
+    gabungan = union_all(*bagian).subquery()
+    return (
+        select(gabungan.c.id, func.max(gabungan.c.skor).label('skor'))
+        .group_by(gabungan.c.id)
+        .subquery()
+    )
+
+
+def terapkan_pencarian(query, jenis, kueri):
+    """Saring `query` (Model.query) dengan pencarian dan urutkan berdasarkan relevansi.
+
+    Urutan lain yang ditambahkan sesudahnya menjadi urutan kedua.
+    """
+    hasil = hasil_pencarian(jenis, kueri)
+    if hasil is None:
+        return query
+    model = SUMBER_PENCARIAN[jenis].model
+    return query.join(hasil, hasil.c.id == model.id).order_by(hasil.c.skor.desc())
+
+
+def cari_semua(kueri, batas=BATAS_HASIL):
+    """{jenis: [objek, ...]} hasil teratas tiap sumber, diurutkan berdasarkan relevansi"""
+    hasil = {}
+    for jenis, sumber in SUMBER_PENCARIAN.items():
+        ids = hasil_pencarian(jenis, kueri)
+        if ids is None:
+            hasil[jenis] = []
+            continue
+        hasil[jenis] = (
+            sumber.model.query
+            .join(ids, ids.c.id == sumber.model.id)
+            .order_by(ids.c.skor.desc())
+            .limit(batas)
+            .all()
+        )
+    return hasil
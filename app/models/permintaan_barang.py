@@ -3,6 +3,11 @@ from datetime import datetime
 
 class PermintaanBarang(db.Model):
     __tablename__ = 'permintaan_barang'
+    __table_args__ = (
+        # Urutan daftar monitor (paginasi keyset), dengan dan tanpa filter status
+        db.Index('ix_permintaan_barang_created_at_id', 'created_at', 'id'),
+        db.Index('ix_permintaan_barang_status_created_at_id', 'status', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     nama_pengguna = db.Column(db.String(255), nullable=False)
@@ -15,12 +20,24 @@ class PermintaanBarang(db.Model):
     tempat_penggunaan = db.Column(db.String(255), nullable=False)
     tanggal = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(50), default='terkirim', nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
     barang1 = db.relationship('Barang', foreign_keys=[barang1_id])
     barang2 = db.relationship('Barang', foreign_keys=[barang2_id])
     barang3 = db.relationship('Barang', foreign_keys=[barang3_id])
 
+    def daftar_barang(self):
+        """[(barang, banyaknya), ...] untuk slot barang yang terisi"""
+        return [
+            (barang, banyaknya)
+            for barang, banyaknya in (
+                (self.barang1, self.banyaknya1),
+                (self.barang2, self.banyaknya2),
+                (self.barang3, self.banyaknya3),
+            )
+            if barang is not None and banyaknya
+        ]
+
     def __repr__(self):
         return f'<PermintaanBarang {self.id}: {self.nama_pengguna}>'
\ No newline at end of file
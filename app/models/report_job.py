@@ -0,0 +1,107 @@
+from app import db
+from datetime import datetime, timedelta
+
+
+class ReportJob(db.Model):
+    """Antrean export laporan (Excel/PDF) yang dikerjakan worker di latar belakang.
+
+    Job dibuat dari halaman laporan, diambil worker (`flask laporan worker`),
+    hasilnya disimpan sebagai file di disk dan bisa diunduh sampai `expires_at`.
+    """
+    __tablename__ = 'report_job'
+
+    STATUS_AKTIF = ('antri', 'proses')
+
+    id = db.Column(db.Integer, primary_key=True)
+    jenis = db.Column(db.String(50), nullable=False, comment='Jenis laporan, mis. barang, aset_tetap')
+    format_file = db.Column(db.String(10), nullable=False, comment='excel atau pdf')
+    parameter = db.Column(db.Text, comment='Query string filter laporan')
+    status = db.Column(
+        db.Enum('antri', 'proses', 'selesai', 'gagal', 'kedaluwarsa', name='report_job_status'),
+        default='antri',
+        nullable=False,
+        index=True
+    )
+    pesan_error = db.Column(db.Text)
+    nama_file = db.Column(db.String(255))
+    path_file = db.Column(db.String(500))
+    ukuran_file = db.Column(db.Integer)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime, index=True)
+
+    # Relationship
+    user = db.relationship('User', backref=db.backref('report_job_list', lazy='dynamic'))
+
+    def __repr__(self):
+        return f'<ReportJob {self.id} {self.jenis}/{self.format_file} {self.status}>'
+
+    @property
+    def bisa_diunduh(self):
+        return (
+            self.status == 'selesai'
+            and self.expires_at is not None
+            and self.expires_at > datetime.utcnow()
+        )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'jenis': self.jenis,
+            'format_file': self.format_file,
+            'status': self.status,
+            'pesan_error': self.pesan_error,
+            'nama_file': self.nama_file,
+            'ukuran_file': self.ukuran_file,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+    @staticmethod
+    def klaim_berikutnya():
+        """Ambil satu job 'antri' tertua dan tandai 'proses'.
+
+        UPDATE bersyarat status='antri' memastikan satu job hanya diambil satu
+        worker walaupun beberapa worker berjalan bersamaan. Mengembalikan id job
+        atau None jika antrean kosong.
+        """
+        while True:
+            job_id = db.session.query(ReportJob.id).filter(
+                ReportJob.status == 'antri'
+            ).order_by(ReportJob.id).limit(1).scalar()
+            if job_id is None:
+                db.session.commit()
+                return None
+
+            diambil = ReportJob.query.filter(
+                ReportJob.id == job_id,
+                ReportJob.status == 'antri'
+            ).update(
+                {'status': 'proses', 'started_at': datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.session.commit()
+            if diambil:
+                return job_id
+
+    @staticmethod
+    def tandai_macet(batas_menit):
+        """Job yang terlalu lama berstatus 'proses' (worker mati) ditandai gagal"""
+        batas = datetime.utcnow() - timedelta(minutes=batas_menit)
+        jumlah = ReportJob.query.filter(
+            ReportJob.status == 'proses',
+            ReportJob.started_at < batas
+        ).update(
+            {
+                'status': 'gagal',
+                'pesan_error': 'Worker berhenti sebelum job selesai',
+                'finished_at': datetime.utcnow()
+            },
+            synchronize_session=False
+        )
+        db.session.commit()
+        return jumlah
@@ -0,0 +1,233 @@
+from app import db
+from app.models.barang import Barang, BarangMasuk, BarangKeluar
+from app.models.versi_data import catat_versi_berubah
+from datetime import datetime
+from sqlalchemy import case, event, func, inspect, literal, select
+
+
+class StokSaldo(db.Model):
+    """Saldo stok per barang yang dijaga otomatis setiap ada transaksi masuk/keluar.
+
+    Stok akhir = barang.stok_awal + total_masuk - total_keluar, sehingga perubahan
+    stok awal di master barang tidak perlu menyentuh tabel ini.
+    """
+    __tablename__ = 'stok_saldo'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kode_barang = db.Column(
+        db.String(50),
+        db.ForeignKey('barang.kode_barang', onupdate='CASCADE', ondelete='CASCADE'),
+        unique=True,
+        nullable=False,
+        index=True
+    )
+    total_masuk = db.Column(db.Integer, default=0, nullable=False)
+    total_keluar = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship
+    barang = db.relationship(
+        'Barang',
+        backref=db.backref('stok_saldo', uselist=False, cascade='all, delete-orphan')
+    )
+
+    def __repr__(self):
+        return f'<StokSaldo {self.kode_barang}: +{self.total_masuk} -{self.total_keluar}>'
+
+    @staticmethod
+    def subquery_total(model, sebelum=None):
+        """Subquery SUM(qty) per kode_barang untuk BarangMasuk/BarangKeluar.
+
+        Jika `sebelum` diisi, hanya transaksi dengan tanggal < sebelum yang dihitung.
+        """
+        query = db.session.query(
+            model.kode_barang.label('kode_barang'),
+            func.sum(model.qty).label('total')
+        )
+        if sebelum is not None:
+            query = query.filter(model.tanggal < sebelum)
+        return query.group_by(model.kode_barang).subquery()
+
+    @classmethod
+    def hitung_dari_transaksi(cls, sebelum=None):
+        """Query (kode_barang, total_masuk, total_keluar) hasil agregasi langsung dari tabel transaksi"""
+        masuk = cls.subquery_total(BarangMasuk, sebelum)
+        keluar = cls.subquery_total(BarangKeluar, sebelum)
+        return db.session.query(
+            Barang.kode_barang,
+            func.coalesce(masuk.c.total, 0).label('total_masuk'),
+            func.coalesce(keluar.c.total, 0).label('total_keluar')
+        ).outerjoin(
+            masuk, masuk.c.kode_barang == Barang.kode_barang
+        ).outerjoin(
+            keluar, keluar.c.kode_barang == Barang.kode_barang
+        )
+
+    @classmethod
+    def cek_selisih(cls):
+        """Bandingkan saldo tersimpan dengan agregat transaksi.
+
+        Return list dict untuk setiap barang yang saldonya tidak cocok atau belum punya baris saldo.
+        """
+        tersimpan = {
+            s.kode_barang: (s.total_masuk, s.total_keluar)
+            for s in cls.query.all()
+        }
+        selisih = []
+        for kode_barang, total_masuk, total_keluar in cls.hitung_dari_transaksi().all():
+            aktual = (int(total_masuk), int(total_keluar))
+            if tersimpan.get(kode_barang) != aktual:
+                selisih.append({
+                    'kode_barang': kode_barang,
+                    'tersimpan': tersimpan.get(kode_barang),
+                    'aktual': aktual
+                })
+        return selisih
+
+    @classmethod
+    def rebuild(cls):
+        """Hitung ulang seluruh saldo dari tabel transaksi (tidak melakukan commit)"""
+        now = datetime.utcnow()
+        cls.query.delete(synchronize_session=False)
+        agregat = cls.hitung_dari_transaksi().add_columns(
+            literal(now).label('updated_at')
+        )
+        db.session.execute(
+            cls.__table__.insert().from_select(
+                ['kode_barang', 'total_masuk', 'total_keluar', 'updated_at'],
+                agregat.statement
+            )
+        )
+        catat_versi_berubah(db.session, ['stok_saldo'])
+        return cls.query.count()
+
+
+def _ubah_saldo(connection, kode_barang, kolom, delta, buat_jika_kosong=True):
+    """Tambahkan delta ke kolom saldo; buat baris dari agregat jika belum ada."""
+    if not kode_barang:
+        return
+
+    tabel = StokSaldo.__table__
+    result = connection.execute(
+        tabel.update()
+        .where(tabel.c.kode_barang == kode_barang)
+        .values({kolom: tabel.c[kolom] + delta, 'updated_at': datetime.utcnow()})
+    )
+    if result.rowcount or not buat_jika_kosong:
+        return
+
+    # Baris saldo belum ada (mis. data lama sebelum tabel ini dibuat): hitung
+    # dari agregat, yang sudah termasuk baris transaksi yang sedang di-flush.
+    total = {}
+    for nama, model in (('total_masuk', BarangMasuk), ('total_keluar', BarangKeluar)):
+        total[nama] = connection.execute(
+            select(func.coalesce(func.sum(model.qty), 0))
+            .where(model.kode_barang == kode_barang)
+        ).scalar() or 0
+    connection.execute(
+        tabel.insert().values(kode_barang=kode_barang, updated_at=datetime.utcnow(), **total)
+    )
+
+
+def tambah_saldo_bulk(connection, kolom, delta_per_kode):
+    """Tambahkan delta ke kolom saldo banyak barang dengan satu UPDATE.
+
+    Dipakai setelah insert transaksi massal (tanpa event per objek). Barang yang
+    belum punya baris saldo dibuatkan dari agregat seperti _ubah_saldo.
+    """
+    delta_per_kode = {kode: delta for kode, delta in delta_per_kode.items() if kode}
+    if not delta_per_kode:
+        return
+
+    tabel = StokSaldo.__table__
+    result = connection.execute(
+        tabel.update()
+        .where(tabel.c.kode_barang.in_(list(delta_per_kode)))
+        .values({
+            kolom: tabel.c[kolom] + case(delta_per_kode, value=tabel.c.kode_barang, else_=0),
+            'updated_at': datetime.utcnow()
+        })
+    )
+    if result.rowcount == len(delta_per_kode):
+        return
+
+    ada = set(connection.execute(
+        select(tabel.c.kode_barang).where(tabel.c.kode_barang.in_(list(delta_per_kode)))
+    ).scalars())
+    for kode_barang in delta_per_kode:
+        if kode_barang not in ada:
+            # Agregat sudah termasuk transaksi yang baru di-insert
+            _ubah_saldo(connection, kode_barang, kolom, 0)
+
+
+def buat_saldo_belum_ada(connection, kode_list):
+    """Buat baris saldo untuk barang (dari kode_list) yang belum punya, dengan satu INSERT ... SELECT.
+
+    Dipakai setelah insert barang massal yang tidak memicu event after_insert.
+    Total dihitung dari transaksi barang tersebut (nol untuk barang baru).
+    """
+    kode_list = list(kode_list)
+    if not kode_list:
+        return
+
+    tabel = StokSaldo.__table__
+    barang = Barang.__table__
+
+    def total(model):
+        return select(func.coalesce(func.sum(model.qty), 0)).where(
+            model.kode_barang == barang.c.kode_barang
+        ).scalar_subquery()
+
+    belum_ada = select(
+        barang.c.kode_barang,
+        total(BarangMasuk),
+        total(BarangKeluar),
+        literal(datetime.utcnow())
+    ).select_from(
+        barang.outerjoin(tabel, tabel.c.kode_barang == barang.c.kode_barang)
+    ).where(
+        barang.c.kode_barang.in_(kode_list),
+        tabel.c.id.is_(None)
+    )
+    connection.execute(
+        tabel.insert().from_select(['kode_barang', 'total_masuk', 'total_keluar', 'updated_at'], belum_ada)
+    )
+
+
+def _daftarkan_listener(model, kolom):
+    # active_history memastikan nilai lama kode_barang/qty ikut dimuat saat
+    # atribut diubah, sehingga selisihnya bisa dipindahkan dengan benar.
+    for atribut in (model.kode_barang, model.qty):
+        event.listen(atribut, 'set', lambda target, value, oldvalue, initiator: value,
+                     active_history=True, retval=True)
+
+    @event.listens_for(model, 'after_insert')
+    def _setelah_insert(mapper, connection, target):
+        _ubah_saldo(connection, target.kode_barang, kolom, target.qty or 0)
+
+    @event.listens_for(model, 'after_update')
+    def _setelah_update(mapper, connection, target):
+        state = inspect(target)
+        kode_hist = state.attrs.kode_barang.history
+        qty_hist = state.attrs.qty.history
+        if not kode_hist.has_changes() and not qty_hist.has_changes():
+            return
+
+        kode_lama = kode_hist.deleted[0] if kode_hist.deleted else target.kode_barang
+        qty_lama = qty_hist.deleted[0] if qty_hist.deleted else target.qty
+
+        _ubah_saldo(connection, kode_lama, kolom, -(qty_lama or 0), buat_jika_kosong=False)
+        _ubah_saldo(connection, target.kode_barang, kolom, target.qty or 0)
+
+    @event.listens_for(model, 'after_delete')
+    def _setelah_delete(mapper, connection, target):
+        _ubah_saldo(connection, target.kode_barang, kolom, -(target.qty or 0), buat_jika_kosong=False)
+
+
+_daftarkan_listener(BarangMasuk, 'total_masuk')
+_daftarkan_listener(BarangKeluar, 'total_keluar')
+
+
+@event.listens_for(Barang, 'after_insert')
+def _buat_saldo_barang_baru(mapper, connection, target):
+    _ubah_saldo(connection, target.kode_barang, 'total_masuk', 0)
@@ -0,0 +1,201 @@
+from app import db
+from app.models.barang import Barang, BarangMasuk, BarangKeluar
+from app.models.stok_saldo import StokSaldo
+from datetime import date, datetime
+from sqlalchemy import and_, bindparam, event, func, inspect, literal, or_
+
+
+def awal_bulan(tanggal):
+    """Tanggal 1 dari bulan `tanggal`"""
+    return date(tanggal.year, tanggal.month, 1)
+
+
+def bulan_berikutnya(tanggal):
+    """Tanggal 1 bulan berikutnya"""
+    if tanggal.month == 12:
+        return date(tanggal.year + 1, 1, 1)
+    return date(tanggal.year, tanggal.month + 1, 1)
+
+
+class StokSnapshot(db.Model):
+    """Checkpoint bulanan total transaksi per barang.
+
+    Baris dengan `periode` = P menyimpan total masuk/keluar dari semua transaksi
+    dengan tanggal < P, sehingga stok pada suatu tanggal cukup dihitung dari
+    checkpoint terdekat ditambah transaksi sejak P.
+    """
+    __tablename__ = 'stok_snapshot'
+    __table_args__ = (
+        db.UniqueConstraint('kode_barang', 'periode', name='uq_stok_snapshot_kode_periode'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kode_barang = db.Column(
+        db.String(50),
+        db.ForeignKey('barang.kode_barang', onupdate='CASCADE', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    periode = db.Column(db.Date, nullable=False, index=True, comment='Tanggal 1 bulan checkpoint')
+    total_masuk = db.Column(db.Integer, default=0, nullable=False)
+    total_keluar = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationship
+    barang = db.relationship(
+        'Barang',
+        backref=db.backref('stok_snapshot', lazy='dynamic', cascade='all, delete-orphan')
+    )
+
+    def __repr__(self):
+        return f'<StokSnapshot {self.kode_barang} {self.periode}: +{self.total_masuk} -{self.total_keluar}>'
+
+    @classmethod
+    def buat_snapshot(cls, periode):
+        """Buat (atau timpa) checkpoint semua barang untuk periode tertentu (tidak melakukan commit)"""
+        periode = awal_bulan(periode)
+        cls.query.filter_by(periode=periode).delete(synchronize_session=False)
+        agregat = StokSaldo.hitung_dari_transaksi(sebelum=periode).add_columns(
+            literal(periode).label('periode'),
+            literal(datetime.utcnow()).label('created_at')
+        )
+        db.session.execute(
+            cls.__table__.insert().from_select(
+                ['kode_barang', 'total_masuk', 'total_keluar', 'periode', 'created_at'],
+                agregat.statement
+            )
+        )
+        return cls.query.filter_by(periode=periode).count()
+
+    @classmethod
+    def periode_belum_ada(cls, sampai=None):
+        """List periode bulanan yang belum punya checkpoint, dari transaksi pertama sampai `sampai`"""
+        sampai = awal_bulan(sampai or date.today())
+        tanggal_pertama = [
+            db.session.query(func.min(model.tanggal)).scalar()
+            for model in (BarangMasuk, BarangKeluar)
+        ]
+        tanggal_pertama = [t for t in tanggal_pertama if t is not None]
+        if not tanggal_pertama:
+            return []
+
+        sudah_ada = {p for (p,) in db.session.query(cls.periode).distinct().all()}
+        # Checkpoint pertama yang berguna adalah awal bulan setelah transaksi pertama
+        periode = bulan_berikutnya(awal_bulan(min(tanggal_pertama)))
+        hasil = []
+        while periode <= sampai:
+            if periode not in sudah_ada:
+                hasil.append(periode)
+            periode = bulan_berikutnya(periode)
+        return hasil
+
+    @classmethod
+    def periode_terdekat(cls, tanggal):
+        """Periode checkpoint terakhir yang <= tanggal (None jika belum ada)"""
+        return db.session.query(func.max(cls.periode)).filter(cls.periode <= tanggal).scalar()
+
+    @classmethod
+    def total_sampai(cls, tanggal, kode_barang_list=None):
+        """Total masuk/keluar per barang untuk transaksi dengan tanggal <= `tanggal`.
+
+        Memakai checkpoint terdekat lalu hanya menjumlahkan transaksi sejak checkpoint.
+        Return dict {kode_barang: (total_masuk, total_keluar)}.
+        """
+        if isinstance(tanggal, datetime):
+            tanggal = tanggal.date()
+        periode = cls.periode_terdekat(tanggal)
+
+        hasil = {}
+        if periode is not None:
+            query = db.session.query(cls.kode_barang, cls.total_masuk, cls.total_keluar).filter(
+                cls.periode == periode
+            )
+            if kode_barang_list is not None:
+                query = query.filter(cls.kode_barang.in_(kode_barang_list))
+            hasil = {kode: (masuk, keluar) for kode, masuk, keluar in query.all()}
+
+        for posisi, model in enumerate((BarangMasuk, BarangKeluar)):
+            query = db.session.query(model.kode_barang, func.sum(model.qty)).filter(
+                model.tanggal <= tanggal
+            )
+            if periode is not None:
+                # Barang tanpa baris checkpoint (mis. barang baru) dihitung dari awal
+                query = query.outerjoin(
+                    cls, and_(cls.kode_barang == model.kode_barang, cls.periode == periode)
+                ).filter(or_(cls.id.is_(None), model.tanggal >= periode))
+            if kode_barang_list is not None:
+                query = query.filter(model.kode_barang.in_(kode_barang_list))
+
+            for kode, total in query.group_by(model.kode_barang).all():
+                total_lama = list(hasil.get(kode, (0, 0)))
+                total_lama[posisi] += int(total or 0)
+                hasil[kode] = tuple(total_lama)
+
+        return hasil
+
+
+def _geser_snapshot(connection, kode_barang, tanggal, kolom, delta):
+    """Koreksi checkpoint setelah `tanggal` untuk transaksi yang tanggalnya sudah lewat"""
+    if not kode_barang or tanggal is None or not delta:
+        return
+
+    tabel = StokSnapshot.__table__
+    connection.execute(
+        tabel.update()
+        .where(tabel.c.kode_barang == kode_barang, tabel.c.periode > tanggal)
+        .values({kolom: tabel.c[kolom] + delta})
+    )
+
+
+def geser_snapshot_bulk(connection, kolom, delta_per_kode_tanggal):
+    """Versi massal _geser_snapshot untuk {(kode_barang, tanggal): delta}.
+
+    Dipakai setelah insert transaksi massal (tanpa event per objek); satu
+    UPDATE yang dijalankan sekali untuk semua pasangan (executemany).
+    """
+    parameter = [
+        {'b_kode': kode_barang, 'b_tanggal': tanggal, 'b_delta': delta}
+        for (kode_barang, tanggal), delta in delta_per_kode_tanggal.items()
+        if kode_barang and tanggal is not None and delta
+    ]
+    if not parameter:
+        return
+
+    tabel = StokSnapshot.__table__
+    connection.execute(
+        tabel.update()
+        .where(tabel.c.kode_barang == bindparam('b_kode'), tabel.c.periode > bindparam('b_tanggal'))
+        .values({kolom: tabel.c[kolom] + bindparam('b_delta')}),
+        parameter
+    )
+
+
+def _daftarkan_listener(model, kolom):
+    event.listen(model.tanggal, 'set', lambda target, value, oldvalue, initiator: value,
+                 active_history=True, retval=True)
+
+    @event.listens_for(model, 'after_insert')
+    def _setelah_insert(mapper, connection, target):
+        _geser_snapshot(connection, target.kode_barang, target.tanggal, kolom, target.qty or 0)
+
+    @event.listens_for(model, 'after_update')
+    def _setelah_update(mapper, connection, target):
+        state = inspect(target)
+        riwayat = {nama: state.attrs[nama].history for nama in ('kode_barang', 'tanggal', 'qty')}
+        if not any(h.has_changes() for h in riwayat.values()):
+            return
+
+        lama = {
+            nama: h.deleted[0] if h.deleted else getattr(target, nama)
+            for nama, h in riwayat.items()
+        }
+        _geser_snapshot(connection, lama['kode_barang'], lama['tanggal'], kolom, -(lama['qty'] or 0))
+        _geser_snapshot(connection, target.kode_barang, target.tanggal, kolom, target.qty or 0)
+
+    @event.listens_for(model, 'after_delete')
+    def _setelah_delete(mapper, connection, target):
+        _geser_snapshot(connection, target.kode_barang, target.tanggal, kolom, -(target.qty or 0))
+
+
+_daftarkan_listener(BarangMasuk, 'total_masuk')
+_daftarkan_listener(BarangKeluar, 'total_keluar')
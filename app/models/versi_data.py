@@ -0,0 +1,151 @@
+from app import db
+from flask import current_app
+from datetime import datetime
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+import time
+
+
+# Tabel yang perubahannya memengaruhi isi laporan dan angka statistik
+TABEL_DIPANTAU = frozenset({
+    'barang',
+    'barang_masuk',
+    'barang_keluar',
+    'stok_saldo',
+    'kontrak_barang',
+    'barang_kontrak',
+    'aset_tetap',
+    'laporan_kerusakan',
+    'kategori_barang',
+    'merk_barang',
+    'merk_aset_tetap',
+    'permintaan_barang',
+})
+
+
+class VersiData(db.Model):
+    """Penghitung perubahan per tabel, dipakai sebagai bagian kunci cache laporan.
+
+    Tabel di TABEL_DIPANTAU yang berubah saat flush dicatat, lalu versinya
+    dinaikkan setelah commit dalam transaksi singkat terpisah, sehingga file
+    laporan yang di-cache otomatis tidak terpakai lagi begitu datanya berubah.
+    Baris versi tidak ikut terkunci selama transaksi penulis berjalan, jadi
+    penulis yang menyentuh tabel yang sama tidak saling menunggu di sini.
+    """
+    __tablename__ = 'versi_data'
+
+    nama_tabel = db.Column(db.String(64), primary_key=True)
+    versi = db.Column(db.BigInteger, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<VersiData {self.nama_tabel}={self.versi}>'
+
+    @staticmethod
+    def ambil(nama_tabel_list):
+        """{nama_tabel: versi} untuk tabel-tabel tersebut.
+
+        Baris yang belum ada dibuat dalam transaksi terpisah (langsung commit)
+        supaya versi awalnya tetap sama di request berikutnya.
+        """
+        nama_tabel_list = sorted(set(nama_tabel_list))
+        query = select(VersiData.nama_tabel, VersiData.versi).where(
+            VersiData.nama_tabel.in_(nama_tabel_list)
+        )
+        versi = dict(db.session.execute(query).all())
+
+        belum_ada = [nama for nama in nama_tabel_list if nama not in versi]
+        if belum_ada:
+            try:
+                with db.engine.begin() as connection:
+                    _buat_baris(connection, belum_ada)
+            except IntegrityError:
+                pass  # dibuat bersamaan oleh proses lain
+            versi = dict(db.session.execute(query).all())
+        return versi
+
+
+def _versi_awal():
+    # Versi awal berupa timestamp (ms), bukan 0, agar kunci cache tidak
+    # bentrok dengan file cache lama setelah database dibuat ulang.
+    return int(time.time() * 1000)
+
+
+def _buat_baris(connection, nama_tabel_list):
+    now = datetime.utcnow()
+    connection.execute(
+        VersiData.__table__.insert(),
+        [{'nama_tabel': nama, 'versi': _versi_awal(), 'updated_at': now} for nama in nama_tabel_list]
+    )
+
+
+def naikkan_versi(connection, nama_tabel_list):
+    """Naikkan versi tabel-tabel tersebut (satu UPDATE; INSERT untuk yang belum ada)"""
+    nama_tabel_list = sorted(set(nama_tabel_list))
+    if not nama_tabel_list:
+        return
+
+    tabel = VersiData.__table__
+    result = connection.execute(
+        tabel.update()
+        .where(tabel.c.nama_tabel.in_(nama_tabel_list))
+        .values(versi=tabel.c.versi + 1, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == len(nama_tabel_list):
+        return
+
+    ada = set(connection.execute(
+        select(tabel.c.nama_tabel).where(tabel.c.nama_tabel.in_(nama_tabel_list))
+    ).scalars())
+    baru = [nama for nama in nama_tabel_list if nama not in ada]
+    if baru:
+        _buat_baris(connection, baru)
+
+
+def catat_versi_berubah(session, nama_tabel_list):
+    """Tandai tabel yang diubah tanpa flush ORM (mis. insert massal); versinya naik setelah commit"""
+    session.info.setdefault('versi_berubah', set()).update(nama_tabel_list)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _catat_perubahan(session, flush_context):
+    berubah = set()
+    for obj in session.new:
+        berubah.add(getattr(obj, '__tablename__', None))
+    for obj in session.deleted:
+        berubah.add(getattr(obj, '__tablename__', None))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            berubah.add(getattr(obj, '__tablename__', None))
+
+    berubah &= TABEL_DIPANTAU
+    if berubah:
+        catat_versi_berubah(session, berubah)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _naikkan_setelah_commit(session):
+    if session.get_nested_transaction() is not None:
+        return  # SAVEPOINT selesai, transaksi luar belum commit
+    berubah = session.info.pop('versi_berubah', None)
+    if not berubah:
+        return
+
+    # Data sudah tersimpan; jika kenaikan versi gagal, laporan lama di cache
+    # masih terpakai sampai perubahan berikutnya, jadi cukup dicatat di log.
+    try:
+        try:
+            with session.get_bind().begin() as connection:
+                naikkan_versi(connection, berubah)
+        except IntegrityError:
+            # Baris versi baru dibuat bersamaan oleh proses lain: ulangi sebagai UPDATE
+            with session.get_bind().begin() as connection:
+                naikkan_versi(connection, berubah)
+    except SQLAlchemyError:
+        current_app.logger.exception('Gagal menaikkan versi data: %s', ', '.join(sorted(berubah)))
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _lupakan_setelah_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('versi_berubah', None)
@@ -1,4 +1,5 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, abort
+from flask_login import current_user
 from datetime import date
 from app import db
 from app.aset_tetap.forms import LaporanKerusakanPublicForm
@@ -7,6 +8,7 @@ from app.models.aset_tetap import AsetTetap
 from app.models.laporan_kerusakan import LaporanKerusakan
 from app.models.permintaan_barang import PermintaanBarang
 from app.models.barang import Barang
+from app.utils.autocomplete import SUMBER_AUTOCOMPLETE
 
 bp = Blueprint('main', __name__)
 
@@ -19,13 +21,6 @@ def about():
     return render_template('about.html')
 
 
-def _build_aset_choices():
-    return [(0, '-- Pilih Aset --')] + [
-        (a.id, f'{a.kode_aset} - {a.nama_aset}')
-        for a in AsetTetap.query.order_by(AsetTetap.kode_aset).all()
-    ]
-
-
 def _build_nama_pengguna_choices():
     """Ambil nama pengguna yang unik dari aset_tetap yang tidak kosong"""
     aset_list = AsetTetap.query.filter(
@@ -54,16 +49,35 @@ def get_aset_by_pengguna(nama_pengguna):
     return jsonify(result)
 
 
+@bp.route('/api/autocomplete/<sumber>')
+def autocomplete(sumber):
+    """API autocomplete pilihan form: ?q=<awalan kode/nama>&page=<n>"""
+    sumber_autocomplete = SUMBER_AUTOCOMPLETE.get(sumber)
+    if sumber_autocomplete is None:
+        abort(404)
+    if not sumber_autocomplete.publik and not current_user.is_authenticated:
+        abort(401)
+
+    kueri = request.args.get('q', '', type=str)
+    page = request.args.get('page', 1, type=int)
+    pilihan, ada_lagi = sumber_autocomplete.cari(kueri, page)
+
+    return jsonify({
+        'results': [{'id': nilai, 'text': label} for nilai, label in pilihan],
+        'pagination': {'more': ada_lagi}
+    })
+
+
 @bp.route('/lapor-kerusakan', methods=['GET', 'POST'])
 @bp.route('/user/lapor-kerusakan', methods=['GET', 'POST'])
 def lapor_kerusakan_public():
     form = LaporanKerusakanPublicForm()
-    form.aset_tetap_id.choices = _build_aset_choices()
     form.nama_pengguna.choices = _build_nama_pengguna_choices()
 
     if request.method == 'GET':
         aset_id = request.args.get('aset_id', type=int)
-        if aset_id and any(choice_id == aset_id for choice_id, _ in form.aset_tetap_id.choices):
+        if aset_id:
+            # Pilihan aset dirender hanya jika id-nya ada
             form.aset_tetap_id.data = aset_id
 
         if not form.jumlah.data:
@@ -71,7 +85,7 @@ def lapor_kerusakan_public():
         if not form.tanggal_diketahui_rusak.data:
             form.tanggal_diketahui_rusak.data = date.today()
 
-    if len(form.aset_tetap_id.choices) <= 1:
+    if db.session.query(AsetTetap.id).first() is None:
         flash('Belum ada data aset. Hubungi admin untuk menambahkan aset terlebih dahulu.', 'warning')
         return render_template('laporan_kerusakan_public.html', form=form, title='Lapor Kerusakan Aset')
 
@@ -80,7 +94,7 @@ def lapor_kerusakan_public():
             flash('Pilih aset terlebih dahulu.', 'danger')
             return render_template('laporan_kerusakan_public.html', form=form, title='Lapor Kerusakan Aset')
 
-        aset = AsetTetap.query.get(form.aset_tetap_id.data)
+        aset = form.aset_tetap_id.objek
         if aset is None:
             flash('Aset tidak ditemukan. Silakan pilih aset lain.', 'danger')
             return render_template('laporan_kerusakan_public.html', form=form, title='Lapor Kerusakan Aset')
@@ -114,9 +128,11 @@ def permintaan_barang_public():
     form = PermintaanBarangPublicForm()
     
     # Build choices for barang select fields
+    barang_atk = Barang.query.filter_by(kategori_id=3).order_by(Barang.kode_barang).all()
+    stok_map = Barang.stok_akhir_bulk(barang_atk)
     barang_choices = [(0, '-- Pilih Barang --')] + [
-        (b.id, f'{b.kode_barang} - {b.nama_barang} (Stok: {b.get_stok_akhir()})')
-        for b in Barang.query.filter_by(kategori_id=3).order_by(Barang.kode_barang).all()
+        (b.id, f'{b.kode_barang} - {b.nama_barang} (Stok: {stok_map[b.kode_barang]})')
+        for b in barang_atk
     ]
     
     form.nama_barang1.choices = barang_choices
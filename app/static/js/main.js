@@ -1,4 +1,76 @@
 // Main JavaScript file
 console.log("Inven-Go initialized");
 
-// Add your custom JavaScript code here
+// Autocomplete untuk <select data-autocomplete-url="..."> (lihat app/utils/autocomplete.py).
+// Pilihan diambil per halaman dari server sesuai teks yang diketik.
+(function () {
+  const OPSI_LAGI = "__lagi__";
+
+  function pasangAutocomplete(select) {
+    const url = select.dataset.autocompleteUrl;
+    const pertama = select.options[0];
+    const placeholder =
+      pertama && (pertama.value === "" || pertama.value === "0") ? pertama : null;
+
+    const input = document.createElement("input");
+    input.type = "search";
+    input.className = "form-control form-control-sm mb-1";
+    input.placeholder = "Ketik kode atau nama untuk mencari...";
+    input.autocomplete = "off";
+    select.parentNode.insertBefore(input, select);
+
+    let halaman = 1;
+    let nomorPermintaan = 0;
+    let sudahDimuat = false;
+    let nilaiSebelumnya = select.value;
+    let timer = null;
+
+    async function muat(tambah) {
+      const nomor = ++nomorPermintaan;
+      const params = new URLSearchParams({ q: input.value.trim(), page: halaman });
+      const res = await fetch(`${url}?${params}`);
+      if (!res.ok || nomor !== nomorPermintaan) return;
+      const data = await res.json();
+
+      const terpilih = nilaiSebelumnya;
+      Array.from(select.options).forEach(function (opt) {
+        if (opt.value === OPSI_LAGI) opt.remove();
+        else if (!tambah && opt !== placeholder && opt.value !== terpilih) opt.remove();
+      });
+      data.results.forEach(function (item) {
+        if (String(item.id) !== terpilih) select.add(new Option(item.text, item.id));
+      });
+      if (data.pagination.more) {
+        select.add(new Option("Muat lebih banyak...", OPSI_LAGI));
+      }
+      select.value = terpilih;
+      sudahDimuat = true;
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        halaman = 1;
+        muat(false);
+      }, 250);
+    });
+
+    select.addEventListener("focus", function () {
+      if (!sudahDimuat) muat(false);
+    });
+
+    select.addEventListener("change", function () {
+      if (select.value === OPSI_LAGI) {
+        select.value = nilaiSebelumnya;
+        halaman += 1;
+        muat(true);
+        return;
+      }
+      nilaiSebelumnya = select.value;
+    });
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("select[data-autocomplete-url]").forEach(pasangAutocomplete);
+  });
+})();
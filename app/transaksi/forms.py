@@ -1,14 +1,36 @@
 from flask_wtf import FlaskForm
-from wtforms import SelectField, IntegerField, DateField, TextAreaField, SubmitField
-from wtforms.validators import DataRequired, NumberRange
+from wtforms import Form, FieldList, FormField, IntegerField, DateField, StringField, TextAreaField, SubmitField
+from wtforms.validators import DataRequired, NumberRange, Optional
 from datetime import date
+from app.utils.autocomplete import AutocompleteField
+from app.utils.transaksi_batch import BATAS_BARIS_BATCH
 
 class TransaksiForm(FlaskForm):
     tanggal = DateField('Tanggal', validators=[DataRequired(message='Tanggal wajib diisi')], default=date.today)
-    kode_barang = SelectField('Barang', validators=[DataRequired(message='Barang wajib dipilih')], coerce=str)
+    kode_barang = AutocompleteField('Barang', validators=[DataRequired(message='Barang wajib dipilih')],
+                                    sumber='barang_kode', placeholder=('', '-- Pilih Barang --'))
     qty = IntegerField('Jumlah', validators=[
         DataRequired(message='Jumlah wajib diisi'),
         NumberRange(min=1, message='Jumlah minimal 1')
     ])
     keterangan = TextAreaField('Keterangan')
     submit = SubmitField('Simpan')
+
+
+class BarisTransaksiForm(Form):
+    """Satu baris pada form input banyak transaksi (tanpa CSRF sendiri)"""
+    kode_barang = StringField('Kode Barang', validators=[Optional()])
+    qty = IntegerField('Jumlah', validators=[
+        Optional(),
+        NumberRange(min=1, message='Jumlah minimal 1')
+    ])
+    keterangan = StringField('Keterangan', validators=[Optional()])
+
+    def kosong(self):
+        return not (self.kode_barang.data or '').strip() and self.qty.data is None
+
+
+class TransaksiBatchForm(FlaskForm):
+    tanggal = DateField('Tanggal', validators=[DataRequired(message='Tanggal wajib diisi')], default=date.today)
+    baris = FieldList(FormField(BarisTransaksiForm), min_entries=10, max_entries=BATAS_BARIS_BATCH)
+    submit = SubmitField('Simpan Semua')
@@ -1,18 +1,24 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from app.transaksi import bp
-from app.transaksi.forms import TransaksiForm
-from app.models.barang import Barang, BarangMasuk, BarangKeluar
+from app.transaksi.forms import TransaksiForm, TransaksiBatchForm
+from app.models.barang import BarangMasuk, BarangKeluar
 from app.models.user import UserLog
+from app.utils.keyset import paginate_keyset
+from app.utils.reservasi_stok import StokTidakCukup, ambil_stok
+from app.utils.transaksi_batch import galat_stok, siapkan_batch, simpan_batch
 from app import db
+from sqlalchemy.orm import joinedload
 
 @bp.route('/masuk')
 @login_required
 def masuk():
     """Halaman daftar transaksi barang masuk"""
-    page = request.args.get('page', 1, type=int)
-    transaksi_list = BarangMasuk.query.order_by(BarangMasuk.tanggal.desc(), BarangMasuk.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
+    cursor = request.args.get('cursor', type=str)
+    transaksi_list = paginate_keyset(
+        BarangMasuk.query.options(joinedload(BarangMasuk.barang)),
+        [BarangMasuk.tanggal, BarangMasuk.created_at, BarangMasuk.id],
+        cursor=cursor, per_page=20, estimasi=True
     )
     
     return render_template('transaksi/masuk_list.html',
@@ -25,10 +31,6 @@ def masuk_tambah():
     """Halaman tambah transaksi barang masuk"""
     form = TransaksiForm()
     
-    # Populate dropdown barang
-    barang_list = Barang.query.order_by(Barang.nama_barang).all()
-    form.kode_barang.choices = [(b.kode_barang, f'{b.kode_barang} - {b.nama_barang}') for b in barang_list]
-    
     if form.validate_on_submit():
         transaksi = BarangMasuk(
             tanggal=form.tanggal.data,
@@ -41,7 +43,7 @@ def masuk_tambah():
         db.session.commit()
         
         # Log aktivitas
-        barang = Barang.query.filter_by(kode_barang=form.kode_barang.data).first()
+        barang = form.kode_barang.objek
         UserLog.log_activity(
             user_id=current_user.id,
             activity='Barang Masuk',
@@ -63,10 +65,6 @@ def masuk_edit(id):
     transaksi = BarangMasuk.query.get_or_404(id)
     form = TransaksiForm(obj=transaksi)
     
-    # Populate dropdown barang
-    barang_list = Barang.query.order_by(Barang.nama_barang).all()
-    form.kode_barang.choices = [(b.kode_barang, f'{b.kode_barang} - {b.nama_barang}') for b in barang_list]
-    
     if form.validate_on_submit():
         transaksi.tanggal = form.tanggal.data
         transaksi.kode_barang = form.kode_barang.data
@@ -76,7 +74,7 @@ def masuk_edit(id):
         db.session.commit()
         
         # Log aktivitas
-        barang = Barang.query.filter_by(kode_barang=form.kode_barang.data).first()
+        barang = form.kode_barang.objek
         UserLog.log_activity(
             user_id=current_user.id,
             activity='Edit Barang Masuk',
@@ -121,9 +119,11 @@ def masuk_hapus(id):
 @login_required
 def keluar():
     """Halaman daftar transaksi barang keluar"""
-    page = request.args.get('page', 1, type=int)
-    transaksi_list = BarangKeluar.query.order_by(BarangKeluar.tanggal.desc(), BarangKeluar.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
+    cursor = request.args.get('cursor', type=str)
+    transaksi_list = paginate_keyset(
+        BarangKeluar.query.options(joinedload(BarangKeluar.barang)),
+        [BarangKeluar.tanggal, BarangKeluar.created_at, BarangKeluar.id],
+        cursor=cursor, per_page=20, estimasi=True
     )
     
     return render_template('transaksi/keluar_list.html',
@@ -136,17 +136,14 @@ def keluar_tambah():
     """Halaman tambah transaksi barang keluar"""
     form = TransaksiForm()
     
-    # Populate dropdown barang
-    barang_list = Barang.query.order_by(Barang.nama_barang).all()
-    form.kode_barang.choices = [(b.kode_barang, f'{b.kode_barang} - {b.nama_barang}') for b in barang_list]
-    
     if form.validate_on_submit():
-        # Cek stok
-        barang = Barang.query.filter_by(kode_barang=form.kode_barang.data).first()
-        stok_akhir = barang.get_stok_akhir()
-        
-        if form.qty.data > stok_akhir:
-            flash(f'Stok tidak cukup! Stok tersedia: {stok_akhir}', 'danger')
+        # Cek stok dengan baris saldo terkunci sampai commit di bawah
+        barang = form.kode_barang.objek
+        try:
+            ambil_stok({form.kode_barang.data: form.qty.data})
+        except StokTidakCukup as exc:
+            db.session.rollback()
+            flash(f'Stok tidak cukup! Stok tersedia: {exc.kekurangan[form.kode_barang.data][0]}', 'danger')
             return render_template('transaksi/keluar_form.html',
                                  title='Tambah Barang Keluar',
                                  form=form)
@@ -183,11 +180,19 @@ def keluar_edit(id):
     transaksi = BarangKeluar.query.get_or_404(id)
     form = TransaksiForm(obj=transaksi)
     
-    # Populate dropdown barang
-    barang_list = Barang.query.order_by(Barang.nama_barang).all()
-    form.kode_barang.choices = [(b.kode_barang, f'{b.kode_barang} - {b.nama_barang}') for b in barang_list]
-    
     if form.validate_on_submit():
+        # Qty lama kembali ke stok sebelum qty baru diambil
+        try:
+            ambil_stok({form.kode_barang.data: form.qty.data},
+                       dikembalikan={transaksi.kode_barang: transaksi.qty})
+        except StokTidakCukup as exc:
+            db.session.rollback()
+            flash(f'Stok tidak cukup! Stok tersedia: {exc.kekurangan[form.kode_barang.data][0]}', 'danger')
+            return render_template('transaksi/keluar_form.html',
+                                 title='Edit Barang Keluar',
+                                 form=form,
+                                 transaksi=transaksi)
+        
         transaksi.tanggal = form.tanggal.data
         transaksi.kode_barang = form.kode_barang.data
         transaksi.qty = form.qty.data
@@ -196,7 +201,7 @@ def keluar_edit(id):
         db.session.commit()
         
         # Log aktivitas
-        barang = Barang.query.filter_by(kode_barang=form.kode_barang.data).first()
+        barang = form.kode_barang.objek
         UserLog.log_activity(
             user_id=current_user.id,
             activity='Edit Barang Keluar',
@@ -234,3 +239,77 @@ def keluar_hapus(id):
     
     flash(f'Transaksi barang keluar berhasil dihapus!', 'success')
     return redirect(url_for('transaksi.keluar'))
+
+# === INPUT BANYAK TRANSAKSI ===
+
+JUDUL_BATCH = {
+    'masuk': 'Tambah Banyak Barang Masuk',
+    'keluar': 'Tambah Banyak Barang Keluar',
+}
+
+def _tambah_banyak(jenis):
+    """Form banyak baris transaksi; semua baris disimpan sekaligus atau tidak sama sekali"""
+    form = TransaksiBatchForm()
+    
+    if form.validate_on_submit():
+        entri_terisi = [entri for entri in form.baris if not entri.form.kosong()]
+        baris_list = [
+            {
+                'kode_barang': entri.form.kode_barang.data,
+                'qty': entri.form.qty.data,
+                'keterangan': entri.form.keterangan.data
+            }
+            for entri in entri_terisi
+        ]
+        baris_bersih, galat = siapkan_batch(jenis, baris_list, form.tanggal.data)
+        
+        if not galat:
+            try:
+                jumlah = simpan_batch(jenis, baris_bersih, current_user.id, request.remote_addr)
+            except StokTidakCukup as exc:
+                galat = galat_stok(baris_bersih, exc)
+            else:
+                flash(f'{jumlah} transaksi barang {jenis} berhasil ditambahkan!', 'success')
+                return redirect(url_for(f'transaksi.{jenis}'))
+        
+        for g in galat:
+            if g['baris']:
+                entri_terisi[g['baris'] - 1].form.kode_barang.errors.append(g['pesan'])
+            else:
+                flash(g['pesan'], 'danger')
+        flash('Tidak ada transaksi yang disimpan. Periksa kembali baris yang ditandai.', 'danger')
+    
+    return render_template('transaksi/batch_form.html',
+                         title=JUDUL_BATCH[jenis],
+                         jenis=jenis,
+                         form=form)
+
+@bp.route('/masuk/tambah-banyak', methods=['GET', 'POST'])
+@login_required
+def masuk_tambah_banyak():
+    """Halaman tambah banyak transaksi barang masuk"""
+    return _tambah_banyak('masuk')
+
+@bp.route('/keluar/tambah-banyak', methods=['GET', 'POST'])
+@login_required
+def keluar_tambah_banyak():
+    """Halaman tambah banyak transaksi barang keluar"""
+    return _tambah_banyak('keluar')
+
+@bp.route('/api/<any(masuk, keluar):jenis>/batch', methods=['POST'])
+@login_required
+def api_batch(jenis):
+    """Simpan banyak transaksi dari JSON {"tanggal": "YYYY-MM-DD", "baris": [{kode_barang, qty, tanggal?, keterangan?}]}"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('baris'), list):
+        return jsonify({'errors': [{'baris': 0, 'pesan': 'Body harus JSON dengan daftar "baris".'}]}), 400
+    
+    baris_bersih, galat = siapkan_batch(jenis, data['baris'], data.get('tanggal'))
+    if galat:
+        return jsonify({'errors': galat}), 400
+    
+    try:
+        jumlah = simpan_batch(jenis, baris_bersih, current_user.id, request.remote_addr)
+    except StokTidakCukup as exc:
+        return jsonify({'errors': galat_stok(baris_bersih, exc)}), 409
+    return jsonify({'jumlah': jumlah}), 201
@@ -0,0 +1,121 @@
+"""Autocomplete (type-ahead) untuk pilihan barang dan aset di form.
+
+Form tidak lagi memuat seluruh katalog ke <select>. Browser mengambil pilihan
+per halaman dari /api/autocomplete/<sumber> (pencarian awalan kode/nama yang
+memakai indeks B-tree), dan saat submit form hanya memeriksa bahwa id yang
+dikirim memang ada di database.
+"""
+
+from flask import url_for
+from sqlalchemy import or_
+from wtforms import SelectField
+from wtforms.validators import ValidationError
+
+from app.models.aset_tetap import AsetTetap
+from app.models.barang import Barang
+from app.models.pencarian import escape_like
+
+# Jumlah pilihan per halaman autocomplete
+BATAS_AUTOCOMPLETE = 20
+
+
+class SumberAutocomplete:
+    """Tabel sumber pilihan: kolom nilai, kolom yang dicari (awalan) dan format label"""
+
+    def __init__(self, model, kolom_nilai, kolom_cari, urut, format_label, publik=False):
+        self.model = model
+        self.kolom_nilai = kolom_nilai
+        self.kolom_cari = kolom_cari
+        self.urut = urut
+        self.format_label = format_label
+        # Boleh diakses tanpa login (form publik)
+        self.publik = publik
+
+    def nilai(self, obj):
+        return getattr(obj, self.kolom_nilai.key)
+
+    def cari(self, kueri, halaman=1, batas=BATAS_AUTOCOMPLETE):
+        """([(nilai, label), ...], ada_lagi) untuk kueri awalan pada halaman tersebut"""
+        query = self.model.query
+        kueri = (kueri or '').strip()
+        if kueri:
+            pola = f'{escape_like(kueri)}%'
+            query = query.filter(or_(*[kolom.like(pola, escape='\\') for kolom in self.kolom_cari]))
+
+        halaman = max(halaman, 1)
+        # Ambil satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya
+        baris = query.order_by(self.urut).offset((halaman - 1) * batas).limit(batas + 1).all()
+        return [(self.nilai(obj), self.format_label(obj)) for obj in baris[:batas]], len(baris) > batas
+
+    def ambil(self, nilai):
+        """Objek dengan nilai tersebut, atau None"""
+        if nilai in (None, ''):
+            return None
+        return self.model.query.filter(self.kolom_nilai == nilai).first()
+
+
+def _label_barang(barang):
+    return f'{barang.kode_barang} - {barang.nama_barang}'
+
+
+def _label_aset(aset):
+    return f'{aset.kode_aset} - {aset.nama_aset}'
+
+
+SUMBER_AUTOCOMPLETE = {
+    'barang': SumberAutocomplete(
+        Barang, Barang.id, [Barang.kode_barang, Barang.nama_barang],
+        Barang.nama_barang, _label_barang
+    ),
+    'barang_kode': SumberAutocomplete(
+        Barang, Barang.kode_barang, [Barang.kode_barang, Barang.nama_barang],
+        Barang.nama_barang, _label_barang
+    ),
+    'aset': SumberAutocomplete(
+        AsetTetap, AsetTetap.id, [AsetTetap.kode_aset, AsetTetap.nama_aset],
+        AsetTetap.kode_aset, _label_aset, publik=True
+    ),
+}
+
+
+class AutocompleteField(SelectField):
+    """SelectField yang pilihannya diambil lewat autocomplete.
+
+    Hanya placeholder dan pilihan yang sedang terpilih yang dirender; validasi
+    cukup memeriksa nilai yang dikirim ada di tabel sumber. Objek terpilih
+    tersedia di `field.objek` setelah validasi.
+    """
+
+    def __init__(self, label=None, validators=None, sumber=None, placeholder=None, **kwargs):
+        super().__init__(label, validators, choices=[], validate_choice=False, **kwargs)
+        self.sumber = sumber
+        self.placeholder = placeholder
+        self.objek = None
+
+    @property
+    def sumber_autocomplete(self):
+        return SUMBER_AUTOCOMPLETE[self.sumber]
+
+    def _objek_terpilih(self):
+        if not self.data:
+            return None
+        sumber = self.sumber_autocomplete
+        if self.objek is None or sumber.nilai(self.objek) != self.data:
+            self.objek = sumber.ambil(self.data)
+        return self.objek
+
+    def iter_choices(self):
+        objek = self._objek_terpilih()
+        if self.placeholder is not None:
+            yield (self.placeholder[0], self.placeholder[1], objek is None, {})
+        if objek is not None:
+            sumber = self.sumber_autocomplete
+            yield (sumber.nilai(objek), sumber.format_label(objek), True, {})
+
+    def pre_validate(self, form):
+        if self.data and self._objek_terpilih() is None:
+            raise ValidationError('Pilihan tidak ditemukan.')
+
+    def __call__(self, **kwargs):
+        kwargs.setdefault('data-autocomplete-url', url_for('main.autocomplete', sumber=self.sumber))
+        return super().__call__(**kwargs)
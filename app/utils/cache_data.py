@@ -0,0 +1,160 @@
+"""Cache data referensi (pilihan kategori, merk, merk aset tetap) dengan TTL.
+
+Backend dipilih lewat CACHE_DATA_BACKEND:
+- 'memori' (default): dict per proses, tanpa dependensi tambahan.
+- 'redis': server yang kompatibel dengan protokol Redis (Redis, Valkey, KeyDB)
+  di CACHE_DATA_REDIS_URL, dipakai bersama oleh semua proses. Butuh paket
+  `redis` (tidak termasuk requirements.txt).
+
+Kunci entri memuat versi tabel sumbernya (tabel versi_data, naik setelah setiap
+commit yang mengubah tabel itu), sehingga perubahan dari proses mana pun
+langsung membuat entri lama tidak terpakai, juga pada backend 'memori' dengan
+banyak worker. Entri kedaluwarsa setelah CACHE_DATA_DETIK detik (0 = cache
+mati); hapus_pilihan() membuang entri versi saat ini secara eksplisit.
+"""
+
+import json
+import threading
+import time
+
+from flask import current_app
+
+from app.models.kategori import KategoriBarang, MerkBarang
+from app.models.merk_aset_tetap import MerkAsetTetap
+from app.models.versi_data import VersiData
+
+# TTL bawaan jika CACHE_DATA_DETIK tidak diatur
+TTL_BAWAAN = 300
+
+# Awalan kunci di backend bersama (redis)
+AWALAN_KUNCI = 'inven-go:'
+
+
+class CacheMemori:
+    """Backend dict per proses"""
+
+    def __init__(self):
+        self._data = {}
+        self._kunci = threading.Lock()
+
+    def get(self, kunci):
+        with self._kunci:
+            entri = self._data.get(kunci)
+            if entri is None:
+                return None
+            kedaluwarsa, nilai = entri
+            if kedaluwarsa <= time.monotonic():
+                del self._data[kunci]
+                return None
+            return nilai
+
+    def set(self, kunci, nilai, ttl):
+        sekarang = time.monotonic()
+        with self._kunci:
+            # Entri versi lama tidak pernah dibaca lagi; buang yang sudah kedaluwarsa
+            for kunci_lama in [k for k, (kedaluwarsa, _) in self._data.items() if kedaluwarsa <= sekarang]:
+                del self._data[kunci_lama]
+            self._data[kunci] = (sekarang + ttl, nilai)
+
+    def delete(self, *kunci_list):
+        with self._kunci:
+            for kunci in kunci_list:
+                self._data.pop(kunci, None)
+
+    def clear(self):
+        with self._kunci:
+            self._data.clear()
+
+
+class CacheRedis:
+    """Backend server kompatibel Redis; nilai disimpan sebagai JSON"""
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "CACHE_DATA_BACKEND='redis' membutuhkan paket redis (pip install redis)"
+            ) from exc
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, kunci):
+        nilai = self._client.get(AWALAN_KUNCI + kunci)
+        return None if nilai is None else json.loads(nilai)
+
+    def set(self, kunci, nilai, ttl):
+        self._client.set(AWALAN_KUNCI + kunci, json.dumps(nilai), ex=ttl)
+
+    def delete(self, *kunci_list):
+        if kunci_list:
+            self._client.delete(*[AWALAN_KUNCI + kunci for kunci in kunci_list])
+
+    def clear(self):
+        kunci_list = list(self._client.scan_iter(match=AWALAN_KUNCI + '*'))
+        if kunci_list:
+            self._client.delete(*kunci_list)
+
+
+def backend_cache(app=None):
+    """Backend cache milik aplikasi (dibuat sekali saat pertama dipakai)"""
+    app = app or current_app
+    backend = app.extensions.get('cache_data')
+    if backend is None:
+        if app.config.get('CACHE_DATA_BACKEND', 'memori') == 'redis':
+            backend = CacheRedis(app.config.get('CACHE_DATA_REDIS_URL') or 'redis://localhost:6379/0')
+        else:
+            backend = CacheMemori()
+        app.extensions['cache_data'] = backend
+    return backend
+
+
+def ambil_atau_hitung(kunci, hitung):
+    """Nilai cache untuk kunci; jika tidak ada, hitung() lalu simpan selama TTL"""
+    ttl = current_app.config.get('CACHE_DATA_DETIK', TTL_BAWAAN)
+    if ttl <= 0:
+        return hitung()
+
+    backend = backend_cache()
+    nilai = backend.get(kunci)
+    if nilai is None:
+        nilai = hitung()
+        backend.set(kunci, nilai, ttl)
+    return nilai
+
+
+# ---------------------------------------------------------------------------
+# Pilihan (id, nama) untuk SelectField
+# ---------------------------------------------------------------------------
+
+SUMBER_PILIHAN = {
+    'kategori': (KategoriBarang, KategoriBarang.nama_kategori),
+    'merk': (MerkBarang, MerkBarang.nama_merk),
+    'merk_aset_tetap': (MerkAsetTetap, MerkAsetTetap.nama_merk),
+}
+
+
+def _kunci_pilihan(jenis_list):
+    """{jenis: kunci cache} dengan versi tabel sumber saat ini (satu query)"""
+    nama_tabel = {jenis: SUMBER_PILIHAN[jenis][0].__tablename__ for jenis in jenis_list}
+    versi = VersiData.ambil(nama_tabel.values())
+    return {jenis: f'pilihan:{jenis}:{versi[tabel]}' for jenis, tabel in nama_tabel.items()}
+
+
+def pilihan(jenis):
+    """[(id, nama), ...] urut nama untuk 'kategori', 'merk' atau 'merk_aset_tetap'"""
+    model, kolom_nama = SUMBER_PILIHAN[jenis]
+
+    def hitung():
+        baris = model.query.with_entities(model.id, kolom_nama).order_by(kolom_nama).all()
+        return [[id_, nama] for id_, nama in baris]
+
+    if current_app.config.get('CACHE_DATA_DETIK', TTL_BAWAAN) <= 0:
+        return [(id_, nama) for id_, nama in hitung()]
+    kunci = _kunci_pilihan([jenis])[jenis]
+    return [(id_, nama) for id_, nama in ambil_atau_hitung(kunci, hitung)]
+
+
+def hapus_pilihan(*jenis_list):
+    """Buang cache pilihan setelah data referensi ditambah/diubah/dihapus"""
+    if jenis_list:
+        backend_cache().delete(*_kunci_pilihan(jenis_list).values())
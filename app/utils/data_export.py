@@ -0,0 +1,154 @@
+"""Export laporan ke CSV dan NDJSON (JSON per baris) secara streaming.
+
+Format ini ditujukan untuk konsumsi mesin (pipeline BI), jadi nama kolom memakai
+snake_case, tanggal ISO 8601, nilai kosong dibiarkan kosong/null (bukan '-'),
+dan kolom DECIMAL (uang) ditulis sebagai teks angka apa adanya (string di
+NDJSON) agar tidak kehilangan presisi seperti bila dijadikan float.
+Baris dibaca dari iterator query (yield_per) dan dikirim per chunk, sehingga
+pemakaian memori tetap konstan berapa pun jumlah barisnya.
+"""
+
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+
+from flask import Response, stream_with_context
+
+# Jumlah baris yang dikumpulkan sebelum dikirim sebagai satu chunk HTTP
+BARIS_PER_CHUNK = 500
+
+MIMETYPE = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def status_stok(stok_akhir):
+    """Status stok dengan ambang yang sama seperti laporan barang"""
+    if stok_akhir < 10:
+        return 'rendah'
+    if stok_akhir < 50:
+        return 'sedang'
+    return 'aman'
+
+
+def _nama(obj, atribut):
+    return getattr(obj, atribut) if obj is not None else None
+
+
+# Definisi kolom tiap laporan: (nama_kolom, fungsi yang menerima satu baris)
+KOLOM_BARANG = [
+    ('kode_barang', lambda r: r['barang'].kode_barang),
+    ('nama_barang', lambda r: r['barang'].nama_barang),
+    ('kategori', lambda r: _nama(r['barang'].kategori, 'nama_kategori')),
+    ('merk', lambda r: _nama(r['barang'].merk, 'nama_merk')),
+    ('satuan', lambda r: r['barang'].satuan),
+    ('stok_awal', lambda r: r['barang'].stok_awal),
+    ('stok_akhir', lambda r: r['stok_akhir']),
+    ('status', lambda r: status_stok(r['stok_akhir'])),
+]
+
+KOLOM_KONTRAK = [
+    ('nomor_kontrak', lambda r: r.KontrakBarang.nomor_kontrak),
+    ('tanggal_kontrak', lambda r: r.KontrakBarang.tanggal_kontrak),
+    ('deskripsi', lambda r: r.KontrakBarang.deskripsi),
+    ('jumlah_barang', lambda r: r.jumlah_barang),
+    ('total_qty', lambda r: r.total_qty),
+    ('total_nilai', lambda r: r.total_nilai),
+]
+
+KOLOM_TRANSAKSI = [
+    ('id', lambda t: t.id),
+    ('tanggal', lambda t: t.tanggal),
+    ('kode_barang', lambda t: t.kode_barang),
+    ('nama_barang', lambda t: _nama(t.barang, 'nama_barang')),
+    ('qty', lambda t: t.qty),
+    ('satuan', lambda t: _nama(t.barang, 'satuan')),
+    ('keterangan', lambda t: t.keterangan),
+]
+
+KOLOM_ASET_TETAP = [
+    ('kode_aset', lambda a: a.kode_aset),
+    ('nama_aset', lambda a: a.nama_aset),
+    ('kategori', lambda a: _nama(a.kategori, 'nama_kategori')),
+    ('jenis_aset', lambda a: _nama(a.merk_aset_tetap, 'nama_merk')),
+    ('kontrak_spk', lambda a: a.kontrak_spk),
+    ('tempat_penggunaan', lambda a: a.tempat_penggunaan),
+    ('nama_pengguna', lambda a: a.nama_pengguna),
+    ('total_barang', lambda a: a.total_barang),
+]
+
+KOLOM_KERUSAKAN = [
+    ('id', lambda l: l.id),
+    ('tanggal_diketahui_rusak', lambda l: l.tanggal_diketahui_rusak),
+    ('kode_aset', lambda l: _nama(l.aset_tetap, 'kode_aset')),
+    ('nama_aset', lambda l: _nama(l.aset_tetap, 'nama_aset')),
+    ('nama_pengguna', lambda l: l.nama_pengguna),
+    ('lokasi', lambda l: l.lokasi),
+    ('jumlah', lambda l: l.jumlah),
+    ('jenis_kerusakan', lambda l: l.jenis_kerusakan),
+    ('penyebab', lambda l: l.penyebab),
+    ('tindakan', lambda l: l.tindakan),
+    ('kondisi_saat_ini', lambda l: l.kondisi_saat_ini),
+    ('dampak', lambda l: l.dampak),
+    ('status', lambda l: l.status),
+]
+
+
+def _nilai(value):
+    """Normalisasi nilai agar bisa ditulis ke CSV maupun JSON"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def iter_csv(rows, kolom):
+    """Generator potongan teks CSV; baris header dikirim lebih dulu"""
+    buffer = StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow([nama for nama, _ in kolom])
+
+    for idx, row in enumerate(rows, 1):
+        nilai = [_nilai(fungsi(row)) for _, fungsi in kolom]
+        writer.writerow(['' if v is None else v for v in nilai])
+        if idx % BARIS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows, kolom):
+    """Generator potongan NDJSON: satu objek JSON per baris"""
+    potongan = []
+    for row in rows:
+        potongan.append(json.dumps(
+            {nama: _nilai(fungsi(row)) for nama, fungsi in kolom},
+            ensure_ascii=False
+        ))
+        if len(potongan) == BARIS_PER_CHUNK:
+            yield '\n'.join(potongan) + '\n'
+            potongan = []
+
+    if potongan:
+        yield '\n'.join(potongan) + '\n'
+
+
+def export_stream_response(rows, kolom, jenis_file, nama_file):
+    """Response Flask yang men-stream `rows` sebagai CSV atau NDJSON.
+
+    `rows` sebaiknya iterator query dengan yield_per agar database juga dibaca
+    bertahap. `nama_file` tanpa ekstensi; ekstensi mengikuti `jenis_file`.
+    """
+    generator = iter_csv if jenis_file == 'csv' else iter_ndjson
+    response = Response(
+        stream_with_context(generator(rows, kolom)),
+        mimetype=MIMETYPE[jenis_file]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename={nama_file}.{jenis_file}'
+    return response
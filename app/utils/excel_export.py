@@ -2,133 +2,244 @@
 
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
+from copy import copy
 from datetime import datetime
 from io import BytesIO
+import tempfile
 
 
 class ExcelExporter:
-    """Class untuk generate Excel reports"""
-    
-    def __init__(self, title="Laporan"):
-        self.wb = Workbook()
-        self.ws = self.wb.active
+    """Class untuk generate Excel reports.
+
+    Dengan `write_only=True` baris langsung ditulis ke file sementara (openpyxl
+    write-only) sehingga memori tetap kecil untuk laporan besar. Lebar kolom
+    dihitung sambil jalan dari `BARIS_SAMPEL_LEBAR` baris pertama, karena pada
+    mode ini lebar kolom harus ditetapkan sebelum baris pertama ditulis.
+    """
+    
+    BARIS_SAMPEL_LEBAR = 200
+    
+    def __init__(self, title="Laporan", write_only=False):
+        self.write_only = write_only
+        self.wb = Workbook(write_only=write_only)
+        self.ws = self.wb.create_sheet(title[:31]) if write_only else self.wb.active
         self.title = title
         self.current_row = 1
         
+        # Lebar kolom maksimum yang terlihat sejauh ini {nomor_kolom: panjang}
+        self._lebar = {}
+        # Mode write-only: baris ditahan sampai lebar kolom ditetapkan
+        self._antrean = []
+        self._lebar_ditetapkan = False
+        self._lebar_manual = False
+        self._baris_tertulis = 0
+        self._cache_style = {}
+        
         # Styles
         self.header_font = Font(name='Arial', size=12, bold=True, color='FFFFFF')
         self.header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
         self.title_font = Font(name='Arial', size=14, bold=True)
         self.normal_font = Font(name='Arial', size=10)
         self.bold_font = Font(name='Arial', size=10, bold=True)
+        self.footer_font = Font(name='Arial', size=9, italic=True)
+        self.align_center = Alignment(horizontal='center', vertical='center')
+        self.align_center_h = Alignment(horizontal='center')
+        self.align_left = Alignment(horizontal='left')
+        self.align_right = Alignment(horizontal='right')
         
         # Border
         thin_border = Side(style='thin', color='000000')
         self.border = Border(left=thin_border, right=thin_border, top=thin_border, bottom=thin_border)
     
+    def _ukur(self, col_num, value):
+        """Perbarui lebar kolom secara inkremental"""
+        if value is None or value == '':
+            return
+        panjang = len(str(value))
+        if panjang > self._lebar.get(col_num, 0):
+            self._lebar[col_num] = panjang
+    
+    def _sel(self, value, font, **style):
+        """Buat WriteOnlyCell; style didaftarkan sekali per kombinasi lalu dipakai ulang"""
+        cell = WriteOnlyCell(self.ws, value=value)
+        kunci = (id(font),) + tuple((key, id(val)) for key, val in sorted(style.items()))
+        if kunci in self._cache_style:
+            cell._style = copy(self._cache_style[kunci])
+        else:
+            cell.font = font
+            for key, val in style.items():
+                setattr(cell, key, val)
+            self._cache_style[kunci] = cell._style
+        return cell
+    
+    def _tulis(self, cells):
+        """Tulis satu baris (list (value, font, style)) pada current_row"""
+        if not self.write_only:
+            for col_num, (value, font, style) in enumerate(cells, 1):
+                cell = self.ws.cell(row=self.current_row, column=col_num)
+                cell.value = value
+                cell.font = font
+                for key, val in style.items():
+                    setattr(cell, key, val)
+                self._ukur(col_num, value)
+            self.current_row += 1
+            return
+        
+        # Baris kosong untuk current_row yang dilompati (mis. current_row += 1)
+        while self._baris_tertulis + len(self._antrean) < self.current_row - 1:
+            self._kirim([])
+        
+        baris = []
+        for col_num, (value, font, style) in enumerate(cells, 1):
+            baris.append(self._sel(value, font, **style))
+            self._ukur(col_num, value)
+        self._kirim(baris)
+        self.current_row += 1
+    
+    def _kirim(self, baris):
+        if self._lebar_ditetapkan:
+            self.ws.append(baris)
+            self._baris_tertulis += 1
+            return
+        
+        self._antrean.append(baris)
+        if len(self._antrean) >= self.BARIS_SAMPEL_LEBAR:
+            self._tetapkan_lebar()
+    
+    def _tetapkan_lebar(self):
+        """Mode write-only: tetapkan lebar kolom lalu tulis baris yang tertahan"""
+        if self._lebar_ditetapkan:
+            return
+        if not self._lebar_manual:
+            self.auto_adjust_columns()
+        self._lebar_ditetapkan = True
+        antrean, self._antrean = self._antrean, []
+        for baris in antrean:
+            self._kirim(baris)
+    
+    def set_column_widths(self, widths):
+        """Tetapkan lebar kolom secara manual (auto adjust tidak dipakai)"""
+        for col_num, width in enumerate(widths, 1):
+            self.ws.column_dimensions[get_column_letter(col_num)].width = width
+        self._lebar_manual = True
+        if self.write_only:
+            self._tetapkan_lebar()
+    
     def add_title(self, title, subtitle=None):
         """Tambah judul laporan"""
-        self.ws.merge_cells(f'A{self.current_row}:F{self.current_row}')
-        cell = self.ws[f'A{self.current_row}']
-        cell.value = title
-        cell.font = self.title_font
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        self.current_row += 1
+        if not self.write_only:
+            self.ws.merge_cells(f'A{self.current_row}:F{self.current_row}')
+        self._tulis([(title, self.title_font, {'alignment': self.align_center})])
         
         if subtitle:
-            self.ws.merge_cells(f'A{self.current_row}:F{self.current_row}')
-            cell = self.ws[f'A{self.current_row}']
-            cell.value = subtitle
-            cell.font = self.normal_font
-            cell.alignment = Alignment(horizontal='center')
-            self.current_row += 1
+            if not self.write_only:
+                self.ws.merge_cells(f'A{self.current_row}:F{self.current_row}')
+            self._tulis([(subtitle, self.normal_font, {'alignment': self.align_center_h})])
         
         self.current_row += 1  # Empty row
     
     def add_info(self, label, value):
         """Tambah info row (e.g., Periode: ...)"""
-        self.ws[f'A{self.current_row}'] = label
-        self.ws[f'A{self.current_row}'].font = self.bold_font
-        self.ws[f'B{self.current_row}'] = value
-        self.ws[f'B{self.current_row}'].font = self.normal_font
-        self.current_row += 1
+        self._tulis([(label, self.bold_font, {}), (value, self.normal_font, {})])
     
     def add_table_header(self, headers):
         """Tambah header tabel"""
-        for col_num, header in enumerate(headers, 1):
-            cell = self.ws.cell(row=self.current_row, column=col_num)
-            cell.value = header
-            cell.font = self.header_font
-            cell.fill = self.header_fill
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = self.border
-        
-        self.current_row += 1
+        self._tulis([
+            (header, self.header_font, {'fill': self.header_fill, 'alignment': self.align_center, 'border': self.border})
+            for header in headers
+        ])
     
     def add_table_row(self, data, is_bold=False):
         """Tambah data row"""
-        for col_num, value in enumerate(data, 1):
-            cell = self.ws.cell(row=self.current_row, column=col_num)
-            cell.value = value
-            cell.font = self.bold_font if is_bold else self.normal_font
-            cell.border = self.border
-            
-            # Alignment untuk angka
-            if isinstance(value, (int, float)):
-                cell.alignment = Alignment(horizontal='right')
-            else:
-                cell.alignment = Alignment(horizontal='left')
-        
-        self.current_row += 1
+        font = self.bold_font if is_bold else self.normal_font
+        self._tulis([
+            (value, font, {
+                'border': self.border,
+                # Alignment untuk angka
+                'alignment': self.align_right if isinstance(value, (int, float)) else self.align_left
+            })
+            for value in data
+        ])
     
     def add_summary_row(self, data):
         """Tambah row summary/total"""
         self.add_table_row(data, is_bold=True)
     
+    def add_custom_row(self, data, font, **style):
+        """Tambah row dengan font dan style sel sendiri (fill, alignment, border) untuk semua kolom"""
+        self._tulis([(value, font, style) for value in data])
+    
     def auto_adjust_columns(self):
-        """Auto adjust column width"""
-        for column in self.ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            
-            for cell in column:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            
+        """Auto adjust column width dari lebar yang dicatat saat baris ditulis"""
+        for col_num, max_length in self._lebar.items():
             adjusted_width = min(max_length + 2, 50)
-            self.ws.column_dimensions[column_letter].width = adjusted_width
+            self.ws.column_dimensions[get_column_letter(col_num)].width = adjusted_width
     
     def add_footer(self, text):
         """Tambah footer"""
         self.current_row += 1
-        self.ws.merge_cells(f'A{self.current_row}:F{self.current_row}')
-        cell = self.ws[f'A{self.current_row}']
-        cell.value = text
-        cell.font = Font(name='Arial', size=9, italic=True)
-        cell.alignment = Alignment(horizontal='center')
+        if not self.write_only:
+            self.ws.merge_cells(f'A{self.current_row}:F{self.current_row}')
+        self._tulis([(text, self.footer_font, {'alignment': self.align_center_h})])
+    
+    def _selesaikan(self):
+        if self.write_only:
+            self._tetapkan_lebar()
+        elif not self._lebar_manual:
+            self.auto_adjust_columns()
     
     def save(self, filename):
         """Save to file"""
-        self.auto_adjust_columns()
+        self._selesaikan()
         self.wb.save(filename)
     
     def get_bytes(self):
         """Return as BytesIO for download"""
-        self.auto_adjust_columns()
+        self._selesaikan()
         output = BytesIO()
         self.wb.save(output)
         output.seek(0)
         return output
+    
+    def get_file(self):
+        """Simpan ke file sementara dan kembalikan file object-nya (posisi di awal).
+
+        File otomatis terhapus saat ditutup, jadi bisa langsung diberikan ke
+        send_file tanpa menampung seluruh workbook di RAM.
+        """
+        self._selesaikan()
+        output = tempfile.TemporaryFile(suffix='.xlsx')
+        self.wb.save(output)
+        output.seek(0)
+        return output
+
+
+def _hasil_export(exporter, filename=None):
+    """File hasil export untuk download.
+
+    Jika `filename` diberikan, workbook juga disimpan ke sana dan yang
+    dikembalikan tetap BytesIO isi file tersebut. Workbook write-only hanya
+    bisa disimpan sekali, jadi isinya dibaca ulang dari file.
+    """
+    if not filename:
+        return exporter.get_file()
+    
+    exporter.save(filename)
+    with open(filename, 'rb') as f:
+        return BytesIO(f.read())
 
 
 # Helper functions untuk laporan spesifik
-def export_barang_to_excel(barang_list, filename=None):
-    """Export daftar barang ke Excel"""
-    exporter = ExcelExporter()
+def export_barang_to_excel(barang_list, filename=None, jumlah=None):
+    """Export daftar barang ke Excel.
+
+    `barang_list` boleh berupa iterator (mis. query yield_per); isi `jumlah` jika begitu.
+    """
+    if jumlah is None:
+        jumlah = len(barang_list)
+    exporter = ExcelExporter(write_only=True)
     
     # Title
     exporter.add_title(
@@ -137,7 +248,7 @@ def export_barang_to_excel(barang_list, filename=None):
     )
     
     # Info
-    exporter.add_info("Total Barang:", f"{len(barang_list)} item")
+    exporter.add_info("Total Barang:", f"{jumlah} item")
     exporter.add_info("Dicetak pada:", datetime.now().strftime('%d/%m/%Y %H:%M'))
     exporter.current_row += 1
     
@@ -174,15 +285,12 @@ def export_barang_to_excel(barang_list, filename=None):
     # Footer
     exporter.add_footer(f"Dibuat oleh Inven-Go System pada {datetime.now().strftime('%d/%m/%Y %H:%M')}")
     
-    if filename:
-        exporter.save(filename)
-    
-    return exporter.get_bytes()
+    return _hasil_export(exporter, filename)
 
 
 def export_kontrak_to_excel(kontrak_list, filename=None):
     """Export daftar kontrak ke Excel"""
-    exporter = ExcelExporter()
+    exporter = ExcelExporter(write_only=True)
     
     # Title
     exporter.add_title(
@@ -202,15 +310,15 @@ def export_kontrak_to_excel(kontrak_list, filename=None):
     # Data Rows
     total_nilai = 0
     for idx, kontrak in enumerate(kontrak_list, 1):
-        nilai_kontrak = kontrak.get_total_nilai()
+        nilai_kontrak = kontrak.total_nilai
         total_nilai += nilai_kontrak
         
         row_data = [
             idx,
             kontrak.nomor_kontrak,
             kontrak.tanggal_kontrak.strftime('%d/%m/%Y'),
-            kontrak.barang_kontrak.count(),
-            kontrak.get_total_qty(),
+            kontrak.jumlah_barang,
+            kontrak.total_qty,
             f"{nilai_kontrak:,.0f}" if nilai_kontrak > 0 else '-'
         ]
         exporter.add_table_row(row_data)
@@ -222,15 +330,17 @@ def export_kontrak_to_excel(kontrak_list, filename=None):
     # Footer
     exporter.add_footer(f"Dibuat oleh Inven-Go System pada {datetime.now().strftime('%d/%m/%Y %H:%M')}")
     
-    if filename:
-        exporter.save(filename)
-    
-    return exporter.get_bytes()
+    return _hasil_export(exporter, filename)
+
 
+def export_transaksi_to_excel(transaksi_list, jenis, tanggal_awal=None, tanggal_akhir=None, filename=None, jumlah=None):
+    """Export transaksi masuk/keluar ke Excel.
 
-def export_transaksi_to_excel(transaksi_list, jenis, tanggal_awal=None, tanggal_akhir=None, filename=None):
-    """Export transaksi masuk/keluar ke Excel"""
-    exporter = ExcelExporter()
+    `transaksi_list` boleh berupa iterator (mis. query yield_per); isi `jumlah` jika begitu.
+    """
+    if jumlah is None:
+        jumlah = len(transaksi_list)
+    exporter = ExcelExporter(write_only=True)
     
     # Title
     title = f"LAPORAN BARANG {jenis.upper()}"
@@ -242,7 +352,7 @@ def export_transaksi_to_excel(transaksi_list, jenis, tanggal_awal=None, tanggal_
     exporter.add_title(title, subtitle)
     
     # Info
-    exporter.add_info("Total Transaksi:", f"{len(transaksi_list)} transaksi")
+    exporter.add_info("Total Transaksi:", f"{jumlah} transaksi")
     exporter.add_info("Dicetak pada:", datetime.now().strftime('%d/%m/%Y %H:%M'))
     exporter.current_row += 1
     
@@ -253,15 +363,16 @@ def export_transaksi_to_excel(transaksi_list, jenis, tanggal_awal=None, tanggal_
     # Data Rows
     total_qty = 0
     for idx, transaksi in enumerate(transaksi_list, 1):
+        barang = transaksi.barang  # sudah di-joinedload oleh route laporan
         total_qty += transaksi.qty
         
         row_data = [
             idx,
             transaksi.tanggal.strftime('%d/%m/%Y'),
             transaksi.kode_barang,
-            transaksi.barang.nama_barang if transaksi.barang else '-',
+            barang.nama_barang if barang else '-',
             transaksi.qty,
-            transaksi.barang.satuan if transaksi.barang else '-',
+            barang.satuan if barang else '-',
             transaksi.keterangan or '-'
         ]
         exporter.add_table_row(row_data)
@@ -273,7 +384,84 @@ def export_transaksi_to_excel(transaksi_list, jenis, tanggal_awal=None, tanggal_
     # Footer
     exporter.add_footer(f"Dibuat oleh Inven-Go System pada {datetime.now().strftime('%d/%m/%Y %H:%M')}")
     
-    if filename:
-        exporter.save(filename)
+    return _hasil_export(exporter, filename)
+
+
+def export_kartu_stok_to_excel(kartu, filename=None):
+    """Export kartu stok ke Excel (write-only, baris ditulis sambil diiterasi)"""
+    exporter = ExcelExporter(title='Kartu Stok', write_only=True)
+    barang = kartu.barang
+    
+    # Title
+    if kartu.tanggal_awal and kartu.tanggal_akhir:
+        subtitle = f"Periode: {kartu.tanggal_awal.strftime('%d/%m/%Y')} - {kartu.tanggal_akhir.strftime('%d/%m/%Y')}"
+    else:
+        subtitle = f"Per {datetime.now().strftime('%d %B %Y')}"
+    exporter.add_title("KARTU STOK BARANG", subtitle)
+    
+    # Info
+    exporter.add_info("Kode Barang:", barang.kode_barang)
+    exporter.add_info("Nama Barang:", barang.nama_barang)
+    exporter.add_info("Satuan:", barang.satuan)
+    exporter.add_info("Saldo Awal:", kartu.saldo_awal)
+    exporter.current_row += 1
+    
+    # Table Header
+    exporter.add_table_header(['No', 'Tanggal', 'Jenis', 'Masuk', 'Keluar', 'Saldo', 'Keterangan'])
+    
+    # Data Rows
+    for baris in kartu:
+        exporter.add_table_row([
+            baris['no'],
+            baris['tanggal'].strftime('%d/%m/%Y'),
+            baris['jenis'].title(),
+            baris['masuk'] or None,
+            baris['keluar'] or None,
+            baris['saldo'],
+            baris['keterangan'] or '-'
+        ])
+    
+    # Summary
+    exporter.add_summary_row(['', '', 'TOTAL', kartu.total_masuk, kartu.total_keluar, kartu.saldo_akhir, ''])
+    
+    # Footer
+    exporter.add_footer(f"Dibuat oleh Inven-Go System pada {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    
+    return _hasil_export(exporter, filename)
+
+
+def export_aset_tetap_to_excel(aset_list, filename=None):
+    """Export daftar aset tetap ke Excel (write-only, `aset_list` boleh berupa iterator)"""
+    exporter = ExcelExporter(title='Aset Tetap', write_only=True)
+    exporter.set_column_widths([5, 15, 25, 15, 15, 20, 25, 20])
+    
+    header_font = Font(bold=True, color='FFFFFF')
+    data_font = Font(name='Calibri', size=11)
+    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    data_alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    
+    # Add header
+    headers = ['No', 'Kode Aset', 'Nama Aset', 'Kategori', 'Merk', 'Kontrak/SPK', 'Tempat Penggunaan', 'Nama Pengguna']
+    exporter.add_custom_row(headers, header_font, fill=exporter.header_fill, alignment=header_alignment, border=border)
+    
+    # Add data
+    for idx, aset in enumerate(aset_list, 1):
+        row_data = [
+            idx,
+            aset.kode_aset,
+            aset.nama_aset,
+            aset.kategori.nama_kategori if aset.kategori else '-',
+            aset.merk_aset_tetap.nama_merk if aset.merk_aset_tetap else '-',
+            aset.kontrak_spk or '-',
+            aset.tempat_penggunaan or '-',
+            aset.nama_pengguna or '-'
+        ]
+        exporter.add_custom_row(row_data, data_font, border=border, alignment=data_alignment)
     
-    return exporter.get_bytes()
+    return _hasil_export(exporter, filename)
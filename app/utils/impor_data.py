@@ -0,0 +1,373 @@
+"""Impor data barang, aset tetap dan transaksi dari file XLSX/CSV.
+
+File dibaca baris per baris (openpyxl read-only atau modul csv) sehingga file
+besar tidak dimuat sekaligus ke memori. Setiap baris divalidasi dengan aturan
+form input manual, lalu baris yang valid disimpan per chunk IMPOR_UKURAN_CHUNK
+baris:
+
+- barang / aset tetap: satu INSERT ... ON DUPLICATE KEY UPDATE per chunk
+  (ON CONFLICT DO UPDATE di SQLite/PostgreSQL) dengan kunci kode_barang /
+  kode_aset, sehingga kode yang sudah ada diperbarui.
+- transaksi masuk/keluar: lewat jalur input banyak transaksi
+  (app/utils/transaksi_batch.py), termasuk pengecekan stok barang keluar.
+
+Baris yang tidak valid dilewati dan dicatat di laporan galat; baris lain tetap
+disimpan. Setiap chunk di-commit sendiri.
+"""
+
+import csv
+import io
+import itertools
+import os
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from flask import current_app
+from openpyxl import load_workbook
+from werkzeug.datastructures import MultiDict
+
+from app import db
+from app.aset_tetap.forms import AsetTetapImporForm
+from app.barang.forms import BarangImporForm
+from app.models.aset_tetap import AsetTetap
+from app.models.barang import Barang
+from app.models.stok_saldo import buat_saldo_belum_ada
+from app.models.versi_data import catat_versi_berubah
+from app.utils.cache_data import pilihan
+from app.utils.reservasi_stok import StokTidakCukup
+from app.utils.transaksi_batch import JENIS_TRANSAKSI, periksa_baris, simpan_batch
+
+# Jumlah baris per chunk jika IMPOR_UKURAN_CHUNK tidak diatur
+UKURAN_CHUNK_BAWAAN = 1000
+
+JUDUL_IMPOR = {
+    'barang': 'Barang',
+    'aset_tetap': 'Aset Tetap',
+    'masuk': 'Transaksi Barang Masuk',
+    'keluar': 'Transaksi Barang Keluar',
+}
+
+KOLOM_TRANSAKSI = ['tanggal', 'kode_barang', 'qty', 'keterangan']
+
+
+class FileImporTidakValid(ValueError):
+    """Format file atau header kolom tidak bisa diimpor"""
+
+
+class SpesifikasiImpor:
+    """Pemetaan kolom file ke form validasi dan tabel tujuan untuk data master"""
+
+    def __init__(self, model, form_class, kolom_kunci, kolom_wajib, referensi):
+        self.model = model
+        self.form_class = form_class
+        self.kolom_kunci = kolom_kunci
+        self.kolom_wajib = kolom_wajib
+        # {kolom file: (field form, jenis pilihan di cache_data)}; isi kolom berupa nama
+        self.referensi = referensi
+
+    def kolom_file(self):
+        """Nama kolom yang dikenali di baris header"""
+        form = self.form_class(formdata=None, meta={'csrf': False})
+        nama_referensi = {field for field, _ in self.referensi.values()}
+        kolom = [
+            nama for nama in form._fields
+            if nama not in nama_referensi and nama in self.model.__table__.c
+        ]
+        return kolom + list(self.referensi)
+
+
+SPESIFIKASI_IMPOR = {
+    'barang': SpesifikasiImpor(
+        Barang, BarangImporForm, 'kode_barang', ['kode_barang', 'nama_barang', 'satuan'],
+        {'kategori': ('kategori_id', 'kategori'), 'merk': ('merk_id', 'merk')}
+    ),
+    'aset_tetap': SpesifikasiImpor(
+        AsetTetap, AsetTetapImporForm, 'kode_aset', ['kode_aset', 'nama_aset'],
+        {'kategori': ('kategori_id', 'kategori'), 'jenis_aset': ('merk_aset_tetap_id', 'merk_aset_tetap')}
+    ),
+}
+
+
+def kolom_templat(jenis):
+    """Header kolom contoh untuk file impor jenis tersebut"""
+    if jenis in JENIS_TRANSAKSI:
+        return list(KOLOM_TRANSAKSI)
+    return SPESIFIKASI_IMPOR[jenis].kolom_file()
+
+
+class HasilImpor:
+    """Ringkasan satu proses impor"""
+
+    def __init__(self, jenis):
+        self.jenis = jenis
+        self.jumlah_baris = 0
+        self.jumlah_disimpan = 0
+        # [{'baris': nomor baris di file, 'kolom': ..., 'pesan': ...}, ...]
+        self.galat = []
+
+    def tambah_galat(self, nomor, kolom, pesan):
+        self.galat.append({'baris': nomor, 'kolom': kolom or '', 'pesan': pesan})
+
+    def tulis_laporan_galat(self, berkas_teks):
+        """Tulis laporan galat sebagai CSV (baris, kolom, pesan) ke objek file teks"""
+        writer = csv.DictWriter(berkas_teks, fieldnames=['baris', 'kolom', 'pesan'])
+        writer.writeheader()
+        writer.writerows(sorted(self.galat, key=lambda g: g['baris']))
+
+
+# ---------------------------------------------------------------------------
+# Membaca file
+# ---------------------------------------------------------------------------
+
+def _normalisasi_header(nilai):
+    return str(nilai or '').strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def _ke_teks(nilai):
+    """Nilai sel menjadi teks untuk formdata WTForms"""
+    if nilai is None:
+        return ''
+    if isinstance(nilai, datetime):
+        return nilai.date().isoformat()
+    if isinstance(nilai, date):
+        return nilai.isoformat()
+    if isinstance(nilai, float) and nilai.is_integer():
+        return str(int(nilai))
+    return str(nilai).strip()
+
+
+def _baris_xlsx(berkas):
+    workbook = load_workbook(berkas, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _baris_csv(berkas):
+    teks = io.TextIOWrapper(berkas, encoding='utf-8-sig', newline='')
+    try:
+        baris_pertama = teks.readline()
+        # Excel berlocale Indonesia menyimpan CSV dengan pemisah titik koma
+        pemisah = ';' if baris_pertama.count(';') > baris_pertama.count(',') else ','
+        yield from csv.reader(itertools.chain([baris_pertama], teks), delimiter=pemisah)
+    finally:
+        teks.detach()
+
+
+@contextmanager
+def buka_file(berkas, nama_file):
+    """Buka file .xlsx/.csv (path atau objek file biner).
+
+    Menghasilkan (header, iterator (nomor_baris, {kolom: teks})) dengan baris 1
+    sebagai header; baris kosong dilewati.
+    """
+    ekstensi = os.path.splitext(nama_file or '')[1].lower()
+    if ekstensi not in ('.xlsx', '.csv'):
+        raise FileImporTidakValid('Format file harus .xlsx atau .csv.')
+
+    tutup = isinstance(berkas, (str, os.PathLike))
+    if tutup:
+        berkas = open(berkas, 'rb')
+    baris_iter = _baris_xlsx(berkas) if ekstensi == '.xlsx' else _baris_csv(berkas)
+    try:
+        try:
+            header = [_normalisasi_header(nilai) for nilai in next(baris_iter)]
+        except StopIteration:
+            raise FileImporTidakValid('File kosong.') from None
+        except Exception as exc:
+            raise FileImporTidakValid(f'File tidak bisa dibaca: {exc}') from exc
+
+        def baris():
+            for nomor, nilai in enumerate(baris_iter, 2):
+                teks = [_ke_teks(v) for v in nilai]
+                if any(teks):
+                    yield nomor, dict(zip(header, teks))
+
+        yield header, baris()
+    finally:
+        baris_iter.close()
+        if tutup:
+            berkas.close()
+
+
+def _chunk(iterable, ukuran):
+    iterator = iter(iterable)
+    while True:
+        bagian = list(itertools.islice(iterator, ukuran))
+        if not bagian:
+            return
+        yield bagian
+
+
+# ---------------------------------------------------------------------------
+# Menyimpan
+# ---------------------------------------------------------------------------
+
+def _upsert(tabel, kolom_kunci, baris_list, kolom_update):
+    """INSERT banyak baris sekaligus; baris dengan kunci yang sudah ada diperbarui.
+
+    Statement dikompilasi sekali lalu dijalankan sebagai executemany; PyMySQL
+    menggabungkannya menjadi INSERT multi-baris.
+    """
+    dialek = db.session.get_bind().dialect.name
+    if dialek == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as insert_dialek
+        stmt = insert_dialek(tabel)
+        stmt = stmt.on_duplicate_key_update({kolom: stmt.inserted[kolom] for kolom in kolom_update})
+    elif dialek in ('sqlite', 'postgresql'):
+        if dialek == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as insert_dialek
+        else:
+            from sqlalchemy.dialects.postgresql import insert as insert_dialek
+        stmt = insert_dialek(tabel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[kolom_kunci],
+            set_={kolom: stmt.excluded[kolom] for kolom in kolom_update}
+        )
+    else:
+        raise RuntimeError(f'Impor data belum mendukung database {dialek}')
+    db.session.execute(stmt, baris_list)
+
+
+def _nilai_kolom(field, kolom):
+    data = field.data
+    if data == '' or (field.name.endswith('_id') and data == 0):
+        return None
+    if data is None and kolom.default is not None and kolom.default.is_scalar:
+        # Sama dengan route tambah: angka opsional yang kosong disimpan sebagai nilai bawaan kolom
+        return kolom.default.arg
+    return data
+
+
+def _impor_master(spesifikasi, header, baris_iter, ukuran_chunk, hasil):
+    kolom_file = spesifikasi.kolom_file()
+    kurang = [kolom for kolom in spesifikasi.kolom_wajib if kolom not in header]
+    if kurang:
+        raise FileImporTidakValid(f'Kolom wajib tidak ada di header: {", ".join(kurang)}.')
+
+    # Satu instance form dipakai ulang untuk semua baris (process() + validate())
+    form = spesifikasi.form_class(formdata=None, meta={'csrf': False})
+    referensi = {}
+    for kolom, (nama_field, jenis_pilihan) in spesifikasi.referensi.items():
+        daftar = pilihan(jenis_pilihan)
+        form[nama_field].choices = [(0, '')] + daftar
+        referensi[kolom] = {nama.strip().lower(): id_ for id_, nama in daftar}
+
+    tabel = spesifikasi.model.__table__
+    kolom_model = [nama for nama in form._fields if nama in tabel.c]
+    # Kolom yang tidak ada di file tidak menimpa data lama saat update
+    sumber_kolom = {nama_field: kolom for kolom, (nama_field, _) in spesifikasi.referensi.items()}
+    kolom_update = [
+        nama for nama in kolom_model
+        if nama != spesifikasi.kolom_kunci and sumber_kolom.get(nama, nama) in header
+    ] + ['updated_at']
+
+    kunci_terlihat = {}
+    for chunk in _chunk(baris_iter, ukuran_chunk):
+        siap = []
+        for nomor, baris in chunk:
+            hasil.jumlah_baris += 1
+            formdata = MultiDict()
+            for nama in kolom_file:
+                if nama in spesifikasi.referensi:
+                    continue
+                nilai = baris.get(nama, '')
+                if not nilai and form[nama].default is not None:
+                    # Kolom tidak ada atau sel kosong: pakai nilai bawaan form
+                    nilai = str(form[nama].default)
+                formdata[nama] = nilai
+
+            ref_valid = True
+            for kolom, (nama_field, _) in spesifikasi.referensi.items():
+                nama_ref = baris.get(kolom, '')
+                if not nama_ref:
+                    formdata[nama_field] = '0'
+                elif nama_ref.lower() in referensi[kolom]:
+                    formdata[nama_field] = str(referensi[kolom][nama_ref.lower()])
+                else:
+                    hasil.tambah_galat(nomor, kolom, f'{nama_ref} tidak ditemukan.')
+                    formdata[nama_field] = '0'
+                    ref_valid = False
+
+            form.process(formdata)
+            if not form.validate() or not ref_valid:
+                for nama_field, pesan_list in form.errors.items():
+                    for pesan in pesan_list:
+                        hasil.tambah_galat(nomor, nama_field, pesan)
+                continue
+
+            kunci = form[spesifikasi.kolom_kunci].data
+            if kunci in kunci_terlihat:
+                hasil.tambah_galat(
+                    nomor, spesifikasi.kolom_kunci,
+                    f'Kode {kunci} duplikat dengan baris {kunci_terlihat[kunci]}.'
+                )
+                continue
+            kunci_terlihat[kunci] = nomor
+
+            data = {nama: _nilai_kolom(form[nama], tabel.c[nama]) for nama in kolom_model}
+            sekarang = datetime.utcnow()
+            data['created_at'] = data['updated_at'] = sekarang
+            siap.append(data)
+
+        if not siap:
+            continue
+        _upsert(tabel, spesifikasi.kolom_kunci, siap, kolom_update)
+        tabel_berubah = [tabel.name]
+        if spesifikasi.model is Barang:
+            # Insert massal tidak memicu event after_insert yang membuat baris stok_saldo
+            buat_saldo_belum_ada(db.session.connection(), [baris['kode_barang'] for baris in siap])
+            tabel_berubah.append('stok_saldo')
+        catat_versi_berubah(db.session, tabel_berubah)
+        db.session.commit()
+        hasil.jumlah_disimpan += len(siap)
+
+
+def _impor_transaksi(jenis, header, baris_iter, ukuran_chunk, hasil):
+    kurang = [kolom for kolom in ('kode_barang', 'qty') if kolom not in header]
+    if kurang:
+        raise FileImporTidakValid(f'Kolom wajib tidak ada di header: {", ".join(kurang)}.')
+
+    for chunk in _chunk(baris_iter, ukuran_chunk):
+        hasil.jumlah_baris += len(chunk)
+        baris_list = [
+            {kolom: baris.get(kolom) or None for kolom in KOLOM_TRANSAKSI}
+            for _, baris in chunk
+        ]
+        bersih, galat = periksa_baris(jenis, baris_list)
+        nomor_galat = set()
+        for g in galat:
+            nomor_galat.add(g['baris'])
+            hasil.tambah_galat(chunk[g['baris'] - 1][0], None, g['pesan'])
+
+        siap = [(nomor, baris) for nomor, baris in bersih if nomor not in nomor_galat]
+        while siap:
+            try:
+                hasil.jumlah_disimpan += simpan_batch(jenis, [baris for _, baris in siap], user_id=None)
+                break
+            except StokTidakCukup as exc:
+                # Stok berubah sejak diperiksa: lewati barang yang kurang, simpan sisanya
+                for nomor, baris in siap:
+                    if baris['kode_barang'] in exc.kekurangan:
+                        hasil.tambah_galat(chunk[nomor - 1][0], None, exc.pesan(baris['kode_barang']))
+                siap = [(nomor, baris) for nomor, baris in siap if baris['kode_barang'] not in exc.kekurangan]
+
+
+def impor_file(jenis, berkas, nama_file, ukuran_chunk=None):
+    """Impor file ke tabel sesuai jenis ('barang', 'aset_tetap', 'masuk', 'keluar').
+
+    Return HasilImpor. Melempar FileImporTidakValid jika format file atau
+    header tidak sesuai (belum ada data yang disimpan).
+    """
+    if jenis not in JUDUL_IMPOR:
+        raise FileImporTidakValid(f'Jenis impor tidak dikenal: {jenis}')
+    ukuran_chunk = ukuran_chunk or current_app.config.get('IMPOR_UKURAN_CHUNK', UKURAN_CHUNK_BAWAAN)
+
+    hasil = HasilImpor(jenis)
+    with buka_file(berkas, nama_file) as (header, baris_iter):
+        if jenis in JENIS_TRANSAKSI:
+            _impor_transaksi(jenis, header, baris_iter, ukuran_chunk, hasil)
+        else:
+            _impor_master(SPESIFIKASI_IMPOR[jenis], header, baris_iter, ukuran_chunk, hasil)
+    return hasil
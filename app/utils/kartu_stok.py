@@ -0,0 +1,101 @@
+"""Kartu stok: mutasi masuk/keluar satu barang beserta saldo berjalan"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import Integer, literal, select, union_all
+
+from app import db
+from app.models.barang import BarangMasuk, BarangKeluar
+
+# Jumlah baris yang diambil dari database per batch saat streaming
+UKURAN_BATCH = 1000
+
+
+def query_mutasi(kode_barang, tanggal_awal=None, tanggal_akhir=None):
+    """Satu query UNION ALL BarangMasuk + BarangKeluar untuk satu barang, urut kronologis.
+
+    Kolom: tanggal, jenis ('masuk'/'keluar'), masuk, keluar, keterangan, id.
+    Pada tanggal yang sama transaksi masuk didahulukan, lalu urut waktu input.
+    """
+    def _select(model, jenis, urutan):
+        qty = model.qty
+        stmt = select(
+            model.tanggal.label('tanggal'),
+            literal(urutan, Integer).label('urutan'),
+            literal(jenis).label('jenis'),
+            (qty if jenis == 'masuk' else literal(0, Integer)).label('masuk'),
+            (qty if jenis == 'keluar' else literal(0, Integer)).label('keluar'),
+            model.keterangan.label('keterangan'),
+            model.created_at.label('created_at'),
+            model.id.label('id')
+        ).where(model.kode_barang == kode_barang)
+        if tanggal_awal is not None:
+            stmt = stmt.where(model.tanggal >= tanggal_awal)
+        if tanggal_akhir is not None:
+            stmt = stmt.where(model.tanggal <= tanggal_akhir)
+        return stmt
+
+    mutasi = union_all(
+        _select(BarangMasuk, 'masuk', 0),
+        _select(BarangKeluar, 'keluar', 1)
+    ).subquery('mutasi')
+
+    return select(
+        mutasi.c.tanggal,
+        mutasi.c.jenis,
+        mutasi.c.masuk,
+        mutasi.c.keluar,
+        mutasi.c.keterangan,
+        mutasi.c.id
+    ).order_by(
+        mutasi.c.tanggal, mutasi.c.urutan, mutasi.c.created_at, mutasi.c.id
+    )
+
+
+class KartuStok:
+    """Iterator kartu stok satu barang.
+
+    Baris diambil bertahap (yield_per) dan saldo dihitung sambil jalan, sehingga
+    barang dengan ratusan ribu mutasi tidak perlu dimuat sekaligus. Total dan
+    saldo akhir baru lengkap setelah iterasi selesai.
+    """
+
+    def __init__(self, barang, tanggal_awal=None, tanggal_akhir=None):
+        self.barang = barang
+        self.tanggal_awal = tanggal_awal.date() if isinstance(tanggal_awal, datetime) else tanggal_awal
+        self.tanggal_akhir = tanggal_akhir.date() if isinstance(tanggal_akhir, datetime) else tanggal_akhir
+
+        if self.tanggal_awal:
+            self.saldo_awal = barang.stok_pada(self.tanggal_awal - timedelta(days=1))
+        else:
+            self.saldo_awal = barang.stok_awal or 0
+
+        self.total_masuk = 0
+        self.total_keluar = 0
+        self.jumlah_baris = 0
+        self.saldo_akhir = self.saldo_awal
+
+    def __iter__(self):
+        self.total_masuk = 0
+        self.total_keluar = 0
+        self.jumlah_baris = 0
+        saldo = self.saldo_awal
+
+        stmt = query_mutasi(self.barang.kode_barang, self.tanggal_awal, self.tanggal_akhir)
+        result = db.session.execute(stmt.execution_options(yield_per=UKURAN_BATCH))
+        for row in result:
+            saldo += row.masuk - row.keluar
+            self.total_masuk += row.masuk
+            self.total_keluar += row.keluar
+            self.jumlah_baris += 1
+            self.saldo_akhir = saldo
+            yield {
+                'no': self.jumlah_baris,
+                'tanggal': row.tanggal,
+                'jenis': row.jenis,
+                'masuk': row.masuk,
+                'keluar': row.keluar,
+                'saldo': saldo,
+                'keterangan': row.keterangan
+            }
+        self.saldo_akhir = saldo
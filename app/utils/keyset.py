@@ -0,0 +1,156 @@
+"""Paginasi keyset (cursor) untuk daftar yang diurutkan dari data terbaru.
+
+Berbeda dengan paginate() yang memakai OFFSET dan COUNT(*) seluruh tabel,
+halaman berikutnya diambil dengan WHERE (kolom...) < (nilai baris terakhir)
+di atas indeks komposit yang sama dengan urutannya, sehingga halaman jauh
+sama cepatnya dengan halaman pertama. Cursor berisi nilai kunci baris batas
+dan dikodekan base64 agar tidak diubah-ubah di URL.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, and_, text, tuple_
+
+from app import db
+
+
+class HalamanKeyset:
+    """Satu halaman hasil paginate_keyset (mirip objek Pagination Flask-SQLAlchemy)"""
+
+    def __init__(self, items, per_page, nomor_awal, cursor_next, cursor_prev, total_estimasi=None):
+        self.items = items
+        self.per_page = per_page
+        # Nomor urut baris pertama di halaman ini (untuk kolom "No")
+        self.nomor_awal = nomor_awal
+        self.cursor_next = cursor_next
+        self.cursor_prev = cursor_prev
+        self.total_estimasi = total_estimasi
+
+    @property
+    def has_next(self):
+        return self.cursor_next is not None
+
+    @property
+    def has_prev(self):
+        return self.cursor_prev is not None
+
+
+def _ke_json(nilai):
+    if isinstance(nilai, (date, datetime)):
+        return nilai.isoformat()
+    return nilai
+
+
+def _dari_json(kolom, nilai):
+    if nilai is None:
+        return None
+    if isinstance(kolom.type, DateTime):
+        return datetime.fromisoformat(nilai)
+    if isinstance(kolom.type, Date):
+        return date.fromisoformat(nilai)
+    if isinstance(kolom.type, Integer):
+        return int(nilai)
+    return nilai
+
+
+def buat_cursor(arah, nilai_kunci, nomor_awal):
+    data = {'a': arah, 'k': [_ke_json(nilai) for nilai in nilai_kunci], 'n': nomor_awal}
+    mentah = json.dumps(data, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(mentah).decode().rstrip('=')
+
+
+def baca_cursor(cursor, kolom_kunci):
+    """(arah, nilai_kunci, nomor_awal) dari cursor, atau None jika tidak valid"""
+    if not cursor:
+        return None
+    try:
+        mentah = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(mentah)
+        arah = data['a']
+        nilai = data['k']
+        # Kolom kunci NOT NULL; perbandingan dengan NULL akan membuang baris diam-diam
+        if arah not in ('next', 'prev') or len(nilai) != len(kolom_kunci) or None in nilai:
+            return None
+        nilai_kunci = [_dari_json(kolom, v) for kolom, v in zip(kolom_kunci, nilai)]
+        return arah, nilai_kunci, max(int(data.get('n', 1)), 1)
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
+
+
+def estimasi_jumlah_baris(model):
+    """Perkiraan jumlah baris tabel dari statistik database (tanpa COUNT(*)).
+
+    Hanya tersedia di MySQL (information_schema.TABLES); dialek lain None.
+    """
+    if db.session.get_bind().dialect.name != 'mysql':
+        return None
+    return db.session.execute(
+        text(
+            'SELECT TABLE_ROWS FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :nama_tabel'
+        ),
+        {'nama_tabel': model.__tablename__}
+    ).scalar()
+
+
+def paginate_keyset(query, kolom_kunci, cursor=None, per_page=20, estimasi=False):
+    """Halaman `query` terurut menurun menurut `kolom_kunci` (kolom terakhir harus unik, mis. id).
+
+    Semua kolom kunci harus NOT NULL: (a, b) < (x, NULL) bernilai NULL, sehingga
+    baris yang nilainya sama dengan baris batas tidak muncul di halaman mana pun.
+
+    `query` belum boleh diberi order_by. Dengan estimasi=True, total_estimasi
+    diisi dari estimasi_jumlah_baris() tabel entitas utama query.
+    """
+    boleh_null = [kolom.key for kolom in kolom_kunci if kolom.expression.nullable]
+    if boleh_null:
+        raise ValueError(f"Kolom kunci keyset harus NOT NULL: {', '.join(boleh_null)}")
+
+    posisi = baca_cursor(cursor, kolom_kunci)
+    arah, nilai_kunci, nomor_awal = posisi if posisi else ('next', None, 1)
+
+    baris_kunci = tuple_(*kolom_kunci)
+    if nilai_kunci is not None:
+        batas = tuple_(*nilai_kunci)
+        # Syarat pada kolom pertama saja ditambahkan agar indeks bisa dipakai sebagai range
+        if arah == 'next':
+            query = query.filter(and_(kolom_kunci[0] <= nilai_kunci[0], baris_kunci < batas))
+        else:
+            query = query.filter(and_(kolom_kunci[0] >= nilai_kunci[0], baris_kunci > batas))
+
+    if arah == 'next':
+        query = query.order_by(*[kolom.desc() for kolom in kolom_kunci])
+    else:
+        query = query.order_by(*[kolom.asc() for kolom in kolom_kunci])
+
+    # Satu baris lebih untuk mengetahui apakah masih ada halaman di arah tersebut
+    items = query.limit(per_page + 1).all()
+    ada_lagi = len(items) > per_page
+    items = items[:per_page]
+    if arah == 'prev':
+        items.reverse()
+        if not ada_lagi:
+            nomor_awal = 1
+
+    def kunci(obj):
+        return [getattr(obj, kolom.key) for kolom in kolom_kunci]
+
+    cursor_next = cursor_prev = None
+    if items:
+        if arah == 'next':
+            punya_next, punya_prev = ada_lagi, nilai_kunci is not None
+        else:
+            punya_next, punya_prev = True, ada_lagi
+        if punya_next:
+            cursor_next = buat_cursor('next', kunci(items[-1]), nomor_awal + len(items))
+        if punya_prev:
+            cursor_prev = buat_cursor('prev', kunci(items[0]), max(nomor_awal - per_page, 1))
+
+    total_estimasi = None
+    if estimasi:
+        total_estimasi = estimasi_jumlah_baris(query.column_descriptions[0]['entity'])
+
+    return HalamanKeyset(items, per_page, nomor_awal, cursor_next, cursor_prev, total_estimasi)
@@ -1,14 +1,20 @@
 """PDF Export Utility using ReportLab"""
 
+from reportlab import rl_config
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.pagesizes import A4, landscape, letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image, HRFlowable
+from reportlab.lib.units import cm, inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image, HRFlowable, Flowable
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from datetime import datetime
 from io import BytesIO
+from xml.sax.saxutils import escape
+from functools import lru_cache
 import os
+import threading
 
 try:
     from PIL import Image as PILImage
@@ -16,43 +22,222 @@ except Exception:
     PILImage = None
 
 
-def _build_logo_flowable(logo_path, width_cm=2.6, height_cm=2.6):
-    """Build a ReportLab Image flowable and normalize transparent PNGs."""
-    if not logo_path or not os.path.exists(logo_path):
+# Stream PDF ditulis biner (Flate saja) tanpa lapisan ASCII85: encoder ASCII85
+# ReportLab berjalan di Python murni dan mendominasi waktu build surat berlogo.
+rl_config.useA85 = 0
+
+# Aset PDF yang dipakai ulang selama proses hidup: stylesheet/ParagraphStyle
+# (lihat _gaya_pdf) dan logo yang sudah diratakan ke latar putih (lihat
+# _logo_rata). Font yang dipakai hanya font bawaan (Helvetica) yang metriknya
+# sudah di-cache oleh ReportLab sendiri.
+_cache_logo = {}
+_kunci_cache_logo = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _gaya_pdf():
+    """Stylesheet dan ParagraphStyle semua export PDF, dibuat sekali per proses.
+
+    Objek style hanya dibaca saat build, jadi aman dipakai bersama antar dokumen.
+    """
+    styles = getSampleStyleSheet()
+    gaya = {'sample': styles}
+
+    # PDFExporter
+    gaya['judul'] = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#366092'),
+        spaceAfter=12,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    gaya['subjudul'] = ParagraphStyle(
+        'CustomSubTitle',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=12,
+        alignment=TA_CENTER
+    )
+    gaya['heading'] = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=12,
+        textColor=colors.HexColor('#366092'),
+        spaceAfter=6,
+        fontName='Helvetica-Bold'
+    )
+
+    # Surat laporan kerusakan
+    gaya['kop_tebal'] = ParagraphStyle(
+        'HeaderBold',
+        parent=styles['Normal'],
+        alignment=TA_CENTER,
+        fontSize=11,
+        leading=13,
+        fontName='Helvetica-Bold'
+    )
+    gaya['kop_normal'] = ParagraphStyle(
+        'HeaderNormal',
+        parent=styles['Normal'],
+        alignment=TA_CENTER,
+        fontSize=9.5,
+        leading=12
+    )
+    gaya['isi_surat'] = ParagraphStyle(
+        'Body',
+        parent=styles['Normal'],
+        fontSize=10,
+        leading=14
+    )
+
+    # Laporan tabel aset tetap / jenis aset
+    gaya['laporan_judul'] = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=14,
+        textColor=colors.HexColor('#366092'),
+        spaceAfter=6,
+        alignment=1  # Center
+    )
+    gaya['laporan_subjudul'] = ParagraphStyle(
+        'Subtitle',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.grey,
+        spaceAfter=12,
+        alignment=1  # Center
+    )
+    gaya['laporan_info'] = ParagraphStyle(
+        'Info',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.grey,
+        spaceAfter=12,
+        alignment=0  # Left
+    )
+    gaya['aset_sel_kiri'] = ParagraphStyle(
+        'CellLeft',
+        parent=styles['Normal'],
+        fontName='Helvetica',
+        fontSize=7.5,
+        leading=9,
+        alignment=0,  # Left
+        wordWrap='LTR',
+        splitLongWords=1,  # force-wrap long tokens (e.g. 930/1-04/SPK/...)
+    )
+    gaya['aset_sel_tengah'] = ParagraphStyle('CellCenter', parent=gaya['aset_sel_kiri'], alignment=1)
+    gaya['aset_sel_kontrak'] = ParagraphStyle(
+        'CellKontrak',
+        parent=gaya['aset_sel_tengah'],
+        fontSize=7,
+        leading=8.5,
+    )
+    gaya['aset_sel_header'] = ParagraphStyle(
+        'HeaderCell',
+        parent=gaya['aset_sel_tengah'],
+        fontName='Helvetica-Bold',
+        fontSize=8,
+        leading=10,
+        textColor=colors.whitesmoke,
+    )
+    gaya['merk_sel_header'] = ParagraphStyle(
+        'MerkHeaderCell',
+        parent=styles['Normal'],
+        fontName='Helvetica-Bold',
+        fontSize=8,
+        leading=10,
+        textColor=colors.whitesmoke,
+        alignment=1
+    )
+    gaya['merk_sel_kiri'] = ParagraphStyle(
+        'MerkCellLeft',
+        parent=styles['Normal'],
+        fontName='Helvetica',
+        fontSize=8,
+        leading=10,
+        alignment=0,
+        wordWrap='LTR',
+        splitLongWords=1
+    )
+    gaya['merk_sel_tengah'] = ParagraphStyle(
+        'MerkCellCenter',
+        parent=gaya['merk_sel_kiri'],
+        alignment=1
+    )
+    return gaya
+
+
+def _logo_rata(logo_path):
+    """(png_bytes, ImageReader) logo yang transparansinya sudah diratakan ke putih.
+
+    Hasil disimpan per path dan dibuat ulang jika mtime/ukuran file berubah.
+    None jika PIL tidak tersedia atau file tidak bisa dibaca.
+    """
+    if PILImage is None:
         return None
 
-    width = width_cm * cm
-    height = height_cm * cm
+    path = os.path.abspath(logo_path)
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    penanda = (info.st_mtime_ns, info.st_size)
+
+    with _kunci_cache_logo:
+        entri = _cache_logo.get(path)
+        if entri is not None and entri[0] == penanda:
+            return entri[1]
 
-    if PILImage is not None:
         try:
-            with PILImage.open(logo_path) as pil_logo:
+            with PILImage.open(path) as pil_logo:
                 has_alpha = pil_logo.mode in ('RGBA', 'LA') or 'transparency' in pil_logo.info
-
                 if has_alpha:
                     rgba_logo = pil_logo.convert('RGBA')
-                    white_bg = PILImage.new('RGB', rgba_logo.size, (255, 255, 255))
-                    white_bg.paste(rgba_logo, mask=rgba_logo.split()[-1])
-
-                    logo_buffer = BytesIO()
-                    white_bg.save(logo_buffer, format='PNG')
-                    logo_buffer.seek(0)
-
-                    logo = Image(logo_buffer, width=width, height=height)
-                    logo._source_buffer = logo_buffer
-                    return logo
-
-                if pil_logo.mode != 'RGB':
-                    rgb_logo = pil_logo.convert('RGB')
-                    logo_buffer = BytesIO()
-                    rgb_logo.save(logo_buffer, format='PNG')
-                    logo_buffer.seek(0)
-
-                    logo = Image(logo_buffer, width=width, height=height)
-                    logo._source_buffer = logo_buffer
-                    return logo
+                    render_logo = PILImage.new('RGB', rgba_logo.size, (255, 255, 255))
+                    render_logo.paste(rgba_logo, mask=rgba_logo.split()[-1])
+                else:
+                    render_logo = pil_logo.convert('RGB')
+
+            logo_buffer = BytesIO()
+            render_logo.save(logo_buffer, format='PNG')
+
+            reader = ImageReader(render_logo)
+            reader.getRGBData()  # decode sekarang, hasilnya disimpan di reader
+            hasil = (logo_buffer.getvalue(), reader)
         except Exception:
-            pass
+            hasil = None
+
+        _cache_logo[path] = (penanda, hasil)
+        return hasil
+
+
+def siapkan_aset_pdf(logo_path=None):
+    """Muat style dan logo ke cache proses ini (mis. di initializer proses anak)"""
+    _gaya_pdf()
+    if logo_path:
+        _logo_rata(logo_path)
+
+
+def clear_pdf_cache():
+    """Kosongkan cache style dan logo PDF (mis. setelah font/logo diganti)"""
+    _gaya_pdf.cache_clear()
+    with _kunci_cache_logo:
+        _cache_logo.clear()
+
+
+def _build_logo_flowable(logo_path, width_cm=2.6, height_cm=2.6):
+    """Build a ReportLab Image flowable and normalize transparent PNGs."""
+    if not logo_path or not os.path.exists(logo_path):
+        return None
+
+    width = width_cm * cm
+    height = height_cm * cm
+
+    logo_rata = _logo_rata(logo_path)
+    if logo_rata is not None:
+        return Image(BytesIO(logo_rata[0]), width=width, height=height)
 
     return Image(logo_path, width=width, height=height)
 
@@ -67,22 +252,10 @@ def _draw_logo_on_canvas(canvas, doc, logo_path, width_cm=2.6, height_cm=2.6):
     x_pos = doc.leftMargin
     y_pos = A4[1] - doc.topMargin - height
 
-    if PILImage is not None:
-        try:
-            with PILImage.open(logo_path) as pil_logo_raw:
-                has_alpha = pil_logo_raw.mode in ('RGBA', 'LA') or 'transparency' in pil_logo_raw.info
-                if has_alpha:
-                    rgba_logo = pil_logo_raw.convert('RGBA')
-                    white_bg = PILImage.new('RGB', rgba_logo.size, (255, 255, 255))
-                    white_bg.paste(rgba_logo, mask=rgba_logo.split()[-1])
-                    render_logo = white_bg
-                else:
-                    render_logo = pil_logo_raw.convert('RGB')
-
-                canvas.drawInlineImage(render_logo, x_pos, y_pos, width=width, height=height)
-                return
-        except Exception:
-            pass
+    logo_rata = _logo_rata(logo_path)
+    if logo_rata is not None:
+        canvas.drawImage(logo_rata[1], x_pos, y_pos, width=width, height=height)
+        return
 
     canvas.drawImage(
         logo_path,
@@ -95,6 +268,63 @@ def _draw_logo_on_canvas(canvas, doc, logo_path, width_cm=2.6, height_cm=2.6):
     )
 
 
+# Jumlah baris data per Table saat tabel laporan dipecah (lihat tabel_bertahap)
+BARIS_PER_TABEL = 250
+
+# Style tabel standar PDFExporter.add_table (baris 0 = header)
+GAYA_TABEL_STANDAR = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+])
+
+
+def tabel_bertahap(header, rows, col_widths=None, style=None, baris_per_tabel=BARIS_PER_TABEL):
+    """List Table berisi `rows` yang dipecah per `baris_per_tabel` baris, masing-masing dengan header.
+
+    Biaya split ReportLab tumbuh lebih dari linear terhadap jumlah baris satu Table,
+    jadi laporan ribuan baris dibuat dari banyak tabel kecil yang disusun berurutan.
+    `style` (TableStyle atau list perintah; -1 = baris terakhir tiap potongan) dipakai
+    bersama oleh semua potongan. `rows` boleh berupa iterator.
+    """
+    if style is not None and not isinstance(style, TableStyle):
+        style = TableStyle(style)
+
+    def buat_tabel(data):
+        return Table(data, colWidths=col_widths, style=style, repeatRows=1)
+
+    tabel_list = []
+    potongan = [header]
+    for row in rows:
+        potongan.append(row)
+        if len(potongan) > baris_per_tabel:
+            tabel_list.append(buat_tabel(potongan))
+            potongan = [header]
+    if len(potongan) > 1 or not tabel_list:
+        tabel_list.append(buat_tabel(potongan))
+    return tabel_list
+
+
+def sel_teks(teks, style, lebar):
+    """Isi sel tabel: string biasa jika muat satu baris selebar `lebar`, selain itu Paragraph.
+
+    String biasa digambar langsung oleh Table (font/perataan diatur lewat TableStyle),
+    jauh lebih murah daripada Paragraph yang harus di-wrap tiap kali tabel di-layout.
+    """
+    teks = '-' if teks is None else str(teks)
+    if '\n' not in teks and stringWidth(teks, style.fontName, style.fontSize) <= lebar:
+        return teks
+    return Paragraph(escape(teks).replace('\n', '<br/>'), style)
+
+
 class PDFExporter:
     """Class untuk generate PDF reports"""
     
@@ -123,31 +353,11 @@ class PDFExporter:
         self.story = []
         
         # Styles
-        self.styles = getSampleStyleSheet()
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#366092'),
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        self.subtitle_style = ParagraphStyle(
-            'CustomSubTitle',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            spaceAfter=12,
-            alignment=TA_CENTER
-        )
-        self.heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            textColor=colors.HexColor('#366092'),
-            spaceAfter=6,
-            fontName='Helvetica-Bold'
-        )
+        gaya = _gaya_pdf()
+        self.styles = gaya['sample']
+        self.title_style = gaya['judul']
+        self.subtitle_style = gaya['subjudul']
+        self.heading_style = gaya['heading']
     
     def add_title(self, title, subtitle=None):
         """Tambah judul laporan"""
@@ -163,28 +373,12 @@ class PDFExporter:
         self.story.append(Paragraph(text, style))
         self.story.append(Spacer(1, 0.3*cm))
     
-    def add_table(self, data, col_widths=None, with_header=True):
-        """Tambah tabel"""
-        # Create table
-        table = Table(data, colWidths=col_widths)
-        
-        # Table style
-        table_style = [
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-        ]
-        
-        table.setStyle(TableStyle(table_style))
-        self.story.append(table)
+    def add_table(self, data, col_widths=None, with_header=True, baris_per_tabel=BARIS_PER_TABEL):
+        """Tambah tabel; data[0] adalah header, tabel panjang dipecah per `baris_per_tabel` baris"""
+        self.story.extend(tabel_bertahap(
+            data[0], data[1:], col_widths=col_widths,
+            style=GAYA_TABEL_STANDAR, baris_per_tabel=baris_per_tabel
+        ))
         self.story.append(Spacer(1, 0.5*cm))
     
     def add_spacer(self, height=0.5):
@@ -209,8 +403,13 @@ class PDFExporter:
 
 
 # Helper functions untuk laporan spesifik
-def export_barang_to_pdf(barang_list, filename=None):
-    """Export daftar barang ke PDF"""
+def export_barang_to_pdf(barang_list, filename=None, jumlah=None):
+    """Export daftar barang ke PDF.
+
+    `barang_list` boleh berupa iterator (mis. query yield_per); isi `jumlah` jika begitu.
+    """
+    if jumlah is None:
+        jumlah = len(barang_list)
     pdf = PDFExporter(orientation='landscape')
     
     # Title
@@ -220,7 +419,7 @@ def export_barang_to_pdf(barang_list, filename=None):
     )
     
     # Info
-    info_text = f"Total Barang: <b>{len(barang_list)} item</b> | Dicetak pada: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+    info_text = f"Total Barang: <b>{jumlah} item</b> | Dicetak pada: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
     pdf.add_paragraph(info_text)
     
     # Table data
@@ -281,15 +480,15 @@ def export_kontrak_to_pdf(kontrak_list, filename=None):
     
     total_nilai = 0
     for idx, kontrak in enumerate(kontrak_list, 1):
-        nilai_kontrak = kontrak.get_total_nilai()
+        nilai_kontrak = kontrak.total_nilai
         total_nilai += nilai_kontrak
         
         table_data.append([
             str(idx),
             kontrak.nomor_kontrak,
             kontrak.tanggal_kontrak.strftime('%d/%m/%Y'),
-            str(kontrak.barang_kontrak.count()),
-            str(kontrak.get_total_qty()),
+            str(kontrak.jumlah_barang),
+            str(kontrak.total_qty),
             f"Rp {nilai_kontrak:,.0f}" if nilai_kontrak > 0 else '-'
         ])
     
@@ -309,40 +508,29 @@ def export_kontrak_to_pdf(kontrak_list, filename=None):
     return pdf.build()
 
 
-def export_laporan_kerusakan_to_pdf(laporan, logo_path=None):
-    """Export surat laporan kerusakan per aset ke PDF"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=2*cm,
-        leftMargin=2*cm,
-        topMargin=1.5*cm,
-        bottomMargin=2*cm
-    )
+class _LogoKop(Flowable):
+    """Penanda tanpa ukuran di awal surat: menggambar logo kop di halaman tempatnya jatuh"""
 
-    styles = getSampleStyleSheet()
-    header_bold = ParagraphStyle(
-        'HeaderBold',
-        parent=styles['Normal'],
-        alignment=TA_CENTER,
-        fontSize=11,
-        leading=13,
-        fontName='Helvetica-Bold'
-    )
-    header_normal = ParagraphStyle(
-        'HeaderNormal',
-        parent=styles['Normal'],
-        alignment=TA_CENTER,
-        fontSize=9.5,
-        leading=12
-    )
-    body_style = ParagraphStyle(
-        'Body',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14
-    )
+    def __init__(self, doc, logo_path):
+        Flowable.__init__(self)
+        self.width = self.height = 0
+        self._doc = doc
+        self._logo_path = logo_path
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        # Posisi logo mengikuti margin halaman, bukan posisi flowable
+        _draw_logo_on_canvas(canvas, self._doc, self._logo_path, width_cm=2.6, height_cm=2.6)
+
+    def draw(self):
+        pass
+
+
+def _elemen_surat_kerusakan(laporan, doc, logo_path):
+    """Flowable satu surat laporan kerusakan (kop, isi, tanda tangan)"""
+    gaya = _gaya_pdf()
+    header_bold = gaya['kop_tebal']
+    header_normal = gaya['kop_normal']
+    body_style = gaya['isi_surat']
 
     header_lines = [
         "KEMENTERIAN PENDIDIKAN TINGGI, SAINS,",
@@ -354,7 +542,7 @@ def export_laporan_kerusakan_to_pdf(laporan, logo_path=None):
         "Laman https://library.unhas.ac.id    email : library@unhas.ac.id"
     ]
 
-    elements = []
+    elements = [_LogoKop(doc, logo_path)]
 
     for idx, line in enumerate(header_lines):
         style = header_bold if idx <= 3 else header_normal
@@ -427,16 +615,47 @@ def export_laporan_kerusakan_to_pdf(laporan, logo_path=None):
     pelapor_nama = laporan.pelapor.nama_lengkap if laporan.pelapor else "...................................."
     elements.append(Paragraph(f"({pelapor_nama})<br/>Petugas / Pelapor", body_style))
 
-    def _on_first_page(canvas, doc_obj):
-        _draw_logo_on_canvas(canvas, doc_obj, logo_path, width_cm=2.6, height_cm=2.6)
+    return elements
+
+
+def export_laporan_kerusakan_to_pdf(laporan, logo_path=None):
+    """Export surat laporan kerusakan per aset ke PDF"""
+    return export_laporan_kerusakan_batch_to_pdf([laporan], logo_path=logo_path)
+
 
-    doc.build(elements, onFirstPage=_on_first_page)
+def export_laporan_kerusakan_batch_to_pdf(laporan_list, logo_path=None):
+    """Gabungkan banyak surat laporan kerusakan ke satu PDF, tiap surat mulai di halaman baru.
+
+    Gambar logo hanya disimpan sekali di dokumen dan dipakai ulang oleh semua surat.
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=2*cm,
+        leftMargin=2*cm,
+        topMargin=1.5*cm,
+        bottomMargin=2*cm
+    )
+
+    elements = []
+    for idx, laporan in enumerate(laporan_list):
+        if idx:
+            elements.append(PageBreak())
+        elements.extend(_elemen_surat_kerusakan(laporan, doc, logo_path))
+
+    doc.build(elements)
     buffer.seek(0)
     return buffer
 
 
-def export_transaksi_to_pdf(transaksi_list, jenis, tanggal_awal=None, tanggal_akhir=None, filename=None):
-    """Export transaksi masuk/keluar ke PDF"""
+def export_transaksi_to_pdf(transaksi_list, jenis, tanggal_awal=None, tanggal_akhir=None, filename=None, jumlah=None):
+    """Export transaksi masuk/keluar ke PDF.
+
+    `transaksi_list` boleh berupa iterator (mis. query yield_per); isi `jumlah` jika begitu.
+    """
+    if jumlah is None:
+        jumlah = len(transaksi_list)
     pdf = PDFExporter(orientation='landscape')
     
     # Title
@@ -449,7 +668,7 @@ def export_transaksi_to_pdf(transaksi_list, jenis, tanggal_awal=None, tanggal_ak
     pdf.add_title(title, subtitle)
     
     # Info
-    info_text = f"Total Transaksi: <b>{len(transaksi_list)} transaksi</b> | Dicetak pada: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+    info_text = f"Total Transaksi: <b>{jumlah} transaksi</b> | Dicetak pada: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
     pdf.add_paragraph(info_text)
     
     # Table data
@@ -457,15 +676,16 @@ def export_transaksi_to_pdf(transaksi_list, jenis, tanggal_awal=None, tanggal_ak
     
     total_qty = 0
     for idx, transaksi in enumerate(transaksi_list, 1):
+        barang = transaksi.barang  # sudah di-joinedload oleh route laporan
         total_qty += transaksi.qty
         
         table_data.append([
             str(idx),
             transaksi.tanggal.strftime('%d/%m/%Y'),
             transaksi.kode_barang,
-            transaksi.barang.nama_barang if transaksi.barang else '-',
+            barang.nama_barang if barang else '-',
             str(transaksi.qty),
-            transaksi.barang.satuan if transaksi.barang else '-',
+            barang.satuan if barang else '-',
             transaksi.keterangan or '-'
         ])
     
@@ -484,16 +704,153 @@ def export_transaksi_to_pdf(transaksi_list, jenis, tanggal_awal=None, tanggal_ak
     return pdf.build()
 
 
+def export_kartu_stok_to_pdf(kartu, filename=None, baris_per_tabel=BARIS_PER_TABEL):
+    """Export kartu stok ke PDF (tabel dipecah per `baris_per_tabel` baris)"""
+    pdf = PDFExporter(orientation='landscape')
+    barang = kartu.barang
+    
+    # Title
+    if kartu.tanggal_awal and kartu.tanggal_akhir:
+        subtitle = f"Periode: {kartu.tanggal_awal.strftime('%d/%m/%Y')} - {kartu.tanggal_akhir.strftime('%d/%m/%Y')}"
+    else:
+        subtitle = f"Per {datetime.now().strftime('%d %B %Y')}"
+    pdf.add_title("KARTU STOK BARANG PERPUSTAKAAN UNIVERSITAS HASANUDDIN", subtitle)
+    
+    # Info
+    info_text = (
+        f"Barang: <b>{barang.kode_barang} - {barang.nama_barang}</b> | Satuan: {barang.satuan} | "
+        f"Saldo Awal: <b>{kartu.saldo_awal}</b> | Dicetak pada: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+    )
+    pdf.add_paragraph(info_text)
+    
+    header = ['No', 'Tanggal', 'Jenis', 'Masuk', 'Keluar', 'Saldo', 'Keterangan']
+    col_widths = [1.5*cm, 3*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm, 11*cm]
+    table_data = [header]
+    for baris in kartu:
+        table_data.append([
+            str(baris['no']),
+            baris['tanggal'].strftime('%d/%m/%Y'),
+            baris['jenis'].title(),
+            str(baris['masuk']) if baris['masuk'] else '-',
+            str(baris['keluar']) if baris['keluar'] else '-',
+            str(baris['saldo']),
+            baris['keterangan'] or '-'
+        ])
+    
+    # Summary row
+    table_data.append(['', '', 'TOTAL:', str(kartu.total_masuk), str(kartu.total_keluar), str(kartu.saldo_akhir), ''])
+    pdf.add_table(table_data, col_widths=col_widths, baris_per_tabel=baris_per_tabel)
+    
+    # Footer
+    pdf.add_paragraph(f"<i>Dibuat oleh Inven-Go System</i>", pdf.styles['Normal'])
+    
+    if filename:
+        pdf.save(filename)
+    
+    return pdf.build()
+
+
+def export_aset_tetap_to_pdf(aset_list, filename=None, jumlah=None):
+    """Export daftar aset tetap ke PDF.
+
+    `aset_list` boleh berupa iterator (mis. query yield_per); isi `jumlah` jika begitu.
+    """
+    if jumlah is None:
+        jumlah = len(aset_list)
+    
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(letter), topMargin=0.5*inch, bottomMargin=0.5*inch)
+    
+    elements = []
+    
+    # Title
+    gaya = _gaya_pdf()
+    title_style = gaya['laporan_judul']
+    subtitle_style = gaya['laporan_subjudul']
+    info_style = gaya['laporan_info']
+    
+    elements.append(Paragraph('Laporan Daftar Aset Tetap Perpustakaan Universitas Hasanuddin', title_style))
+    elements.append(Paragraph(f'Per {datetime.now().strftime("%d %B %Y")}', subtitle_style))
+    elements.append(Paragraph(f'Total Aset: <b>{jumlah} item</b> | Dicetak pada: {datetime.now().strftime("%d/%m/%Y %H:%M")}', info_style))
+
+    cell_style_left = gaya['aset_sel_kiri']
+    cell_style_center = gaya['aset_sel_tengah']
+    cell_style_kontrak = gaya['aset_sel_kontrak']
+    header_cell_style = gaya['aset_sel_header']
+
+    # Landscape letter is 11 inches wide, minus 1 inch for margins = 10 inches
+    # No: 0.35", Kode Aset: 0.8", Nama Aset: 1.2", Kategori: 0.9", Merk: 0.9", Kontrak/SPK: 2.0", Tempat Penggunaan: 1.5", Nama Pengguna: 1.0", Total Barang: 0.8"
+    col_widths = [0.35*inch, 0.8*inch, 1.2*inch, 0.9*inch, 0.9*inch, 2.0*inch, 1.5*inch, 1.0*inch, 0.8*inch]
+    # Lebar isi sel = lebar kolom - LEFTPADDING - RIGHTPADDING
+    lebar = [w - 8 for w in col_widths]
+    gaya_kolom = [
+        cell_style_center, cell_style_center, cell_style_left, cell_style_center, cell_style_center,
+        cell_style_kontrak, cell_style_left, cell_style_left, cell_style_center,
+    ]
+
+    header = [
+        sel_teks(judul, header_cell_style, lebar[i])
+        for i, judul in enumerate([
+            'No', 'Kode Aset', 'Nama Aset', 'Kategori', 'Merk', 'Kontrak/SPK',
+            'Tempat Penggunaan', 'Nama Pengguna', 'Total Barang',
+        ])
+    ]
+
+    def rows():
+        for idx, aset in enumerate(aset_list, 1):
+            nilai = [
+                idx,
+                aset.kode_aset,
+                aset.nama_aset,
+                aset.kategori.nama_kategori if aset.kategori else '-',
+                aset.merk_aset_tetap.nama_merk if aset.merk_aset_tetap else '-',
+                aset.kontrak_spk or '-',
+                aset.tempat_penggunaan or '-',
+                aset.nama_pengguna or '-',
+                aset.total_barang if aset.total_barang else 0,
+            ]
+            yield [sel_teks(v, gaya_kolom[i], lebar[i]) for i, v in enumerate(nilai)]
+
+    table_style = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
+        ('WORDWRAP', (0, 0), (-1, -1), 'LTR'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('TOPPADDING', (0, 0), (-1, 0), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
+        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 4),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ('TOPPADDING', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+        # Sel berupa string biasa mengikuti style Paragraph kolomnya
+        ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 8, 10),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('FONT', (0, 1), (-1, -1), 'Helvetica', 7.5, 9),
+        ('FONT', (5, 1), (5, -1), 'Helvetica', 7, 8.5),
+    ]
+    for i, gaya_sel in enumerate(gaya_kolom):
+        table_style.append(('ALIGN', (i, 1), (i, -1), 'CENTER' if gaya_sel.alignment == 1 else 'LEFT'))
+
+    elements.extend(tabel_bertahap(header, rows(), col_widths=col_widths, style=table_style))
+    elements.append(Spacer(1, 0.3*inch))
+    elements.append(Paragraph(f'<i>Dibuat oleh Inven-Go System</i>', info_style))
+    
+    doc.build(elements)
+    buffer.seek(0)
+    
+    if filename:
+        with open(filename, 'wb') as f:
+            f.write(buffer.read())
+        buffer.seek(0)
+    
+    return buffer
+
+
 def export_merk_aset_tetap_to_pdf(merk_list, filename=None):
     """Export daftar jenis aset ke PDF"""
-    from reportlab.lib.pagesizes import landscape, letter
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    from io import BytesIO
-    from xml.sax.saxutils import escape
-    
     buffer = BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -507,55 +864,13 @@ def export_merk_aset_tetap_to_pdf(merk_list, filename=None):
     elements = []
     
     # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=14,
-        textColor=colors.HexColor('#366092'),
-        spaceAfter=6,
-        alignment=1  # Center
-    )
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.grey,
-        spaceAfter=12,
-        alignment=1  # Center
-    )
-    info_style = ParagraphStyle(
-        'Info',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.grey,
-        spaceAfter=12,
-        alignment=0  # Left
-    )
-    header_cell_style = ParagraphStyle(
-        'MerkHeaderCell',
-        parent=styles['Normal'],
-        fontName='Helvetica-Bold',
-        fontSize=8,
-        leading=10,
-        textColor=colors.whitesmoke,
-        alignment=1
-    )
-    cell_left_style = ParagraphStyle(
-        'MerkCellLeft',
-        parent=styles['Normal'],
-        fontName='Helvetica',
-        fontSize=8,
-        leading=10,
-        alignment=0,
-        wordWrap='LTR',
-        splitLongWords=1
-    )
-    cell_center_style = ParagraphStyle(
-        'MerkCellCenter',
-        parent=cell_left_style,
-        alignment=1
-    )
+    gaya = _gaya_pdf()
+    title_style = gaya['laporan_judul']
+    subtitle_style = gaya['laporan_subjudul']
+    info_style = gaya['laporan_info']
+    header_cell_style = gaya['merk_sel_header']
+    cell_left_style = gaya['merk_sel_kiri']
+    cell_center_style = gaya['merk_sel_tengah']
     
     # Title
     elements.append(Paragraph('LAPORAN DATA JENIS ASET PERPUSTAKAAN UNIVERSITAS HASANUDDIN', title_style))
@@ -597,40 +912,39 @@ def export_merk_aset_tetap_to_pdf(merk_list, filename=None):
             return text[:max_len - 3] + '...'
         return text
 
-    def p(text, style):
-        safe = escape(normalize_pdf_text(text)).replace('\n', ' ')
-        return Paragraph(safe, style)
+    # Use nearly full printable width to avoid cramped columns.
+    col_widths = [0.45*inch, 1.4*inch, 1.2*inch, 2.8*inch, 1.25*inch, 1.9*inch, 1.0*inch]
+    # Lebar isi sel = lebar kolom - LEFTPADDING - RIGHTPADDING
+    lebar = [w - 8 for w in col_widths]
+    gaya_kolom = [
+        cell_center_style, cell_left_style, cell_center_style, cell_left_style,
+        cell_center_style, cell_center_style, cell_center_style,
+    ]
 
-    # Table data
-    table_data = [[
-        p('No', header_cell_style),
-        p('Jenis Aset', header_cell_style),
-        p('Tipe', header_cell_style),
-        p('Spesifikasi', header_cell_style),
-        p('Tanggal Pengadaan', header_cell_style),
-        p('Kontrak/SPK', header_cell_style),
-        p('Jumlah Aset', header_cell_style),
-    ]]
-    
-    for idx, merk in enumerate(merk_list, 1):
-        table_data.append([
-            p(idx, cell_center_style),
-            p(truncate_pdf_text(merk.nama_merk, 60), cell_left_style),
-            p(truncate_pdf_text(merk.tipe or '-', 60), cell_center_style),
-            p(truncate_pdf_text(merk.spesifikasi or '-', 160), cell_left_style),
-            p(merk.tanggal_pengadaan.strftime('%d/%m/%Y') if merk.tanggal_pengadaan else '-', cell_center_style),
-            p(truncate_pdf_text(merk.nomor_kontrak or '-', 80), cell_center_style),
-            p(merk.get_total_aset_by_criteria(), cell_center_style),
+    def sel(text, i, style=None):
+        return sel_teks(normalize_pdf_text(text).replace('\n', ' '), style or gaya_kolom[i], lebar[i])
+
+    header = [
+        sel(judul, i, header_cell_style)
+        for i, judul in enumerate([
+            'No', 'Jenis Aset', 'Tipe', 'Spesifikasi', 'Tanggal Pengadaan', 'Kontrak/SPK', 'Jumlah Aset',
         ])
-    
-    # Use nearly full printable width to avoid cramped columns.
-    table = Table(
-        table_data,
-        colWidths=[0.45*inch, 1.4*inch, 1.2*inch, 2.8*inch, 1.25*inch, 1.9*inch, 1.0*inch],
-        repeatRows=1
-    )
-    
-    table.setStyle(TableStyle([
+    ]
+
+    def rows():
+        for idx, merk in enumerate(merk_list, 1):
+            nilai = [
+                idx,
+                truncate_pdf_text(merk.nama_merk, 60),
+                truncate_pdf_text(merk.tipe or '-', 60),
+                truncate_pdf_text(merk.spesifikasi or '-', 160),
+                merk.tanggal_pengadaan.strftime('%d/%m/%Y') if merk.tanggal_pengadaan else '-',
+                truncate_pdf_text(merk.nomor_kontrak or '-', 80),
+                merk.get_total_aset_by_criteria(),
+            ]
+            yield [sel(v, i) for i, v in enumerate(nilai)]
+
+    table_style = [
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
         ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
@@ -642,9 +956,15 @@ def export_merk_aset_tetap_to_pdf(merk_list, filename=None):
         ('RIGHTPADDING', (0, 0), (-1, -1), 4),
         ('TOPPADDING', (0, 1), (-1, -1), 6),
         ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-    ]))
-    
-    elements.append(table)
+        # Sel berupa string biasa mengikuti style Paragraph kolomnya
+        ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 8, 10),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('FONT', (0, 1), (-1, -1), 'Helvetica', 8, 10),
+    ]
+    for i, gaya_sel in enumerate(gaya_kolom):
+        table_style.append(('ALIGN', (i, 1), (i, -1), 'CENTER' if gaya_sel.alignment == 1 else 'LEFT'))
+
+    elements.extend(tabel_bertahap(header, rows(), col_widths=col_widths, style=table_style))
     elements.append(Spacer(1, 0.3*inch))
     elements.append(Paragraph(f'<i>Dibuat oleh Inven-Go System</i>', info_style))
     
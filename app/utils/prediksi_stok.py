@@ -0,0 +1,158 @@
+"""Prediksi konsumsi barang habis pakai untuk banyak barang sekaligus.
+
+Laju konsumsi di-cache per proses. Kuncinya memuat tanggal dan versi tabel
+barang dan barang_keluar di versi_data, sehingga transaksi keluar atau
+perubahan jenis barang dari proses mana pun langsung membuat cache lama tidak
+terpakai.
+"""
+
+from datetime import date, datetime, timedelta
+from threading import Lock
+
+from sqlalchemy import func
+
+from app import db
+from app.models.barang import Barang, BarangKeluar
+from app.models.versi_data import VersiData
+
+METODE_PREDIKSI = ('rata_rata', 'moving_average', 'eksponensial')
+
+# Tabel sumber laju konsumsi; versinya bagian dari kunci cache
+TABEL_LAJU = ('barang', 'barang_keluar')
+
+# Cache laju konsumsi: {((tanggal, versi tabel), periode_hari, metode, jendela, alpha): {kode_barang: laju}}
+_cache_laju = {}
+_cache_lock = Lock()
+
+
+def ambil_konsumsi_harian(periode_hari=30, kode_barang_list=None, hari_ini=None):
+    """Ambil total BarangKeluar per hari untuk semua barang habis pakai dalam satu query.
+
+    Return dict {kode_barang: [qty hari ke-0, ..., qty hari ini]} dengan panjang periode_hari + 1
+    (hari tanpa transaksi bernilai 0).
+    """
+    hari_ini = hari_ini or date.today()
+    tanggal_mulai = hari_ini - timedelta(days=periode_hari)
+    panjang = periode_hari + 1
+
+    query = db.session.query(
+        BarangKeluar.kode_barang,
+        BarangKeluar.tanggal,
+        func.sum(BarangKeluar.qty)
+    ).join(
+        Barang, Barang.kode_barang == BarangKeluar.kode_barang
+    ).filter(
+        Barang.jenis_barang == 'habis_pakai',
+        BarangKeluar.tanggal >= tanggal_mulai,
+        BarangKeluar.tanggal <= hari_ini
+    )
+    if kode_barang_list is not None:
+        query = query.filter(BarangKeluar.kode_barang.in_(list(kode_barang_list)))
+
+    seri = {}
+    for kode_barang, tanggal, total in query.group_by(BarangKeluar.kode_barang, BarangKeluar.tanggal).all():
+        if isinstance(tanggal, datetime):
+            tanggal = tanggal.date()
+        baris = seri.setdefault(kode_barang, [0] * panjang)
+        baris[(tanggal - tanggal_mulai).days] += int(total or 0)
+    return seri
+
+
+def hitung_laju(seri, periode_hari=30, metode='rata_rata', jendela=7, alpha=None):
+    """Hitung laju konsumsi per hari untuk setiap seri harian.
+
+    - rata_rata: total konsumsi dibagi periode_hari
+    - moving_average: rata-rata `jendela` hari terakhir
+    - eksponensial: exponential smoothing dengan alpha (default 2 / (jendela + 1))
+    """
+    if metode not in METODE_PREDIKSI:
+        raise ValueError(f'Metode prediksi tidak dikenal: {metode}')
+
+    if metode == 'rata_rata':
+        return {kode: sum(nilai) / periode_hari for kode, nilai in seri.items()}
+
+    if metode == 'moving_average':
+        jendela = max(1, min(jendela, periode_hari))
+        return {kode: sum(nilai[-jendela:]) / jendela for kode, nilai in seri.items()}
+
+    alpha = alpha if alpha is not None else 2 / (max(1, jendela) + 1)
+    laju = {}
+    for kode, nilai in seri.items():
+        smoothed = nilai[0]
+        for qty in nilai[1:]:
+            smoothed = alpha * qty + (1 - alpha) * smoothed
+        laju[kode] = smoothed
+    return laju
+
+
+def get_laju_konsumsi(periode_hari=30, metode='rata_rata', jendela=7, alpha=None):
+    """Laju konsumsi semua barang habis pakai, di-cache per hari dan versi data"""
+    hari_ini = date.today()
+    versi = VersiData.ambil(TABEL_LAJU)
+    kunci_data = (hari_ini, tuple(versi[tabel] for tabel in TABEL_LAJU))
+    kunci = (kunci_data, periode_hari, metode, jendela, alpha)
+    with _cache_lock:
+        if kunci in _cache_laju:
+            return _cache_laju[kunci]
+
+    seri = ambil_konsumsi_harian(periode_hari, hari_ini=hari_ini)
+    laju = hitung_laju(seri, periode_hari, metode, jendela, alpha)
+
+    with _cache_lock:
+        # Buang cache hari sebelumnya atau versi data lama
+        for kunci_lama in [k for k in _cache_laju if k[0] != kunci_data]:
+            del _cache_laju[kunci_lama]
+        _cache_laju[kunci] = laju
+    return laju
+
+
+def clear_cache():
+    """Kosongkan cache laju konsumsi"""
+    with _cache_lock:
+        _cache_laju.clear()
+
+
+def _format_prediksi(stok_sekarang, laju, sekarang):
+    if laju <= 0:
+        return None
+
+    hari_tersisa = int(stok_sekarang / laju)
+    tanggal_habis = sekarang + timedelta(days=hari_tersisa)
+    rata_rata = round(laju, 2)
+    # Key sama dengan Barang.prediksi_habis versi lama agar template tetap kompatibel.
+    return {
+        'hari_tersisa': hari_tersisa,
+        'tanggal_habis': tanggal_habis,
+        'rata_rata_konsumsi': rata_rata,
+        'estimasi_habis': tanggal_habis,
+        'rata_rata_per_hari': rata_rata,
+    }
+
+
+def prediksi_habis_bulk(barang_list=None, periode_hari=30, metode='rata_rata', jendela=7, alpha=None, stok_map=None):
+    """Prediksi habis untuk banyak barang habis pakai sekaligus.
+
+    `barang_list` berupa list Barang (default: semua barang habis pakai). `stok_map`
+    ({kode_barang: stok_akhir}) bisa diberikan jika stok sudah dihitung sebelumnya.
+    Return dict {kode_barang: prediksi atau None}.
+    """
+    if barang_list is None:
+        barang_list = Barang.query.filter_by(jenis_barang='habis_pakai').all()
+    barang_list = [b for b in barang_list if b.jenis_barang == 'habis_pakai']
+    if not barang_list:
+        return {}
+
+    laju = get_laju_konsumsi(periode_hari, metode, jendela, alpha)
+    if stok_map is None:
+        stok_map = Barang.stok_akhir_bulk([b for b in barang_list if b.kode_barang in laju])
+
+    sekarang = datetime.now()
+    hasil = {}
+    for barang in barang_list:
+        laju_barang = laju.get(barang.kode_barang, 0)
+        if laju_barang <= 0:
+            hasil[barang.kode_barang] = None  # Tidak ada data konsumsi
+            continue
+        hasil[barang.kode_barang] = _format_prediksi(stok_map[barang.kode_barang], laju_barang, sekarang)
+    return hasil
+
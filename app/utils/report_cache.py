@@ -0,0 +1,181 @@
+"""Cache file export laporan (Excel/PDF) di disk.
+
+Kunci cache = hash dari (jenis laporan, format, filter yang dinormalisasi, versi
+data tabel-tabel sumbernya, tanggal hari ini). Versi data dinaikkan otomatis
+setiap tabel berubah (lihat app/models/versi_data.py), jadi cache tidak perlu
+di-invalidasi manual. Tanggal ikut dalam kunci karena judul laporan memuat
+"Per <tanggal>". Ukuran folder dibatasi LAPORAN_CACHE_MAKS_MB; file yang paling
+lama tidak dipakai dihapus lebih dulu (LRU berdasarkan mtime).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import date
+
+from flask import current_app
+
+from app.models.versi_data import VersiData
+
+# Batas ukuran cache (MB) jika LAPORAN_CACHE_MAKS_MB tidak diatur; 0 = cache mati
+UKURAN_MAKS_MB = 500
+
+# Tabel sumber tiap jenis laporan (lihat EKSPOR_LAPORAN di app/laporan/routes.py)
+DEPENDENSI_LAPORAN = {
+    'barang': ('barang', 'barang_masuk', 'barang_keluar', 'stok_saldo', 'kategori_barang', 'merk_barang'),
+    'kontrak': ('kontrak_barang', 'barang_kontrak'),
+    'transaksi_masuk': ('barang_masuk', 'barang'),
+    'transaksi_keluar': ('barang_keluar', 'barang'),
+    'aset_tetap': ('aset_tetap', 'kategori_barang', 'merk_aset_tetap'),
+    'kartu_stok': ('barang', 'barang_masuk', 'barang_keluar'),
+}
+
+# Parameter form yang tidak memengaruhi isi laporan
+_PARAMETER_DIABAIKAN = {'submit', 'csrf_token'}
+
+
+def _maks_bytes(app):
+    maks_mb = app.config.get('LAPORAN_CACHE_MAKS_MB')
+    if maks_mb is None:
+        maks_mb = UKURAN_MAKS_MB
+    return int(maks_mb) * 1024 * 1024
+
+
+def direktori_cache(app=None):
+    """Folder cache laporan (dibuat jika belum ada)"""
+    app = app or current_app
+    direktori = app.config.get('LAPORAN_CACHE_DIR') or os.path.join(app.instance_path, 'laporan_cache')
+    os.makedirs(direktori, exist_ok=True)
+    return direktori
+
+
+def kunci_cache(jenis, format_file, args):
+    """Hash SHA-256 dari jenis, format, filter (tanpa nilai kosong) dan versi data"""
+    items = args.items(multi=True) if hasattr(args, 'getlist') else args.items()
+    filter_laporan = sorted(
+        (kunci, nilai) for kunci, nilai in items
+        if nilai not in ('', None) and kunci not in _PARAMETER_DIABAIKAN
+    )
+    isi = json.dumps({
+        'jenis': jenis,
+        'format': format_file,
+        'filter': filter_laporan,
+        'versi': VersiData.ambil(DEPENDENSI_LAPORAN[jenis]),
+        'tanggal': date.today().isoformat(),
+    }, sort_keys=True)
+    return hashlib.sha256(isi.encode('utf-8')).hexdigest()
+
+
+def _path(direktori, kunci):
+    return os.path.join(direktori, kunci), os.path.join(direktori, f'{kunci}.json')
+
+
+def ambil(kunci, app=None):
+    """(file, nama_file) jika ada di cache, sekaligus menandai baru dipakai.
+
+    File langsung dibuka agar tetap bisa dibaca walaupun entri ini dihapus
+    proses lain (batasi_ukuran) sebelum selesai dikirim.
+    """
+    path_file, path_meta = _path(direktori_cache(app), kunci)
+    try:
+        with open(path_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+        sumber = open(path_file, 'rb')
+    except (OSError, ValueError):
+        return None
+    try:
+        os.utime(path_file)
+    except OSError:
+        pass
+    return sumber, meta['nama_file']
+
+
+def simpan(kunci, sumber, nama_file, app=None):
+    """Tulis file (objek file) ke cache secara atomik lalu batasi ukuran folder.
+
+    Mengembalikan file cache yang sudah dibuka untuk dibaca.
+    """
+    app = app or current_app
+    direktori = direktori_cache(app)
+    path_file, path_meta = _path(direktori, kunci)
+
+    fd, path_sementara = tempfile.mkstemp(dir=direktori, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as tujuan:
+        sumber.seek(0)
+        shutil.copyfileobj(sumber, tujuan)
+    os.replace(path_sementara, path_file)
+
+    with open(path_meta, 'w', encoding='utf-8') as f:
+        json.dump({'nama_file': nama_file}, f)
+
+    hasil = open(path_file, 'rb')
+    batasi_ukuran(app)
+    return hasil
+
+
+def batasi_ukuran(app=None):
+    """Hapus entri yang paling lama tidak dipakai sampai total ukuran <= batas"""
+    app = app or current_app
+    direktori = direktori_cache(app)
+    maks = _maks_bytes(app)
+
+    entri = []
+    total = 0
+    for nama in os.listdir(direktori):
+        if nama.endswith(('.json', '.tmp')):
+            continue
+        try:
+            info = os.stat(os.path.join(direktori, nama))
+        except OSError:
+            continue
+        entri.append((info.st_mtime, info.st_size, nama))
+        total += info.st_size
+
+    dihapus = 0
+    for _, ukuran, nama in sorted(entri):
+        if total <= maks:
+            break
+        for path in _path(direktori, nama):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= ukuran
+        dihapus += 1
+    return dihapus
+
+
+def kosongkan(app=None):
+    """Hapus seluruh isi cache laporan"""
+    direktori = direktori_cache(app)
+    jumlah = 0
+    for nama in os.listdir(direktori):
+        os.remove(os.path.join(direktori, nama))
+        if not nama.endswith(('.json', '.tmp')):
+            jumlah += 1
+    return jumlah
+
+
+def ambil_atau_buat(jenis, format_file, args, buat):
+    """Ambil export dari cache, atau panggil `buat(format_file)` lalu simpan hasilnya.
+
+    Mengembalikan (file, nama_file), atau None jika `buat` mengembalikan None.
+    """
+    if _maks_bytes(current_app) <= 0:
+        return buat(format_file)
+
+    kunci = kunci_cache(jenis, format_file, args)
+    hasil = ambil(kunci)
+    if hasil is not None:
+        return hasil
+
+    hasil = buat(format_file)
+    if hasil is None:
+        return None
+
+    sumber, nama_file = hasil
+    hasil = simpan(kunci, sumber, nama_file)
+    sumber.close()
+    return hasil, nama_file
@@ -0,0 +1,212 @@
+"""Worker report job: export Excel/PDF dikerjakan di proses terpisah.
+
+Worker (`flask laporan worker`) mengambil job berstatus 'antri' dari tabel
+report_job dan membagikannya ke ProcessPoolExecutor, sehingga beberapa export
+besar bisa dikerjakan paralel di beberapa core tanpa menahan worker web.
+Hasilnya disimpan di LAPORAN_JOB_DIR dan dihapus setelah kedaluwarsa.
+"""
+
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app import db
+
+# Masa simpan file hasil export (jam) jika LAPORAN_JOB_MASA_BERLAKU_JAM tidak diatur
+MASA_BERLAKU_JAM = 24
+
+# Job 'proses' lebih lama dari ini dianggap macet (worker mati)
+BATAS_MACET_MENIT = 60
+
+# Jeda antar pembersihan file kedaluwarsa oleh worker (detik)
+INTERVAL_BERSIHKAN = 600
+
+# App Flask milik proses anak (diisi initializer pool)
+_app = None
+
+
+def direktori_job(app=None):
+    """Folder penyimpanan file hasil report job (dibuat jika belum ada)"""
+    app = app or current_app
+    direktori = app.config.get('LAPORAN_JOB_DIR') or os.path.join(app.instance_path, 'laporan_job')
+    os.makedirs(direktori, exist_ok=True)
+    return direktori
+
+
+def tambah_job(jenis, format_file, parameter, user_id=None):
+    """Masukkan job baru ke antrean dan kembalikan objek ReportJob"""
+    from app.models.report_job import ReportJob
+
+    job = ReportJob(
+        jenis=jenis,
+        format_file=format_file,
+        parameter=parameter,
+        user_id=user_id,
+        status='antri'
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def kerjakan_job(job_id, app=None):
+    """Buat file export untuk satu job dan simpan hasilnya ke disk.
+
+    Export dijalankan dalam test_request_context dengan query string job,
+    sehingga memakai filter, fungsi export, dan cache laporan yang sama dengan
+    route laporan.
+    """
+    from app.laporan.routes import EKSPOR_LAPORAN
+    from app.models.report_job import ReportJob
+    from app.utils.report_cache import ambil_atau_buat
+
+    app = app or current_app._get_current_object()
+    job = db.session.get(ReportJob, job_id)
+    if job is None:
+        return
+
+    try:
+        with app.test_request_context('/', query_string=job.parameter or '') as ctx:
+            hasil = ambil_atau_buat(
+                job.jenis, job.format_file, ctx.request.args, EKSPOR_LAPORAN[job.jenis]
+            )
+            if hasil is None:
+                raise ValueError('Data laporan tidak ditemukan untuk filter yang dipilih')
+
+            sumber, nama_file = hasil
+            path_file = os.path.join(direktori_job(app), f'{job.id}_{nama_file}')
+            # Tutup file sumber (file sementara cache) juga saat penyalinan gagal
+            with sumber:
+                sumber.seek(0)
+                with open(path_file, 'wb') as tujuan:
+                    shutil.copyfileobj(sumber, tujuan)
+    except Exception as exc:
+        db.session.rollback()
+        job = db.session.get(ReportJob, job_id)
+        job.status = 'gagal'
+        job.pesan_error = str(exc)[:1000]
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        current_app.logger.exception('Report job %s gagal', job_id)
+        return
+
+    masa_berlaku = app.config.get('LAPORAN_JOB_MASA_BERLAKU_JAM') or MASA_BERLAKU_JAM
+    job.status = 'selesai'
+    job.nama_file = nama_file
+    job.path_file = path_file
+    job.ukuran_file = os.path.getsize(path_file)
+    job.finished_at = datetime.utcnow()
+    job.expires_at = job.finished_at + timedelta(hours=masa_berlaku)
+    job.pesan_error = None
+    db.session.commit()
+
+
+def bersihkan_kedaluwarsa():
+    """Hapus file job yang sudah lewat expires_at dan tandai 'kedaluwarsa'"""
+    from app.models.report_job import ReportJob
+
+    jumlah = 0
+    for job in ReportJob.query.filter(
+        ReportJob.status == 'selesai',
+        ReportJob.expires_at <= datetime.utcnow()
+    ).all():
+        if job.path_file and os.path.exists(job.path_file):
+            os.remove(job.path_file)
+        job.status = 'kedaluwarsa'
+        job.path_file = None
+        jumlah += 1
+
+    db.session.commit()
+    return jumlah
+
+
+def _init_proses():
+    """Initializer proses anak: siapkan app context dan koneksi DB sendiri"""
+    global _app
+    if _app is None:
+        # Start method 'spawn': modul diimpor ulang, buat app baru
+        from app import create_app
+        _app = create_app()
+    _app.app_context().push()
+    # Jangan pakai ulang koneksi milik proses induk (start method 'fork')
+    db.engine.dispose(close=False)
+
+
+def _jalankan_di_proses(job_id):
+    try:
+        kerjakan_job(job_id, _app)
+    finally:
+        db.session.remove()
+
+
+def _konteks_proses():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context('spawn')
+
+
+def jalankan_worker(jumlah_proses=2, interval=2.0, sekali=False, log=print):
+    """Loop worker: klaim job antri, kerjakan paralel, bersihkan file kedaluwarsa.
+
+    Dengan `sekali=True` worker berhenti setelah antrean kosong dan semua job
+    yang sedang berjalan selesai (berguna untuk cron).
+    """
+    from app.models.report_job import ReportJob
+
+    global _app
+    _app = current_app._get_current_object()
+
+    ReportJob.tandai_macet(BATAS_MACET_MENIT)
+    terakhir_bersihkan = 0
+    berjalan = {}
+
+    # Koneksi milik induk tidak boleh ikut ter-fork ke proses anak
+    db.session.remove()
+    db.engine.dispose()
+
+    with ProcessPoolExecutor(
+        max_workers=jumlah_proses,
+        mp_context=_konteks_proses(),
+        initializer=_init_proses
+    ) as pool:
+        while True:
+            if time.monotonic() - terakhir_bersihkan > INTERVAL_BERSIHKAN:
+                dihapus = bersihkan_kedaluwarsa()
+                if dihapus:
+                    log(f'[INFO] {dihapus} file export kedaluwarsa dihapus.')
+                terakhir_bersihkan = time.monotonic()
+
+            while len(berjalan) < jumlah_proses:
+                job_id = ReportJob.klaim_berikutnya()
+                if job_id is None:
+                    break
+                log(f'[INFO] Mengerjakan report job {job_id}.')
+                berjalan[pool.submit(_jalankan_di_proses, job_id)] = job_id
+
+            if not berjalan:
+                if sekali:
+                    break
+                time.sleep(interval)
+                continue
+
+            selesai, _ = wait(berjalan, timeout=interval, return_when=FIRST_COMPLETED)
+            for future in selesai:
+                job_id = berjalan.pop(future)
+                exc = future.exception()
+                if exc is None:
+                    log(f'[OK] Report job {job_id} selesai diproses.')
+                    continue
+
+                # Proses anak mati sebelum sempat mencatat status job
+                log(f'[ERROR] Report job {job_id} berhenti: {exc}')
+                ReportJob.query.filter_by(id=job_id, status='proses').update(
+                    {'status': 'gagal', 'pesan_error': str(exc)[:1000], 'finished_at': datetime.utcnow()},
+                    synchronize_session=False
+                )
+                db.session.commit()
+            db.session.remove()
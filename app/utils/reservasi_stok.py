@@ -0,0 +1,100 @@
+"""Pengambilan stok yang aman dari transaksi bersamaan.
+
+Pemeriksaan stok dan insert barang keluar harus berada dalam satu transaksi
+database yang memegang kunci baris stok_saldo barang bersangkutan
+(SELECT ... FOR UPDATE). Permintaan lain untuk barang yang sama menunggu
+sampai commit/rollback lalu membaca saldo terbaru, sehingga dua permintaan
+bersamaan tidak bisa sama-sama lolos dari stok yang sama. Barang berbeda
+memakai baris berbeda dan tidak saling menunggu: semua tulisan di transaksi
+pengambilan dibatasi kode_barang, dan versi_data baru dinaikkan setelah commit.
+
+Kunci dilepas oleh commit/rollback pemanggil. Baris selalu dikunci dengan
+urutan kode_barang agar dua transaksi berisi beberapa barang tidak deadlock.
+SQLite tidak punya kunci baris (FOR UPDATE diabaikan); penulis di SQLite
+sudah diserialkan per database.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.barang import Barang
+from app.models.stok_saldo import StokSaldo, buat_saldo_belum_ada
+
+
+class StokTidakCukup(ValueError):
+    """Stok satu atau beberapa barang kurang dari jumlah yang diambil"""
+
+    def __init__(self, kekurangan):
+        # {kode_barang: (stok tersedia, jumlah diminta)}; stok None = barang tidak ada
+        self.kekurangan = kekurangan
+        super().__init__('; '.join(self.pesan(kode) for kode in kekurangan))
+
+    def pesan(self, kode_barang):
+        tersedia, diminta = self.kekurangan[kode_barang]
+        if tersedia is None:
+            return f'Barang {kode_barang} tidak ditemukan.'
+        return f'Stok {kode_barang} tidak cukup! Stok tersedia: {tersedia}, diminta: {diminta}'
+
+
+def _kunci_saldo(kode_list):
+    return db.session.execute(
+        select(StokSaldo.kode_barang, StokSaldo.total_masuk, StokSaldo.total_keluar)
+        .where(StokSaldo.kode_barang.in_(kode_list))
+        .order_by(StokSaldo.kode_barang)
+        .with_for_update()
+    ).all()
+
+
+def kunci_stok(kode_list):
+    """Kunci baris saldo barang sampai akhir transaksi. Return {kode_barang: stok akhir}.
+
+    Barang yang tidak ada tidak muncul di hasil.
+    """
+    kode_list = sorted({kode for kode in kode_list if kode})
+    if not kode_list:
+        return {}
+
+    baris = _kunci_saldo(kode_list)
+    if len(baris) < len(kode_list):
+        # Data lama tanpa baris saldo: buat dulu agar ada yang bisa dikunci.
+        # Jika transaksi lain membuatnya bersamaan, cukup pakai baris miliknya.
+        try:
+            with db.session.begin_nested():
+                buat_saldo_belum_ada(db.session.connection(), kode_list)
+        except IntegrityError:
+            pass
+        baris = _kunci_saldo(kode_list)
+
+    stok_awal = dict(db.session.execute(
+        select(Barang.kode_barang, Barang.stok_awal).where(Barang.kode_barang.in_(kode_list))
+    ).all())
+    return {
+        kode: (stok_awal[kode] or 0) + total_masuk - total_keluar
+        for kode, total_masuk, total_keluar in baris
+        if kode in stok_awal
+    }
+
+
+def ambil_stok(kebutuhan, dikembalikan=None):
+    """Kunci dan periksa stok untuk {kode_barang: qty} sebelum barang keluar disimpan.
+
+    `dikembalikan` ({kode_barang: qty}) ditambahkan ke stok tersedia, mis. qty
+    lama saat transaksi keluar diedit. Melempar StokTidakCukup jika ada barang
+    yang kurang; jika lolos, pemanggil menyimpan transaksinya lalu commit
+    dalam transaksi yang sama. Return {kode_barang: stok akhir sebelum diambil}.
+    """
+    dikembalikan = dikembalikan or {}
+    stok = kunci_stok(list(kebutuhan) + list(dikembalikan))
+
+    kekurangan = {}
+    for kode, qty in kebutuhan.items():
+        if kode not in stok:
+            kekurangan[kode] = (None, qty)
+            continue
+        tersedia = stok[kode] + dikembalikan.get(kode, 0)
+        if qty > tersedia:
+            kekurangan[kode] = (tersedia, qty)
+    if kekurangan:
+        raise StokTidakCukup(kekurangan)
+    return stok
@@ -0,0 +1,89 @@
+"""Angka statistik dashboard dan halaman monitor.
+
+Jumlah per status diambil dengan satu GROUP BY status per tabel, dan angka
+utama dashboard dengan satu SELECT berisi beberapa subquery COUNT. Hasilnya
+di-cache di memori proses selama STATISTIK_CACHE_DETIK. Kunci cache memuat
+versi tabel sumbernya di versi_data, jadi commit dari proses mana pun langsung
+membuat entri lama tidak terpakai.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app import db
+from app.models.aset_tetap import AsetTetap
+from app.models.barang import Barang, BarangKeluar, BarangMasuk
+from app.models.laporan_kerusakan import LaporanKerusakan
+from app.models.permintaan_barang import PermintaanBarang
+from app.models.versi_data import VersiData
+
+# {(kunci, versi tabel): (waktu kedaluwarsa, nilai)}
+_cache = {}
+_kunci_cache = threading.Lock()
+
+TABEL_DASHBOARD = frozenset({
+    'barang', 'barang_masuk', 'barang_keluar', 'aset_tetap', 'laporan_kerusakan', 'permintaan_barang'
+})
+
+
+def _dari_cache(kunci, tabel, hitung):
+    ttl = current_app.config.get('STATISTIK_CACHE_DETIK', 0)
+    if ttl <= 0:
+        return hitung()
+
+    versi = VersiData.ambil(tabel)
+    kunci = (kunci, tuple(sorted(versi.items())))
+    sekarang = time.monotonic()
+    with _kunci_cache:
+        entri = _cache.get(kunci)
+    if entri is not None and entri[0] > sekarang:
+        return entri[1]
+
+    nilai = hitung()
+    with _kunci_cache:
+        # Entri versi lama tidak pernah dibaca lagi; buang yang sudah kedaluwarsa
+        for kunci_lama in [k for k, (kedaluwarsa, _) in _cache.items() if kedaluwarsa <= sekarang]:
+            del _cache[kunci_lama]
+        _cache[kunci] = (sekarang + ttl, nilai)
+    return nilai
+
+
+def jumlah_per_status(model):
+    """{status: jumlah, ..., 'total': jumlah semua} untuk model yang punya kolom status"""
+    def hitung():
+        baris = db.session.execute(
+            select(model.status, func.count()).group_by(model.status)
+        ).all()
+        hasil = {status: jumlah for status, jumlah in baris}
+        hasil['total'] = sum(hasil.values())
+        return hasil
+
+    nama_tabel = model.__tablename__
+    return dict(_dari_cache(('status', nama_tabel), [nama_tabel], hitung))
+
+
+def statistik_dashboard():
+    """Angka utama dashboard dalam satu query"""
+    def hitung():
+        seminggu_lalu = datetime.utcnow() - timedelta(days=7)
+
+        def jumlah(model, *syarat):
+            return select(func.count()).select_from(model).where(*syarat).scalar_subquery()
+
+        baris = db.session.execute(select(
+            jumlah(Barang).label('total_barang'),
+            jumlah(BarangMasuk).label('total_transaksi_masuk'),
+            jumlah(BarangKeluar).label('total_transaksi_keluar'),
+            jumlah(AsetTetap).label('total_aset'),
+            jumlah(LaporanKerusakan, LaporanKerusakan.status == 'terkirim').label('laporan_pending'),
+            jumlah(LaporanKerusakan, LaporanKerusakan.created_at >= seminggu_lalu).label('laporan_minggu_ini'),
+            jumlah(PermintaanBarang, PermintaanBarang.status == 'terkirim').label('permintaan_pending'),
+        )).one()
+        return dict(baris._mapping)
+
+    return dict(_dari_cache(('dashboard',), TABEL_DASHBOARD, hitung))
+
@@ -0,0 +1,145 @@
+"""Cetak massal surat laporan kerusakan (satu PDF gabungan atau ZIP per surat).
+
+Data surat diambil dari database di proses induk lalu disalin ke objek biasa,
+sehingga proses anak hanya merender PDF tanpa membuka koneksi database.
+Style dan logo kop (lihat siapkan_aset_pdf di pdf_export) disiapkan sekali
+per proses oleh initializer pool dan dipakai ulang untuk semua surat.
+
+Pool memakai start method 'spawn' karena dibuat di dalam request web: proses
+anak mulai bersih dan tidak ikut menyalin thread, soket pool database atau
+kunci (mis. kunci cache logo) milik worker web seperti pada 'fork'.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+from flask import current_app
+
+from app.utils.pdf_export import (
+    export_laporan_kerusakan_batch_to_pdf,
+    export_laporan_kerusakan_to_pdf,
+    siapkan_aset_pdf
+)
+
+# Jumlah proses render maksimal untuk ZIP
+JUMLAH_PROSES_MAKS = 4
+
+# Di bawah jumlah ini surat dirender langsung tanpa pool: satu surat hanya butuh
+# beberapa milidetik, sedangkan proses 'spawn' butuh sekitar satu detik untuk start
+MIN_SURAT_PARALEL = 100
+
+# Jumlah surat per tugas yang dikirim ke proses anak
+SURAT_PER_TUGAS = 10
+
+
+def path_logo_unhas():
+    """Path logo kop surat: UNHAS_LOGO_PATH, lalu beberapa nama file cadangan di static/images"""
+    configured_path = current_app.config.get('UNHAS_LOGO_PATH')
+    candidates = []
+
+    if configured_path:
+        if os.path.isabs(configured_path):
+            candidates.append(configured_path)
+        else:
+            candidates.append(os.path.join(current_app.root_path, configured_path))
+
+    images_dir = os.path.join(current_app.root_path, 'static', 'images')
+    candidates.extend([
+        os.path.join(images_dir, 'logo_unhas.png'),
+        os.path.join(images_dir, 'logo_unhas.jpg'),
+        os.path.join(images_dir, 'logo_unhas.jpeg'),
+        os.path.join(images_dir, 'logo_institusi.png'),
+        os.path.join(images_dir, 'logo_institusi.jpg'),
+        os.path.join(images_dir, 'logo_institusi.jpeg'),
+    ])
+
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+
+    current_app.logger.warning(
+        'Logo UNHAS tidak ditemukan. PDF dicetak tanpa logo. '
+        'Atur UNHAS_LOGO_PATH atau simpan file di app/static/images/logo_unhas.png'
+    )
+    return None
+
+
+def data_surat(laporan):
+    """Salinan field LaporanKerusakan yang dipakai surat (bisa di-pickle ke proses anak)"""
+    aset = laporan.aset_tetap
+    pelapor = laporan.pelapor
+    return SimpleNamespace(
+        id=laporan.id,
+        aset_tetap=SimpleNamespace(kode_aset=aset.kode_aset, nama_aset=aset.nama_aset),
+        pelapor=SimpleNamespace(nama_lengkap=pelapor.nama_lengkap) if pelapor else None,
+        nama_pengguna=laporan.nama_pengguna,
+        jumlah=laporan.jumlah,
+        lokasi=laporan.lokasi,
+        tanggal_diketahui_rusak=laporan.tanggal_diketahui_rusak,
+        jenis_kerusakan=laporan.jenis_kerusakan,
+        penyebab=laporan.penyebab,
+        tindakan=laporan.tindakan,
+        kondisi_saat_ini=laporan.kondisi_saat_ini,
+        dampak=laporan.dampak,
+        created_at=laporan.created_at
+    )
+
+
+def nama_file_surat(laporan):
+    return f'Surat_Laporan_Kerusakan_{laporan.aset_tetap.kode_aset}_{laporan.id}.pdf'
+
+
+def _siapkan_aset(logo_path):
+    """Initializer proses anak: muat style dan logo sekali per proses"""
+    siapkan_aset_pdf(logo_path)
+
+
+def _render_tugas(surat_list, logo_path):
+    return [
+        (nama_file_surat(surat), export_laporan_kerusakan_to_pdf(surat, logo_path=logo_path).getvalue())
+        for surat in surat_list
+    ]
+
+
+def _render_semua(surat_list, logo_path, jumlah_proses):
+    """Iterator (nama_file, bytes PDF) sesuai urutan surat_list"""
+    _siapkan_aset(logo_path)
+    if jumlah_proses <= 1 or len(surat_list) < MIN_SURAT_PARALEL:
+        yield from _render_tugas(surat_list, logo_path)
+        return
+
+    tugas = [surat_list[i:i + SURAT_PER_TUGAS] for i in range(0, len(surat_list), SURAT_PER_TUGAS)]
+    with ProcessPoolExecutor(
+        max_workers=min(jumlah_proses, len(tugas)),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_siapkan_aset,
+        initargs=(logo_path,)
+    ) as pool:
+        for hasil in pool.map(_render_tugas, tugas, [logo_path] * len(tugas)):
+            yield from hasil
+
+
+def cetak_gabungan(laporan_list, logo_path=None):
+    """Satu PDF berisi semua surat (BytesIO); logo hanya tersimpan sekali di file"""
+    return export_laporan_kerusakan_batch_to_pdf(
+        [data_surat(laporan) for laporan in laporan_list], logo_path=logo_path
+    )
+
+
+def cetak_zip(laporan_list, logo_path=None, jumlah_proses=None):
+    """ZIP berisi satu PDF per surat (file sementara), dirender paralel di pool proses"""
+    if jumlah_proses is None:
+        jumlah_proses = min(JUMLAH_PROSES_MAKS, os.cpu_count() or 1)
+
+    surat_list = [data_surat(laporan) for laporan in laporan_list]
+    hasil = tempfile.TemporaryFile()
+    # PDF sudah terkompresi, jadi cukup disimpan tanpa kompresi ulang
+    with zipfile.ZipFile(hasil, 'w', compression=zipfile.ZIP_STORED) as arsip:
+        for nama_file, isi in _render_semua(surat_list, logo_path, jumlah_proses):
+            arsip.writestr(nama_file, isi)
+    hasil.seek(0)
+    return hasil
@@ -0,0 +1,193 @@
+"""Input banyak transaksi barang masuk/keluar sekaligus.
+
+Semua baris divalidasi dulu (kode barang dan stok diperiksa dengan satu query
+untuk seluruh batch), lalu disimpan dengan satu INSERT massal, satu UPDATE
+stok_saldo, koreksi checkpoint stok_snapshot untuk baris bertanggal mundur,
+satu catatan log aktivitas dan satu commit. Jika ada satu baris
+yang salah, tidak ada baris yang disimpan. Stok barang keluar diperiksa ulang
+saat menyimpan dengan baris saldo terkunci (lihat reservasi_stok).
+"""
+
+from collections import OrderedDict
+from datetime import date
+
+from sqlalchemy import insert
+
+from app import db
+from app.models.barang import Barang, BarangKeluar, BarangMasuk
+from app.models.stok_saldo import tambah_saldo_bulk
+from app.models.stok_snapshot import geser_snapshot_bulk
+from app.models.user import UserLog
+from app.models.versi_data import catat_versi_berubah
+from app.utils.reservasi_stok import StokTidakCukup, ambil_stok
+
+# Jumlah baris maksimum per batch
+BATAS_BARIS_BATCH = 500
+
+# jenis: (model, kolom stok_saldo, tanda qty, nama aktivitas)
+JENIS_TRANSAKSI = {
+    'masuk': (BarangMasuk, 'total_masuk', '+', 'Barang Masuk'),
+    'keluar': (BarangKeluar, 'total_keluar', '-', 'Barang Keluar'),
+}
+
+
+def _bersihkan_baris(baris, tanggal_bawaan):
+    """(baris bersih, None) atau (None, pesan kesalahan) untuk satu baris input"""
+    if not isinstance(baris, dict):
+        return None, 'Format baris tidak valid.'
+
+    kode_barang = baris.get('kode_barang')
+    if not isinstance(kode_barang, str) or not kode_barang.strip():
+        return None, 'Barang wajib diisi.'
+
+    qty = baris.get('qty')
+    if isinstance(qty, str) and qty.strip().isdigit():
+        qty = int(qty)
+    if not isinstance(qty, int) or isinstance(qty, bool) or qty < 1:
+        return None, 'Jumlah minimal 1.'
+
+    tanggal = baris.get('tanggal') or tanggal_bawaan or date.today()
+    if isinstance(tanggal, str):
+        try:
+            tanggal = date.fromisoformat(tanggal)
+        except ValueError:
+            return None, 'Tanggal harus berformat YYYY-MM-DD.'
+    if not isinstance(tanggal, date):
+        return None, 'Tanggal tidak valid.'
+
+    keterangan = baris.get('keterangan')
+    if keterangan is not None and not isinstance(keterangan, str):
+        return None, 'Keterangan harus berupa teks.'
+
+    return {
+        'tanggal': tanggal,
+        'kode_barang': kode_barang.strip(),
+        'qty': qty,
+        'keterangan': keterangan or None,
+    }, None
+
+
+def _total_per_kode(baris_list):
+    """{kode_barang: total qty} dengan urutan kemunculan pertama"""
+    total = OrderedDict()
+    for baris in baris_list:
+        total[baris['kode_barang']] = total.get(baris['kode_barang'], 0) + baris['qty']
+    return total
+
+
+def siapkan_batch(jenis, baris_list, tanggal_bawaan=None):
+    """Validasi seluruh baris batch.
+
+    Return (baris_bersih, galat) dengan galat berupa list
+    {'baris': nomor baris (mulai 1), 'pesan': ...}. Batch hanya boleh disimpan
+    jika galat kosong.
+    """
+    if not baris_list:
+        return [], [{'baris': 0, 'pesan': 'Isi minimal satu baris transaksi.'}]
+    if len(baris_list) > BATAS_BARIS_BATCH:
+        return [], [{'baris': 0, 'pesan': f'Maksimal {BATAS_BARIS_BATCH} baris per batch.'}]
+
+    bersih, galat = periksa_baris(jenis, baris_list, tanggal_bawaan)
+    return [baris for _, baris in bersih], galat
+
+
+def periksa_baris(jenis, baris_list, tanggal_bawaan=None):
+    """Validasi baris tanpa batas jumlah.
+
+    Return ([(nomor, baris_bersih), ...], galat); baris yang nomornya ada di
+    galat tidak boleh disimpan.
+    """
+    bersih = []
+    galat = []
+    for nomor, baris in enumerate(baris_list, 1):
+        hasil, pesan = _bersihkan_baris(baris, tanggal_bawaan)
+        if pesan:
+            galat.append({'baris': nomor, 'pesan': pesan})
+        else:
+            bersih.append((nomor, hasil))
+
+    total_per_kode = _total_per_kode(baris for _, baris in bersih)
+
+    if total_per_kode:
+        if jenis == 'keluar':
+            # Keberadaan barang sekaligus stoknya dari satu query
+            stok_map = Barang.stok_akhir_bulk(list(total_per_kode))
+        else:
+            stok_map = dict.fromkeys(
+                db.session.scalars(
+                    db.select(Barang.kode_barang).where(Barang.kode_barang.in_(list(total_per_kode)))
+                )
+            )
+
+        for nomor, baris in bersih:
+            kode_barang = baris['kode_barang']
+            if kode_barang not in stok_map:
+                galat.append({'baris': nomor, 'pesan': f'Barang {kode_barang} tidak ditemukan.'})
+            elif jenis == 'keluar' and total_per_kode[kode_barang] > stok_map[kode_barang]:
+                galat.append({
+                    'baris': nomor,
+                    'pesan': (
+                        f'Stok {kode_barang} tidak cukup! Stok tersedia: {stok_map[kode_barang]}, '
+                        f'diminta: {total_per_kode[kode_barang]}'
+                    )
+                })
+
+    galat.sort(key=lambda g: g['baris'])
+    return bersih, galat
+
+
+def galat_stok(baris_list, exc):
+    """Galat per baris (format siapkan_batch) untuk StokTidakCukup dari simpan_batch"""
+    return [
+        {'baris': nomor, 'pesan': exc.pesan(baris['kode_barang'])}
+        for nomor, baris in enumerate(baris_list, 1)
+        if baris['kode_barang'] in exc.kekurangan
+    ]
+
+
+def simpan_batch(jenis, baris_list, user_id=None, ip_address=None):
+    """Simpan baris hasil siapkan_batch dalam satu transaksi. Return jumlah baris tersimpan.
+
+    Tanpa user_id (mis. impor lewat CLI) log aktivitas tidak dicatat. Untuk
+    barang keluar, melempar StokTidakCukup tanpa menyimpan apa pun jika stok
+    sudah berkurang oleh transaksi lain sejak diperiksa.
+    """
+    model, kolom_saldo, tanda, aktivitas = JENIS_TRANSAKSI[jenis]
+    if not baris_list:
+        return 0
+
+    total_per_kode = _total_per_kode(baris_list)
+    if jenis == 'keluar':
+        try:
+            ambil_stok(total_per_kode)
+        except StokTidakCukup:
+            db.session.rollback()
+            raise
+
+    db.session.execute(insert(model), baris_list)
+
+    # Insert massal tidak memicu event per objek: saldo, checkpoint dan versi
+    # data (cache laporan/statistik/prediksi) diperbarui di sini untuk seluruh batch.
+    connection = db.session.connection()
+    tambah_saldo_bulk(connection, kolom_saldo, total_per_kode)
+    total_per_tanggal = {}
+    for baris in baris_list:
+        kunci = (baris['kode_barang'], baris['tanggal'])
+        total_per_tanggal[kunci] = total_per_tanggal.get(kunci, 0) + baris['qty']
+    geser_snapshot_bulk(connection, kolom_saldo, total_per_tanggal)
+    tabel_berubah = [model.__tablename__, 'stok_saldo']
+    catat_versi_berubah(db.session, tabel_berubah)
+
+    if user_id is not None:
+        rincian = ', '.join(f'{kode} ({tanda}{qty})' for kode, qty in total_per_kode.items())
+        db.session.add(UserLog(
+            user_id=user_id,
+            activity=f'{aktivitas} (Banyak)',
+            description=(
+                f'{aktivitas.capitalize()}: {len(baris_list)} baris, {len(total_per_kode)} barang, '
+                f'total {tanda}{sum(total_per_kode.values())}: {rincian}'
+            ),
+            ip_address=ip_address
+        ))
+    db.session.commit()
+    return len(baris_list)
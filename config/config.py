@@ -22,4 +22,23 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = True  # Set False di production
     
+    # Report job (export laporan di latar belakang)
+    LAPORAN_JOB_DIR = os.environ.get('LAPORAN_JOB_DIR')  # default: instance/laporan_job
+    LAPORAN_JOB_MASA_BERLAKU_JAM = int(os.environ.get('LAPORAN_JOB_MASA_BERLAKU_JAM') or 24)
+    
+    # Cache file export laporan (0 = cache dimatikan)
+    LAPORAN_CACHE_DIR = os.environ.get('LAPORAN_CACHE_DIR')  # default: instance/laporan_cache
+    LAPORAN_CACHE_MAKS_MB = int(os.environ.get('LAPORAN_CACHE_MAKS_MB') or 500)
+    
+    # Cache angka statistik dashboard/monitor dalam detik (0 = cache dimatikan)
+    STATISTIK_CACHE_DETIK = int(os.environ.get('STATISTIK_CACHE_DETIK') or 30)
+    
+    # Cache pilihan kategori/merk: 'memori' (per proses) atau 'redis' (butuh paket redis)
+    CACHE_DATA_BACKEND = os.environ.get('CACHE_DATA_BACKEND') or 'memori'
+    CACHE_DATA_REDIS_URL = os.environ.get('CACHE_DATA_REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_DATA_DETIK = int(os.environ.get('CACHE_DATA_DETIK') or 300)
+    
+    # Jumlah baris per INSERT/commit saat impor file XLSX/CSV
+    IMPOR_UKURAN_CHUNK = int(os.environ.get('IMPOR_UKURAN_CHUNK') or 1000)
+    
     # Note: Email settings removed (feature disabled)
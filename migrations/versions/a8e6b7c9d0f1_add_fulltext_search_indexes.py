@@ -0,0 +1,64 @@
+"""Add fulltext search indexes
+
+Revision ID: a8e6b7c9d0f1
+Revises: f7d5a6b8c9e0
+Create Date: 2026-10-18 15:00:00.000000
+
+MySQL: indeks FULLTEXT. SQLite: tabel FTS5 external content + trigger
+(lihat app/models/pencarian.py). Dialek lain tidak diubah.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e6b7c9d0f1'
+down_revision = 'f7d5a6b8c9e0'
+branch_labels = None
+depends_on = None
+
+
+KOLOM_TEKS = {
+    'barang': ['kode_barang', 'nama_barang', 'spesifikasi'],
+    'aset_tetap': ['kode_aset', 'nama_aset', 'spesifikasi', 'kontrak_spk', 'nomor_kontrak'],
+    'kontrak_barang': ['nomor_kontrak', 'deskripsi'],
+    'merk_barang': ['nama_merk', 'tipe', 'spesifikasi', 'nomor_kontrak'],
+    'kategori_barang': ['nama_kategori', 'deskripsi'],
+}
+
+
+def _ddl_fts5(tabel, kolom):
+    fts = f'{tabel}_fts'
+    daftar = ', '.join(kolom)
+    baru = ', '.join(f'new.{k}' for k in kolom)
+    lama = ', '.join(f'old.{k}' for k in kolom)
+    hapus = f"INSERT INTO {fts}({fts}, rowid, {daftar}) VALUES ('delete', old.id, {lama});"
+    tambah = f'INSERT INTO {fts}(rowid, {daftar}) VALUES (new.id, {baru});'
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({daftar}, content='{tabel}', content_rowid='id')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabel} BEGIN {tambah} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabel} BEGIN {hapus} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {tabel} BEGIN {hapus} {tambah} END',
+        # Isi indeks dari data yang sudah ada
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    dialek = op.get_bind().dialect.name
+    for tabel, kolom in KOLOM_TEKS.items():
+        if dialek == 'mysql':
+            op.create_index(f'ft_{tabel}', tabel, kolom, unique=False, mysql_prefix='FULLTEXT')
+        elif dialek == 'sqlite':
+            for perintah in _ddl_fts5(tabel, kolom):
+                op.execute(perintah)
+
+
+def downgrade():
+    dialek = op.get_bind().dialect.name
+    for tabel in KOLOM_TEKS:
+        if dialek == 'mysql':
+            op.drop_index(f'ft_{tabel}', table_name=tabel)
+        elif dialek == 'sqlite':
+            for akhiran in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {tabel}_fts_{akhiran}')
+            op.execute(f'DROP TABLE IF EXISTS {tabel}_fts')
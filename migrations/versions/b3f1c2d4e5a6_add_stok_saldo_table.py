@@ -0,0 +1,51 @@
+"""Add stok_saldo table
+
+Revision ID: b3f1c2d4e5a6
+Revises: ed6a2c2bbc66
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f1c2d4e5a6'
+down_revision = 'ed6a2c2bbc66'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stok_saldo',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kode_barang', sa.String(length=50), nullable=False),
+    sa.Column('total_masuk', sa.Integer(), nullable=False),
+    sa.Column('total_keluar', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['kode_barang'], ['barang.kode_barang'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stok_saldo', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stok_saldo_kode_barang'), ['kode_barang'], unique=True)
+
+    # Isi saldo awal dari agregat transaksi yang sudah ada
+    op.execute("""
+        INSERT INTO stok_saldo (kode_barang, total_masuk, total_keluar, updated_at)
+        SELECT b.kode_barang,
+               COALESCE(m.total, 0),
+               COALESCE(k.total, 0),
+               CURRENT_TIMESTAMP
+        FROM barang b
+        LEFT JOIN (SELECT kode_barang, SUM(qty) AS total FROM barang_masuk GROUP BY kode_barang) m
+            ON m.kode_barang = b.kode_barang
+        LEFT JOIN (SELECT kode_barang, SUM(qty) AS total FROM barang_keluar GROUP BY kode_barang) k
+            ON k.kode_barang = b.kode_barang
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('stok_saldo', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stok_saldo_kode_barang'))
+
+    op.drop_table('stok_saldo')
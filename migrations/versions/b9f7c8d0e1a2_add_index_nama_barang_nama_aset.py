@@ -0,0 +1,32 @@
+"""Add index on barang.nama_barang and aset_tetap.nama_aset
+
+Revision ID: b9f7c8d0e1a2
+Revises: a8e6b7c9d0f1
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9f7c8d0e1a2'
+down_revision = 'a8e6b7c9d0f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('barang', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_barang_nama_barang'), ['nama_barang'], unique=False)
+
+    with op.batch_alter_table('aset_tetap', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_aset_tetap_nama_aset'), ['nama_aset'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('aset_tetap', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_aset_tetap_nama_aset'))
+
+    with op.batch_alter_table('barang', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_barang_nama_barang'))
@@ -0,0 +1,48 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: c0a8d9e1f2b3
+Revises: b9f7c8d0e1a2
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c0a8d9e1f2b3'
+down_revision = 'b9f7c8d0e1a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('barang_masuk', schema=None) as batch_op:
+        batch_op.create_index('ix_barang_masuk_tanggal_created_at_id', ['tanggal', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('barang_keluar', schema=None) as batch_op:
+        batch_op.create_index('ix_barang_keluar_tanggal_created_at_id', ['tanggal', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('laporan_kerusakan', schema=None) as batch_op:
+        batch_op.create_index('ix_laporan_kerusakan_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_laporan_kerusakan_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('permintaan_barang', schema=None) as batch_op:
+        batch_op.create_index('ix_permintaan_barang_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_permintaan_barang_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('permintaan_barang', schema=None) as batch_op:
+        batch_op.drop_index('ix_permintaan_barang_status_created_at_id')
+        batch_op.drop_index('ix_permintaan_barang_created_at_id')
+
+    with op.batch_alter_table('laporan_kerusakan', schema=None) as batch_op:
+        batch_op.drop_index('ix_laporan_kerusakan_status_created_at_id')
+        batch_op.drop_index('ix_laporan_kerusakan_created_at_id')
+
+    with op.batch_alter_table('barang_keluar', schema=None) as batch_op:
+        batch_op.drop_index('ix_barang_keluar_tanggal_created_at_id')
+
+    with op.batch_alter_table('barang_masuk', schema=None) as batch_op:
+        batch_op.drop_index('ix_barang_masuk_tanggal_created_at_id')
@@ -0,0 +1,26 @@
+"""Add index on barang.jenis_barang
+
+Revision ID: c4a2d3e5f6b7
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a2d3e5f6b7'
+down_revision = 'b3f1c2d4e5a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('barang', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_barang_jenis_barang'), ['jenis_barang'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('barang', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_barang_jenis_barang'))
@@ -0,0 +1,38 @@
+"""Backfill created_at and make it NOT NULL on keyset-paginated tables
+
+Revision ID: d1b9e0f2a3c4
+Revises: c0a8d9e1f2b3
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1b9e0f2a3c4'
+down_revision = 'c0a8d9e1f2b3'
+branch_labels = None
+depends_on = None
+
+# created_at adalah bagian kunci paginasi keyset; baris lama tanpa created_at
+# diisi dari tanggal transaksinya agar tidak hilang dari halaman berikutnya.
+ISI_CREATED_AT = {
+    'barang_masuk': 'tanggal',
+    'barang_keluar': 'tanggal',
+    'laporan_kerusakan': 'COALESCE(updated_at, tanggal_diketahui_rusak)',
+    'permintaan_barang': 'tanggal',
+}
+
+
+def upgrade():
+    for tabel, nilai in ISI_CREATED_AT.items():
+        op.execute(f'UPDATE {tabel} SET created_at = {nilai} WHERE created_at IS NULL')
+        with op.batch_alter_table(tabel, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for tabel in reversed(list(ISI_CREATED_AT)):
+        with op.batch_alter_table(tabel, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,41 @@
+"""Add stok_snapshot table
+
+Revision ID: d5b3e4f6a7c8
+Revises: c4a2d3e5f6b7
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5b3e4f6a7c8'
+down_revision = 'c4a2d3e5f6b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stok_snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kode_barang', sa.String(length=50), nullable=False),
+    sa.Column('periode', sa.Date(), nullable=False, comment='Tanggal 1 bulan checkpoint'),
+    sa.Column('total_masuk', sa.Integer(), nullable=False),
+    sa.Column('total_keluar', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['kode_barang'], ['barang.kode_barang'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kode_barang', 'periode', name='uq_stok_snapshot_kode_periode')
+    )
+    with op.batch_alter_table('stok_snapshot', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stok_snapshot_kode_barang'), ['kode_barang'], unique=False)
+        batch_op.create_index(batch_op.f('ix_stok_snapshot_periode'), ['periode'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stok_snapshot', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stok_snapshot_periode'))
+        batch_op.drop_index(batch_op.f('ix_stok_snapshot_kode_barang'))
+
+    op.drop_table('stok_snapshot')
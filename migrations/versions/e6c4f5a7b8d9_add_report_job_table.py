@@ -0,0 +1,50 @@
+"""Add report_job table
+
+Revision ID: e6c4f5a7b8d9
+Revises: d5b3e4f6a7c8
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c4f5a7b8d9'
+down_revision = 'd5b3e4f6a7c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('report_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('jenis', sa.String(length=50), nullable=False, comment='Jenis laporan, mis. barang, aset_tetap'),
+    sa.Column('format_file', sa.String(length=10), nullable=False, comment='excel atau pdf'),
+    sa.Column('parameter', sa.Text(), nullable=True, comment='Query string filter laporan'),
+    sa.Column('status', sa.Enum('antri', 'proses', 'selesai', 'gagal', 'kedaluwarsa', name='report_job_status'), nullable=False),
+    sa.Column('pesan_error', sa.Text(), nullable=True),
+    sa.Column('nama_file', sa.String(length=255), nullable=True),
+    sa.Column('path_file', sa.String(length=500), nullable=True),
+    sa.Column('ukuran_file', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('report_job', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_report_job_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_report_job_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_report_job_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('report_job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_report_job_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_report_job_user_id'))
+        batch_op.drop_index(batch_op.f('ix_report_job_status'))
+
+    op.drop_table('report_job')
@@ -0,0 +1,29 @@
+"""Add versi_data table
+
+Revision ID: f7d5a6b8c9e0
+Revises: e6c4f5a7b8d9
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7d5a6b8c9e0'
+down_revision = 'e6c4f5a7b8d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('versi_data',
+    sa.Column('nama_tabel', sa.String(length=64), nullable=False),
+    sa.Column('versi', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('nama_tabel')
+    )
+
+
+def downgrade():
+    op.drop_table('versi_data')
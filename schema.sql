@@ -110,7 +110,7 @@ CREATE TABLE barang_masuk (
     barang_id INT NOT NULL,
     qty INT NOT NULL,
     keterangan TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (barang_id) REFERENCES barang(id) ON DELETE CASCADE,
     INDEX idx_tanggal (tanggal),
@@ -124,7 +124,7 @@ CREATE TABLE barang_keluar (
     barang_id INT NOT NULL,
     qty INT NOT NULL,
     keterangan TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (barang_id) REFERENCES barang(id) ON DELETE CASCADE,
     INDEX idx_tanggal (tanggal),
@@ -177,7 +177,7 @@ CREATE TABLE laporan_kerusakan (
     kondisi_saat_ini TEXT,
     dampak TEXT,
     status ENUM('draft', 'terkirim', 'selesai') NOT NULL DEFAULT 'draft',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (aset_tetap_id) REFERENCES aset_tetap(id) ON DELETE CASCADE,
     FOREIGN KEY (pelapor_id) REFERENCES users(id) ON DELETE SET NULL,
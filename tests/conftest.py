@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import create_app, db
+from config.config import Config
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ECHO = False
+    WTF_CSRF_ENABLED = False
+    TESTING = True
+    STATISTIK_CACHE_DETIK = 0
+    CACHE_DATA_DETIK = 0
+
+
+@pytest.fixture
+def app(tmp_path):
+    class Konfigurasi(TestConfig):
+        LAPORAN_JOB_DIR = str(tmp_path / 'laporan_job')
+        LAPORAN_CACHE_DIR = str(tmp_path / 'laporan_cache')
+
+    app = create_app(Konfigurasi)
+    app.instance_path = str(tmp_path / 'instance')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+    from app.utils.prediksi_stok import clear_cache
+    clear_cache()
+
+
+@pytest.fixture
+def data(app):
+    """Kategori, merk, admin dan tiga barang dengan beberapa transaksi"""
+    from app.models import Barang, BarangKeluar, BarangMasuk, KategoriBarang, MerkBarang, User
+
+    kategori = KategoriBarang(nama_kategori='ATK')
+    merk = MerkBarang(nama_merk='Merk A')
+    admin = User(username='admin', nama_lengkap='Admin', role='admin', email='admin@example.com')
+    admin.set_password('rahasia')
+    db.session.add_all([kategori, merk, admin])
+    db.session.flush()
+
+    barang_list = []
+    for i in range(3):
+        barang = Barang(
+            kode_barang=f'B{i:03d}', nama_barang=f'Barang {i}', satuan='pcs', stok_awal=10,
+            stok_minimum=2, jenis_barang='habis_pakai', kategori_id=kategori.id, merk_id=merk.id
+        )
+        db.session.add(barang)
+        barang_list.append(barang)
+    db.session.flush()
+
+    hari_ini = date.today()
+    for barang in barang_list:
+        db.session.add(BarangMasuk(tanggal=hari_ini - timedelta(days=10), kode_barang=barang.kode_barang, qty=20))
+        db.session.add(BarangKeluar(tanggal=hari_ini - timedelta(days=5), kode_barang=barang.kode_barang, qty=4))
+    db.session.commit()
+    return {'kategori': kategori, 'merk': merk, 'admin': admin, 'barang': barang_list}
+
+
+@pytest.fixture
+def client(app, data):
+    client = app.test_client()
+    client.post('/auth/login', data={'username': 'admin', 'password': 'rahasia'})
+    return client
+
+
+@pytest.fixture
+def catat_sql(app):
+    """List SQL yang dijalankan selama test; commit dicatat sebagai 'COMMIT'"""
+    from tests.query_counter import QueryCounter
+
+    with QueryCounter(catat_commit=True) as counter:
+        yield counter.statements
@@ -0,0 +1,63 @@
+"""Pencatat query SQL untuk test: deteksi N+1 pada laporan/export dan fixture catat_sql"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import db
+
+
+class QueryCounter:
+    """Catat setiap statement SQL yang dieksekusi selama blok `with` aktif.
+
+    Dengan catat_commit=True, setiap commit koneksi ikut dicatat sebagai 'COMMIT'
+    (tidak dihitung di `count`).
+    """
+
+    def __init__(self, engine=None, catat_commit=False):
+        self.engine = engine
+        self.catat_commit = catat_commit
+        self.statements = []
+
+    @property
+    def count(self):
+        return sum(1 for sql in self.statements if sql != 'COMMIT')
+
+    def _catat(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _catat_commit(self, conn):
+        self.statements.append('COMMIT')
+
+    def __enter__(self):
+        if self.engine is None:
+            self.engine = db.engine
+        event.listen(self.engine, 'before_cursor_execute', self._catat)
+        if self.catat_commit:
+            event.listen(self.engine, 'commit', self._catat_commit)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self._catat)
+        if self.catat_commit:
+            event.remove(self.engine, 'commit', self._catat_commit)
+        return False
+
+
+@contextmanager
+def assert_max_queries(maksimum, engine=None):
+    """Gagal dengan AssertionError jika blok menjalankan lebih dari `maksimum` query.
+
+    Contoh::
+
+        with assert_max_queries(10):
+            client.get('/laporan/transaksi-keluar/export-excel')
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+
+    if counter.count > maksimum:
+        daftar = '\n'.join(f'{i}. {sql}' for i, sql in enumerate(counter.statements, 1))
+        raise AssertionError(
+            f'Diharapkan maksimal {maksimum} query, tercatat {counter.count}:\n{daftar}'
+        )
@@ -0,0 +1,33 @@
+from app import db
+from app.models import Barang
+from app.transaksi.forms import TransaksiForm
+from app.utils.autocomplete import SUMBER_AUTOCOMPLETE
+
+
+def test_cari_awalan_meng_escape_wildcard(data):
+    db.session.add_all([
+        Barang(kode_barang='X_1', nama_barang='Garis bawah', satuan='pcs', stok_awal=1),
+        Barang(kode_barang='XA1', nama_barang='Tanpa garis', satuan='pcs', stok_awal=1),
+        Barang(kode_barang='Y%1', nama_barang='Persen', satuan='pcs', stok_awal=1),
+    ])
+    db.session.commit()
+    sumber = SUMBER_AUTOCOMPLETE['barang_kode']
+
+    assert sumber.cari('X_')[0] == [('X_1', 'X_1 - Garis bawah')]
+    assert sumber.cari('%')[0] == []
+    assert sumber.cari('Y%')[0] == [('Y%1', 'Y%1 - Persen')]
+
+
+def test_autocomplete_field_hanya_render_pilihan_terpilih(app, data):
+    with app.test_request_context():
+        form = TransaksiForm()
+        assert list(form.kode_barang.iter_choices()) == [('', '-- Pilih Barang --', True, {})]
+
+        form.kode_barang.data = 'B001'
+        assert list(form.kode_barang.iter_choices()) == [
+            ('', '-- Pilih Barang --', False, {}),
+            ('B001', 'B001 - Barang 1', True, {}),
+        ]
+        html = form.kode_barang()
+        assert '<option selected value="B001">B001 - Barang 1</option>' in html
+        assert 'data-autocomplete-url="/api/autocomplete/barang_kode"' in html
@@ -0,0 +1,33 @@
+from app import db
+from app.models import KategoriBarang
+from app.utils.cache_data import backend_cache, pilihan
+
+
+def test_pilihan_dibuang_oleh_perubahan_dari_proses_lain(app, data):
+    app.config['CACHE_DATA_DETIK'] = 300
+    sebelum = pilihan('kategori')
+    assert pilihan('kategori') == sebelum
+
+    # Worker lain menambah kategori: hapus_pilihan() di sana tidak menyentuh
+    # cache memori proses ini, tetapi versi tabel ikut naik setelah commit.
+    db.session.add(KategoriBarang(nama_kategori='Baru'))
+    db.session.commit()
+
+    assert [nama for _, nama in pilihan('kategori')] == ['ATK', 'Baru']
+    assert len(backend_cache()._data) == 2
+
+
+def test_form_menerima_kategori_baru_dari_proses_lain(app, client, data):
+    app.config['CACHE_DATA_DETIK'] = 300
+    assert client.get('/barang/tambah').status_code == 200
+
+    kategori = KategoriBarang(nama_kategori='Elektronik')
+    db.session.add(kategori)
+    db.session.commit()
+
+    respons = client.post('/barang/tambah', data={
+        'kode_barang': 'EL-1', 'nama_barang': 'Kabel', 'satuan': 'pcs', 'stok_awal': '1',
+        'stok_minimum': '1', 'jenis_barang': 'habis_pakai',
+        'kategori_id': str(kategori.id), 'merk_id': str(data['merk'].id),
+    })
+    assert respons.status_code == 302
@@ -0,0 +1,28 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from app import db
+from app.models import BarangKontrak, KontrakBarang
+from app.utils.data_export import _nilai
+
+
+def test_nilai_decimal_tidak_kehilangan_presisi():
+    assert _nilai(Decimal('12345678901234567.89')) == '12345678901234567.89'
+    assert _nilai(Decimal('0.10')) == '0.10'
+    assert _nilai(date(2026, 1, 2)) == '2026-01-02'
+
+
+def test_export_kontrak_menulis_total_nilai_desimal(client, data):
+    kontrak = KontrakBarang(nomor_kontrak='K-DEC', tanggal_kontrak=date(2026, 1, 2))
+    db.session.add(kontrak)
+    db.session.flush()
+    for barang, qty, harga in ((data['barang'][0], 3, Decimal('0.10')), (data['barang'][1], 2, Decimal('1500.25'))):
+        db.session.add(BarangKontrak(barang_id=barang.id, kontrak_id=kontrak.id, qty_kontrak=qty, harga_satuan=harga))
+    db.session.commit()
+
+    csv_teks = client.get('/laporan/kontrak/export-csv').get_data(as_text=True)
+    assert 'K-DEC,2026-01-02,,2,5,3000.80' in csv_teks
+
+    baris = [json.loads(b) for b in client.get('/laporan/kontrak/export-ndjson').get_data(as_text=True).splitlines()]
+    assert [b['total_nilai'] for b in baris if b['nomor_kontrak'] == 'K-DEC'] == ['3000.80']
@@ -0,0 +1,30 @@
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+from openpyxl.styles import Alignment, Font
+
+from app.utils.excel_export import ExcelExporter, export_kontrak_to_excel
+
+
+@pytest.mark.parametrize('write_only', [False, True])
+def test_add_custom_row(write_only):
+    exporter = ExcelExporter(title='Uji', write_only=write_only)
+    font = Font(name='Calibri', bold=True)
+    exporter.add_custom_row(['Kode', 'Nama'], font, fill=exporter.header_fill, border=exporter.border)
+    exporter.add_custom_row(['A1', 'Proyektor'], Font(name='Calibri'), alignment=Alignment(wrap_text=True))
+
+    ws = load_workbook(exporter.get_bytes()).active
+    assert [list(baris) for baris in ws.iter_rows(values_only=True)] == [['Kode', 'Nama'], ['A1', 'Proyektor']]
+    assert ws['B1'].font.bold and ws['B1'].fill.start_color.rgb == '00366092'
+    assert ws['B1'].border.left.style == 'thin'
+    assert ws['B2'].alignment.wrap_text
+
+
+def test_export_dengan_filename_tetap_mengembalikan_bytes(tmp_path):
+    path = tmp_path / 'kontrak.xlsx'
+    hasil = export_kontrak_to_excel([], filename=str(path))
+
+    assert isinstance(hasil, BytesIO)
+    assert hasil.getvalue() == path.read_bytes()
+    assert load_workbook(hasil).active['A1'].value
@@ -0,0 +1,61 @@
+import io
+from datetime import date
+
+from app import db
+from app.models import Barang, BarangMasuk, StokSaldo, StokSnapshot
+from app.utils.impor_data import impor_file
+from app.utils.kartu_stok import KartuStok
+
+
+def _impor(jenis, isi_csv, ukuran_chunk=None):
+    return impor_file(jenis, io.BytesIO(isi_csv.encode()), f'{jenis}.csv', ukuran_chunk=ukuran_chunk)
+
+
+def test_impor_transaksi_historis_mengoreksi_snapshot(app):
+    barang = Barang(kode_barang='OPN', nama_barang='Barang Opname', satuan='pcs', stok_awal=10)
+    db.session.add(barang)
+    db.session.add(BarangMasuk(tanggal=date(2026, 1, 5), kode_barang='OPN', qty=100))
+    db.session.commit()
+    for bulan in (2, 3, 4):
+        StokSnapshot.buat_snapshot(date(2026, bulan, 1))
+    db.session.commit()
+
+    hasil = _impor('masuk', (
+        'tanggal,kode_barang,qty\n'
+        '2026-01-20,OPN,50\n'
+        '2026-02-03,OPN,20\n'
+    ), ukuran_chunk=1)
+    assert (hasil.jumlah_disimpan, hasil.galat) == (2, [])
+
+    hasil = _impor('keluar', (
+        'tanggal;kode_barang;qty;keterangan\n'
+        '2026-01-25;OPN;30;opname\n'
+        '2026-03-10;OPN;15;opname\n'
+    ))
+    assert (hasil.jumlah_disimpan, hasil.galat) == (2, [])
+
+    # 10 + 100 + 50 - 30 = 130 akhir Januari, +20 Februari, -15 Maret
+    assert barang.stok_pada(date(2026, 1, 31)) == 130
+    assert barang.stok_pada(date(2026, 2, 28)) == 150
+    assert barang.stok_pada(date(2026, 3, 31)) == 135
+    assert barang.stok_pada(date(2026, 4, 15)) == 135
+    assert barang.get_stok_akhir() == 135
+
+    kartu = KartuStok(barang, tanggal_awal=date(2026, 3, 1), tanggal_akhir=date(2026, 3, 31))
+    assert kartu.saldo_awal == 150
+    list(kartu)
+    assert (kartu.total_keluar, kartu.saldo_akhir) == (15, 135)
+    assert StokSaldo.cek_selisih() == []
+
+
+def test_impor_keluar_melewati_baris_stok_kurang(app, data):
+    kode = data['barang'][0].kode_barang
+    hasil = _impor('keluar', (
+        'tanggal,kode_barang,qty\n'
+        f'2026-10-01,{kode},20\n'
+        f'2026-10-02,{kode},20\n'
+        '2026-10-02,TIDAKADA,1\n'
+    ))
+    assert hasil.jumlah_disimpan == 0
+    assert sorted(g['baris'] for g in hasil.galat) == [2, 3, 4]
+    assert StokSaldo.cek_selisih() == []
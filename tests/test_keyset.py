@@ -0,0 +1,45 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Barang, BarangMasuk
+from app.utils.keyset import buat_cursor, paginate_keyset
+
+KUNCI = [BarangMasuk.tanggal, BarangMasuk.created_at, BarangMasuk.id]
+
+
+def test_halaman_keyset_tidak_melewatkan_baris_dengan_kunci_sama(data):
+    kode = data['barang'][0].kode_barang
+    waktu = datetime(2026, 1, 5, 8, 0)
+    for _ in range(5):
+        db.session.add(BarangMasuk(tanggal=date(2026, 1, 5), kode_barang=kode, qty=1, created_at=waktu))
+    db.session.commit()
+
+    query = BarangMasuk.query.filter(BarangMasuk.tanggal == date(2026, 1, 5))
+    dilihat = []
+    cursor = None
+    while True:
+        halaman = paginate_keyset(query, KUNCI, cursor=cursor, per_page=2)
+        dilihat += [transaksi.id for transaksi in halaman.items]
+        if not halaman.has_next:
+            break
+        cursor = halaman.cursor_next
+    assert sorted(dilihat) == sorted(t.id for t in query) and len(dilihat) == 5
+
+
+def test_kunci_keyset_null_ditolak(data):
+    with pytest.raises(IntegrityError):
+        db.session.execute(BarangMasuk.__table__.insert().values(
+            tanggal=date(2026, 1, 5), kode_barang=data['barang'][0].kode_barang, qty=1, created_at=None
+        ))
+    db.session.rollback()
+
+    # Cursor dengan nilai kunci NULL dianggap tidak valid: kembali ke halaman pertama
+    cursor = buat_cursor('next', ['2026-01-05', None, 3], 21)
+    halaman = paginate_keyset(BarangMasuk.query, KUNCI, cursor=cursor, per_page=2)
+    assert halaman.nomor_awal == 1 and not halaman.has_prev
+
+    with pytest.raises(ValueError):
+        paginate_keyset(Barang.query, [Barang.created_at, Barang.id])
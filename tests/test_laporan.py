@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app.models import (
+    AsetTetap, Barang, BarangKeluar, BarangKontrak, BarangMasuk, KategoriBarang, KontrakBarang,
+    LaporanKerusakan, MerkBarang,
+)
+from app.models.merk_aset_tetap import MerkAsetTetap
+from tests.query_counter import assert_max_queries
+
+# Batas query per halaman/export; harus berlaku untuk data kecil maupun besar
+# (tanpa N+1 jumlah query tidak bertambah mengikuti jumlah baris).
+BATAS_QUERY = {
+    '/laporan/barang': 4,
+    '/laporan/barang/export-excel': 6,
+    '/laporan/barang/export-pdf': 6,
+    '/laporan/barang/export-csv': 2,
+    '/laporan/kontrak': 3,
+    '/laporan/kontrak/export-excel': 4,
+    '/laporan/kontrak/export-pdf': 4,
+    '/laporan/transaksi-masuk': 2,
+    '/laporan/transaksi-masuk/export-excel': 4,
+    '/laporan/transaksi-masuk/export-pdf': 4,
+    '/laporan/transaksi-keluar': 2,
+    '/laporan/transaksi-keluar/export-excel': 4,
+    '/laporan/transaksi-keluar/export-pdf': 4,
+    '/laporan/transaksi-keluar/export-ndjson': 2,
+    '/laporan/aset-tetap': 4,
+    '/laporan/aset-tetap/export-excel': 3,
+    '/laporan/aset-tetap/export-pdf': 4,
+    '/laporan/kerusakan': 3,
+}
+
+
+@pytest.fixture(params=[3, 25], ids=['kecil', 'besar'])
+def data_laporan(request, data):
+    """Baris laporan dengan kategori/merk/barang/aset berbeda per baris"""
+    jumlah = request.param
+    hari_ini = date.today()
+    kontrak = KontrakBarang(nomor_kontrak='K-1', tanggal_kontrak=hari_ini)
+    db.session.add(kontrak)
+    for i in range(jumlah):
+        kategori = KategoriBarang(nama_kategori=f'Kategori {i}')
+        merk = MerkBarang(nama_merk=f'Merk {i}')
+        merk_aset = MerkAsetTetap(nama_merk=f'Merk Aset {i}')
+        db.session.add_all([kategori, merk, merk_aset])
+        db.session.flush()
+
+        barang = Barang(kode_barang=f'L{i:03d}', nama_barang=f'Laporan {i}', satuan='pcs', stok_awal=5,
+                        kategori_id=kategori.id, merk_id=merk.id)
+        aset = AsetTetap(kode_aset=f'A{i:03d}', nama_aset=f'Aset {i}', kategori_id=kategori.id,
+                         merk_aset_tetap_id=merk_aset.id, total_barang=1)
+        db.session.add_all([barang, aset])
+        db.session.flush()
+
+        db.session.add_all([
+            BarangMasuk(tanggal=hari_ini - timedelta(days=i), kode_barang=barang.kode_barang, qty=3),
+            BarangKeluar(tanggal=hari_ini - timedelta(days=i), kode_barang=barang.kode_barang, qty=1),
+            BarangKontrak(barang_id=barang.id, kontrak_id=kontrak.id, qty_kontrak=2, harga_satuan=1500),
+            LaporanKerusakan(aset_tetap_id=aset.id, tanggal_diketahui_rusak=hari_ini, nama_pengguna='Budi',
+                             lokasi='Lab', jenis_kerusakan='Layar mati'),
+        ])
+    db.session.commit()
+    db.session.expire_all()
+    return jumlah
+
+
+@pytest.mark.parametrize('url', sorted(BATAS_QUERY))
+def test_laporan_tanpa_n_plus_1(client, data_laporan, url):
+    with assert_max_queries(BATAS_QUERY[url]):
+        respons = client.get(url)
+        respons.get_data()
+    assert respons.status_code == 200
+
+
+def test_halaman_laporan_memakai_filter_export(client, data_laporan):
+    respons = client.get('/laporan/transaksi-masuk?kode_barang=L001')
+    assert b'L001' in respons.data and b'L002' not in respons.data
+
+    respons = client.get('/laporan/transaksi-keluar/export-ndjson?kode_barang=L001')
+    assert b'L001' in respons.data and b'L002' not in respons.data
+
+    respons = client.get('/laporan/kerusakan?tanggal_awal=bukan-tanggal')
+    assert respons.status_code == 200
+    assert b'Format Tanggal Awal tidak valid.' in respons.data
+
+
+def test_kartu_stok_hanya_merender_barang_terpilih(client, data):
+    respons = client.get('/laporan/kartu-stok')
+    assert b'data-autocomplete-url="/api/autocomplete/barang_kode"' in respons.data
+    assert b'B000 - Barang 0' not in respons.data
+
+    with assert_max_queries(2):
+        respons = client.get('/laporan/kartu-stok?kode_barang=B001')
+        html = respons.get_data(as_text=True)
+    assert '<option selected value="B001">B001 - Barang 1</option>' in html
+    assert 'B002 - Barang 2' not in html
@@ -0,0 +1,33 @@
+from datetime import date
+
+from app import db
+from app.models import BarangKeluar
+from app.models.versi_data import naikkan_versi
+from app.utils.prediksi_stok import get_laju_konsumsi
+
+
+def test_laju_diperbarui_oleh_commit_dari_proses_lain(app, data):
+    kode = data['barang'][0].kode_barang
+    assert get_laju_konsumsi()[kode] == 4 / 30
+
+    # Worker lain mencatat barang keluar lalu menaikkan versi setelah commit
+    with db.engine.begin() as connection:
+        connection.execute(BarangKeluar.__table__.insert(), {'tanggal': date.today(), 'kode_barang': kode, 'qty': 2})
+    assert get_laju_konsumsi()[kode] == 4 / 30
+    with db.engine.begin() as connection:
+        naikkan_versi(connection, ['barang_keluar'])
+
+    assert get_laju_konsumsi()[kode] == 6 / 30
+
+
+def test_laju_mengikuti_perubahan_jenis_barang(app, data):
+    barang = data['barang'][1]
+    assert barang.kode_barang in get_laju_konsumsi()
+
+    barang.jenis_barang = 'inventaris'
+    db.session.commit()
+    assert barang.kode_barang not in get_laju_konsumsi()
+
+    barang.jenis_barang = 'habis_pakai'
+    db.session.commit()
+    assert get_laju_konsumsi()[barang.kode_barang] == 4 / 30
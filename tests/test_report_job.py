@@ -0,0 +1,34 @@
+import shutil
+import tempfile
+
+from app import db
+from app.models.report_job import ReportJob
+from app.utils.report_job import kerjakan_job, tambah_job
+
+
+def test_kerjakan_job_menyimpan_hasil(data):
+    job = tambah_job('barang', 'excel', '')
+    kerjakan_job(job.id)
+
+    job = db.session.get(ReportJob, job.id)
+    assert job.status == 'selesai'
+    with open(job.path_file, 'rb') as f:
+        assert f.read(2) == b'PK'
+
+
+def test_kerjakan_job_menutup_sumber_saat_gagal(data, monkeypatch):
+    sumber = tempfile.TemporaryFile()
+    sumber.write(b'isi laporan')
+    monkeypatch.setattr('app.utils.report_cache.ambil_atau_buat', lambda *args: (sumber, 'laporan.xlsx'))
+
+    def gagal_menyalin(*args):
+        raise OSError('disk penuh')
+
+    monkeypatch.setattr(shutil, 'copyfileobj', gagal_menyalin)
+    job = tambah_job('barang', 'excel', '')
+    kerjakan_job(job.id)
+
+    job = db.session.get(ReportJob, job.id)
+    assert job.status == 'gagal'
+    assert job.pesan_error == 'disk penuh'
+    assert sumber.closed
@@ -0,0 +1,32 @@
+from datetime import date
+
+from app import db
+from app.models import PermintaanBarang
+from app.models.versi_data import naikkan_versi
+from app.utils.statistik import jumlah_per_status, statistik_dashboard
+
+
+def test_statistik_dibuang_oleh_commit_dari_proses_lain(app, data):
+    app.config['STATISTIK_CACHE_DETIK'] = 300
+    assert jumlah_per_status(PermintaanBarang) == {'total': 0}
+    assert statistik_dashboard()['permintaan_pending'] == 0
+
+    # Worker lain menyimpan permintaan lalu menaikkan versi tabel setelah
+    # commit; cache di proses ini tidak pernah dibuang secara langsung.
+    with db.engine.begin() as connection:
+        connection.execute(PermintaanBarang.__table__.insert(), {
+            'nama_pengguna': 'Budi', 'barang1_id': data['barang'][0].id, 'banyaknya1': 1,
+            'tempat_penggunaan': 'Lab', 'tanggal': date.today(), 'status': 'terkirim',
+        })
+    assert jumlah_per_status(PermintaanBarang) == {'total': 0}
+    with db.engine.begin() as connection:
+        naikkan_versi(connection, ['permintaan_barang'])
+
+    assert jumlah_per_status(PermintaanBarang) == {'terkirim': 1, 'total': 1}
+    assert statistik_dashboard()['permintaan_pending'] == 1
+
+    permintaan = PermintaanBarang.query.one()
+    permintaan.status = 'selesai'
+    db.session.commit()
+    assert jumlah_per_status(PermintaanBarang) == {'selesai': 1, 'total': 1}
+    assert statistik_dashboard()['permintaan_pending'] == 0
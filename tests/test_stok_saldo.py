@@ -0,0 +1,107 @@
+import io
+from datetime import date
+
+from app import db
+from app.models import Barang, BarangKeluar, BarangMasuk, StokSaldo
+from app.utils.impor_data import impor_file
+from app.utils.transaksi_batch import siapkan_batch, simpan_batch
+
+
+def _stok(kode_barang):
+    return Barang.stok_akhir_bulk([kode_barang])[kode_barang]
+
+
+def test_saldo_barang_baru(data):
+    db.session.add(Barang(kode_barang='BARU', nama_barang='Baru', satuan='pcs', stok_awal=7))
+    db.session.commit()
+
+    saldo = Barang.query.filter_by(kode_barang='BARU').one().stok_saldo
+    assert (saldo.total_masuk, saldo.total_keluar) == (0, 0)
+    assert _stok('BARU') == 7
+    assert StokSaldo.cek_selisih() == []
+
+
+def test_saldo_insert_update_delete(data):
+    kode = data['barang'][0].kode_barang
+    assert _stok(kode) == 10 + 20 - 4
+
+    masuk = BarangMasuk(tanggal=date.today(), kode_barang=kode, qty=5)
+    keluar = BarangKeluar(tanggal=date.today(), kode_barang=kode, qty=3)
+    db.session.add_all([masuk, keluar])
+    db.session.commit()
+    assert _stok(kode) == 28
+    assert StokSaldo.cek_selisih() == []
+
+    masuk.qty = 8
+    keluar.qty = 1
+    db.session.commit()
+    assert _stok(kode) == 33
+    assert StokSaldo.cek_selisih() == []
+
+    db.session.delete(masuk)
+    db.session.commit()
+    assert _stok(kode) == 25
+    assert StokSaldo.cek_selisih() == []
+
+
+def test_saldo_pindah_kode_barang(data):
+    kode_a, kode_b = data['barang'][0].kode_barang, data['barang'][1].kode_barang
+    keluar = BarangKeluar(tanggal=date.today(), kode_barang=kode_a, qty=6)
+    db.session.add(keluar)
+    db.session.commit()
+
+    keluar.kode_barang = kode_b
+    keluar.qty = 2
+    db.session.commit()
+
+    assert _stok(kode_a) == 26
+    assert _stok(kode_b) == 24
+    assert StokSaldo.cek_selisih() == []
+
+
+def test_saldo_setelah_simpan_batch(data):
+    kode_a, kode_b = data['barang'][0].kode_barang, data['barang'][1].kode_barang
+    baris, galat = siapkan_batch('masuk', [
+        {'kode_barang': kode_a, 'qty': 3},
+        {'kode_barang': kode_b, 'qty': 4},
+        {'kode_barang': kode_a, 'qty': 2},
+    ])
+    assert galat == []
+    assert simpan_batch('masuk', baris) == 3
+
+    baris, galat = siapkan_batch('keluar', [{'kode_barang': kode_b, 'qty': 30}])
+    assert galat == []
+    simpan_batch('keluar', baris)
+
+    assert _stok(kode_a) == 31
+    assert _stok(kode_b) == 0
+    assert StokSaldo.cek_selisih() == []
+
+
+def test_saldo_setelah_impor(data):
+    kode = data['barang'][2].kode_barang
+    csv_barang = 'kode_barang;nama_barang;satuan;stok_awal\nIMP1;Barang Impor;pcs;4\n'
+    hasil = impor_file('barang', io.BytesIO(csv_barang.encode()), 'barang.csv')
+    assert hasil.galat == []
+
+    csv_masuk = f'tanggal,kode_barang,qty\n2026-01-05,{kode},5\n2026-01-06,IMP1,6\n'
+    hasil = impor_file('masuk', io.BytesIO(csv_masuk.encode()), 'masuk.csv')
+    assert (hasil.jumlah_disimpan, hasil.galat) == (2, [])
+
+    assert _stok('IMP1') == 10
+    assert _stok(kode) == 31
+    assert StokSaldo.cek_selisih() == []
+
+
+def test_rebuild(data):
+    kode = data['barang'][0].kode_barang
+    # Rusak saldo secara langsung, lalu hitung ulang
+    StokSaldo.query.filter_by(kode_barang=kode).update({'total_masuk': 999})
+    StokSaldo.query.filter_by(kode_barang=data['barang'][1].kode_barang).delete()
+    db.session.commit()
+    assert len(StokSaldo.cek_selisih()) == 2
+
+    assert StokSaldo.rebuild() == 3
+    db.session.commit()
+    assert StokSaldo.cek_selisih() == []
+    assert _stok(kode) == 26
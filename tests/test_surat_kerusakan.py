@@ -0,0 +1,26 @@
+import io
+import zipfile
+from datetime import date
+
+from app import db
+from app.models import AsetTetap, LaporanKerusakan
+from app.utils import surat_kerusakan
+
+
+def test_cetak_zip_dengan_pool_proses(app, monkeypatch):
+    aset = AsetTetap(kode_aset='A001', nama_aset='Proyektor', total_barang=1)
+    db.session.add(aset)
+    db.session.flush()
+    for i in range(4):
+        db.session.add(LaporanKerusakan(aset_tetap_id=aset.id, tanggal_diketahui_rusak=date.today(),
+                                        nama_pengguna=f'Pengguna {i}', lokasi='Lab', jenis_kerusakan='Lampu mati'))
+    db.session.commit()
+    laporan_list = LaporanKerusakan.query.order_by(LaporanKerusakan.id).all()
+
+    monkeypatch.setattr(surat_kerusakan, 'MIN_SURAT_PARALEL', 2)
+    monkeypatch.setattr(surat_kerusakan, 'SURAT_PER_TUGAS', 1)
+    hasil = surat_kerusakan.cetak_zip(laporan_list, jumlah_proses=2)
+
+    arsip = zipfile.ZipFile(io.BytesIO(hasil.read()))
+    assert arsip.namelist() == [surat_kerusakan.nama_file_surat(laporan) for laporan in laporan_list]
+    assert all(arsip.read(nama).startswith(b'%PDF-') for nama in arsip.namelist())
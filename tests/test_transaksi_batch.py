@@ -0,0 +1,62 @@
+from datetime import date
+
+from sqlalchemy import func
+
+from app import db
+from app.models import Barang, BarangKeluar, BarangMasuk, StokSaldo, StokSnapshot
+from app.utils.kartu_stok import KartuStok
+from app.utils.prediksi_stok import get_laju_konsumsi
+from app.utils.transaksi_batch import siapkan_batch, simpan_batch
+
+
+def stok_dihitung_ulang(barang, tanggal):
+    """Stok pada akhir hari `tanggal` langsung dari tabel transaksi, tanpa checkpoint"""
+    def total(model):
+        return db.session.query(func.coalesce(func.sum(model.qty), 0)).filter(
+            model.kode_barang == barang.kode_barang, model.tanggal <= tanggal
+        ).scalar()
+    return (barang.stok_awal or 0) + total(BarangMasuk) - total(BarangKeluar)
+
+
+def barang_dengan_snapshot():
+    barang = Barang(kode_barang='SNAP', nama_barang='Barang Snapshot', satuan='pcs', stok_awal=0)
+    db.session.add(barang)
+    db.session.add(BarangMasuk(tanggal=date(2026, 1, 10), kode_barang='SNAP', qty=100))
+    db.session.commit()
+    StokSnapshot.buat_snapshot(date(2026, 2, 1))
+    StokSnapshot.buat_snapshot(date(2026, 3, 1))
+    db.session.commit()
+    return barang
+
+
+def test_batch_bertanggal_mundur_mengoreksi_snapshot(app):
+    barang = barang_dengan_snapshot()
+
+    baris, galat = siapkan_batch('masuk', [
+        {'kode_barang': 'SNAP', 'qty': 50, 'tanggal': '2026-01-20'},
+        {'kode_barang': 'SNAP', 'qty': 5, 'tanggal': '2026-02-10'},
+    ])
+    assert galat == []
+    simpan_batch('masuk', baris)
+
+    baris, galat = siapkan_batch('keluar', [{'kode_barang': 'SNAP', 'qty': 30, 'tanggal': '2026-01-25'}])
+    assert galat == []
+    simpan_batch('keluar', baris)
+
+    assert barang.get_stok_akhir() == 125
+    for tanggal in (date(2026, 1, 31), date(2026, 2, 15), date(2026, 3, 15)):
+        assert barang.stok_pada(tanggal) == stok_dihitung_ulang(barang, tanggal)
+    assert barang.stok_pada(date(2026, 3, 15)) == 125
+    assert KartuStok(barang, tanggal_awal=date(2026, 3, 1)).saldo_awal == 125
+    assert StokSaldo.cek_selisih() == []
+
+
+def test_batch_keluar_memperbarui_prediksi(app, data):
+    kode = data['barang'][0].kode_barang
+    assert get_laju_konsumsi()[kode] == 4 / 30
+
+    baris, galat = siapkan_batch('keluar', [{'kode_barang': kode, 'qty': 1}])
+    assert galat == []
+    simpan_batch('keluar', baris)
+    assert get_laju_konsumsi()[kode] == 5 / 30
+    assert BarangKeluar.query.filter_by(kode_barang=kode).count() == 2
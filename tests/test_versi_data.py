@@ -0,0 +1,52 @@
+from datetime import date
+
+from app import db
+from app.models import BarangKeluar, BarangMasuk, VersiData
+from app.utils.transaksi_batch import siapkan_batch, simpan_batch
+
+
+def _versi(*nama_tabel):
+    db.session.rollback()
+    return VersiData.ambil(nama_tabel)
+
+
+def test_versi_naik_setelah_commit_bukan_saat_flush(data, catat_sql):
+    kode = data['barang'][0].kode_barang
+    sebelum = _versi('barang_keluar')
+    catat_sql.clear()
+
+    db.session.add(BarangKeluar(tanggal=date.today(), kode_barang=kode, qty=1))
+    db.session.flush()
+    assert not any('versi_data' in sql for sql in catat_sql)
+
+    db.session.commit()
+    # UPDATE versi_data baru berjalan di transaksi terpisah setelah commit data
+    commit_data = catat_sql.index('COMMIT')
+    assert any(sql.startswith('UPDATE versi_data') for sql in catat_sql[commit_data:])
+    assert _versi('barang_keluar')['barang_keluar'] == sebelum['barang_keluar'] + 1
+
+
+def test_versi_tetap_setelah_rollback_dan_savepoint(data):
+    kode = data['barang'][0].kode_barang
+    sebelum = _versi('barang_masuk')
+
+    db.session.add(BarangMasuk(tanggal=date.today(), kode_barang=kode, qty=1))
+    db.session.flush()
+    db.session.rollback()
+    assert _versi('barang_masuk') == sebelum
+
+    with db.session.begin_nested():
+        db.session.add(BarangMasuk(tanggal=date.today(), kode_barang=kode, qty=1))
+    assert VersiData.ambil(['barang_masuk']) == sebelum
+    db.session.commit()
+    assert _versi('barang_masuk')['barang_masuk'] == sebelum['barang_masuk'] + 1
+
+
+def test_versi_naik_setelah_simpan_batch(data):
+    sebelum = _versi('barang_masuk', 'stok_saldo')
+    baris, galat = siapkan_batch('masuk', [{'kode_barang': data['barang'][0].kode_barang, 'qty': 2}])
+    assert galat == []
+    simpan_batch('masuk', baris)
+
+    sesudah = _versi('barang_masuk', 'stok_saldo')
+    assert all(sesudah[nama] == sebelum[nama] + 1 for nama in sebelum)